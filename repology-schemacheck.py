@@ -248,6 +248,7 @@ schemas = {
                         'branch': str,
                         'sparse_checkout': [str],
                         'depth': Any(int, None),
+                        'blobless': bool,
 
                         # elasticsearch
                         'scroll_url': str,
@@ -264,10 +265,16 @@ schemas = {
                         'headers': {str: str},
                         'nocache': bool,
                         'allow_zero_size': bool,
+                        'compressed_state': bool,
+                        'resumable': bool,
 
                         # crates_io
                         'fetch_delay': Any(int, float),
 
+                        # chocolatey
+                        'fetch_concurrency': int,
+                        'page_size': int,
+
                         # aur
                         'max_api_url_length': int,
 
@@ -18,6 +18,7 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+import os
 import sys
 from timeit import default_timer as timer
 from typing import Any, Callable, Iterable, TypeVar
@@ -25,12 +26,14 @@ from typing import Any, Callable, Iterable, TypeVar
 from repology.config import config
 from repology.database import Database
 from repology.dblogger import LogRunManager
+from repology.fetchers.http import get_host_health, get_session_pool
 from repology.logger import FileLogger, Logger, StderrLogger
 from repology.maintainermgr import MaintainerManager
 from repology.querymgr import QueryManager
 from repology.repomgr import RepositoryManager
 from repology.repoproc import RepositoryProcessor
 from repology.transformer import PackageTransformer
+from repology.transformer.profile import RuleProfiler
 from repology.transformer.ruleset import Ruleset
 from repology.update import UpdateProcess
 from repology.yamlloader import ParsedConfigCache, YamlConfig
@@ -77,7 +80,7 @@ class Environment:
 
     @cached_method
     def get_repos_config(self) -> YamlConfig:
-        return YamlConfig.from_path(self.options.repos_dir, self.get_parsed_config_cache())
+        return YamlConfig.from_path(self.options.repos_dir, self.get_parsed_config_cache(), self.options.config_jobs)
 
     @cached_method
     def get_repo_manager(self) -> RepositoryManager:
@@ -85,15 +88,15 @@ class Environment:
 
     @cached_method
     def get_repo_processor(self) -> RepositoryProcessor:
-        return RepositoryProcessor(self.get_repo_manager(), self.options.statedir, self.options.parseddir, safety_checks=self.options.enable_safety_checks)
+        return RepositoryProcessor(self.get_repo_manager(), self.options.statedir, self.options.parseddir, safety_checks=self.options.enable_safety_checks, incremental_parsing=self.options.incremental_parsing, parse_jobs=self.options.parse_jobs)
 
     @cached_method
     def get_rules_config(self) -> YamlConfig:
-        return YamlConfig.from_path(self.options.rules_dir, self.get_parsed_config_cache())
+        return YamlConfig.from_path(self.options.rules_dir, self.get_parsed_config_cache(), self.options.config_jobs)
 
     @cached_method
     def get_ruleset(self) -> Ruleset:
-        return Ruleset(self.get_rules_config())
+        return Ruleset(self.get_rules_config(), self.get_parsed_config_cache())
 
     @cached_method
     def get_enabled_repo_names(self) -> list[str]:
@@ -110,7 +113,7 @@ class Environment:
 
     @cached_method
     def get_maintainers_config(self) -> YamlConfig:
-        return YamlConfig.from_path(self.options.maintainers_config, self.get_parsed_config_cache())
+        return YamlConfig.from_path(self.options.maintainers_config, self.get_parsed_config_cache(), self.options.config_jobs)
 
     @cached_method
     def get_maintainer_manager(self) -> MaintainerManager:
@@ -123,6 +126,11 @@ class Environment:
 def process_repositories(env: Environment) -> None:
     database = env.get_main_database_connection()
 
+    # host statistics are kept between runs, so dead hosts are not retried right away
+    host_health_path = os.path.join(env.get_options().statedir, 'hosthealth.json')
+    if env.get_options().fetch:
+        get_host_health().load(host_health_path)
+
     for reponame in env.get_processable_repo_names():
         repository = env.get_repo_manager().get_repository(reponame)
 
@@ -183,7 +191,8 @@ def process_repositories(env: Environment) -> None:
             database.commit()
 
             try:
-                transformer = PackageTransformer(ruleset, reponame, repository.ruleset)
+                profiler = RuleProfiler() if env.get_options().profile_rules else None
+                transformer = PackageTransformer(ruleset, reponame, repository.ruleset, profiler, rule_major=env.get_options().rule_major)
                 maintainermgr = env.get_maintainer_manager()
 
                 with LogRunManager(env.get_logging_database_connection(), reponame, 'parse') as runlogger:
@@ -192,6 +201,14 @@ def process_repositories(env: Environment) -> None:
                 env.get_main_logger().get_indented().log('done')
 
                 transformer.finalize()
+
+                if profiler is not None:
+                    env.get_main_logger().get_indented().log('hottest rules:')
+                    for line in profiler.iter_report_lines(env.get_options().profile_rules_top):
+                        env.get_main_logger().get_indented().get_indented().log(line)
+
+                    os.makedirs(env.get_options().profile_rules, exist_ok=True)
+                    profiler.dump(os.path.join(env.get_options().profile_rules, reponame + '.json'))
             except KeyboardInterrupt:
                 raise
             except Exception as e:
@@ -203,6 +220,15 @@ def process_repositories(env: Environment) -> None:
             database.mark_repository_parsed(reponame)
             database.commit()
 
+    if env.get_options().fetch:
+        for host, stats in sorted(get_session_pool().get_stats().items()):
+            env.get_main_logger().log(f'http {host}: {stats.requests} request(s), {stats.connections_opened} connection(s) opened, {stats.connections_reused} reused')
+
+        for host, health in get_host_health().iter_unavailable():
+            env.get_main_logger().log(f'http {host}: unavailable after {health.failures} consecutive failure(s)', severity=Logger.WARNING)
+
+        get_host_health().save(host_health_path)
+
 
 def database_init(env: Environment) -> None:
     logger = env.get_main_logger()
@@ -217,6 +243,17 @@ def database_init(env: Environment) -> None:
     database.commit()
 
 
+def database_upgrade(env: Environment) -> None:
+    logger = env.get_main_logger()
+    database = env.get_main_database_connection()
+
+    logger.log('upgrading database schema')
+    database.upgrade_schema()
+
+    logger.get_indented().log('committing changes')
+    database.commit()
+
+
 def update_repositories(env: Environment) -> None:
     logger = env.get_main_logger()
     database = env.get_main_database_connection()
@@ -323,11 +360,15 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument('-D', '--dsn', default=config['DSN'], help='database connection params')
     parser.add_argument('--enabled-repositories', default=config['REPOSITORIES'], metavar='repo|group', nargs='*', help='own or group name(s) of repositories which are enabled and shown in repology')
     parser.add_argument('--config-cache', default=config['CONFIG_CACHE_DIR'], help='path to directory for caching parsed repository and rule data')
+    parser.add_argument('--config-jobs', type=int, default=os.cpu_count() or 1, help='number of processes to use for parsing repository and rule configs')
     parser.add_argument('--maintainers-config', default=config['MAINTAINERS_CONFIG'], help='path to maintainers.yaml')
 
     grp = parser.add_argument_group('Initialization actions (destructive!)')
     grp.add_argument('-i', '--initdb', action='store_true', help='(re)initialize database schema')
 
+    grp = parser.add_argument_group('Maintenance actions')
+    grp.add_argument('--upgradedb', action='store_true', help='upgrade existing database schema in place')
+
     grp = parser.add_argument_group('Update actions')
     grp.add_argument('-f', '--fetch', action='count', help='fetch repository data (twice to allow updating)')
     grp.add_argument('-p', '--parse', action='count', help="parse fetched repository data (specify twice to parse even if the fetched data hasn't changed)")
@@ -347,6 +388,8 @@ def parse_arguments() -> argparse.Namespace:
     grp = parser.add_argument_group('Flags')
     grp.add_argument('--enable-safety-checks', action='store_true', dest='enable_safety_checks', default=config['ENABLE_SAFETY_CHECKS'], help='enable safety checks on processed repository data')
     grp.add_argument('--disable-safety-checks', action='store_false', dest='enable_safety_checks', default=not config['ENABLE_SAFETY_CHECKS'], help='disable safety checks on processed repository data')
+    grp.add_argument('--incremental-parsing', action='store_true', help='only reparse changed parts of repository trees where supported, caching the rest next to the state')
+    grp.add_argument('--parse-jobs', type=int, default=1, metavar='N', help='parse sources of a repository, and shards of large sources, in N parallel processes (not used when profiling rules)')
     grp.add_argument('--skip-packages', action='store_true', help='skip pushing updated packages, but run update code')
     grp.add_argument('--history-cutoff-timestamp', default=config['HISTORY_CUTOFF_TIMESTAMP'], help='timestamp before which history is untrusted')
 
@@ -354,6 +397,11 @@ def parse_arguments() -> argparse.Namespace:
 
     grp.add_argument('--max-updates', type=int, help='maximal number of project updates to perform')
 
+    grp.add_argument('--rule-major', action='store_true', help='use batched rule-major transformer engine')
+
+    grp.add_argument('--profile-rules', metavar='PATH', help='profile rules during parsing, dumping per-repository profiles into given directory')
+    grp.add_argument('--profile-rules-top', type=int, default=20, help='number of hottest rules to log when profiling rules')
+
     parser.add_argument('reponames', default=config['REPOSITORIES'], metavar='repo|group', nargs='*', help='own or group name(s) of repositories to process')
 
     return parser.parse_args()
@@ -372,6 +420,8 @@ def main() -> int:
 
     if options.initdb:
         database_init(env)
+    elif options.upgradedb:
+        database_upgrade(env)
 
     if options.parse:
         # preload them here, otherwise they will lazy load at the start of first repo parsing,
@@ -401,6 +451,10 @@ def main() -> int:
     if options.dump_rules:
         print(env.get_rules_config().dump())
 
+    if (cache := env.get_parsed_config_cache()) is not None:
+        evicted = cache.evict_stale()
+        env.get_main_logger().log(f'config cache: {cache.hits} hit(s), {cache.misses} miss(es), {evicted} stale entry(ies) evicted')
+
     env.get_main_logger().log('total time taken: {:.2f} seconds'.format((timer() - start)))
 
     return 0
@@ -57,6 +57,13 @@ class _AtomicFSObject:
     def get_path(self) -> str:
         return self._get_new_path()
 
+    def get_partial_path(self) -> str:
+        """Return path for incomplete data which should survive failures.
+
+        Unlike the new state, it is not removed on cleanup.
+        """
+        return self._path + '.partial'
+
     def cancel(self) -> None:
         self._canceled = True
 
@@ -0,0 +1,90 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+from typing import Self
+
+from repology.atomic_fs import AtomicFile
+
+
+__all__ = ['ChangedPaths']
+
+
+# number of past revisions to keep
+_MAX_REVISIONS = 100
+
+
+class ChangedPaths:
+    """Paths changed in a state directory over a series of updates.
+
+    Stored by fetchers in a sidecar file next to the state. Contains
+    a list of successive revisions (such as git HEADs) the state went
+    through, oldest first, along with paths changed between each
+    of them, so consumers which remember revision they've last
+    processed may only process paths changed since it.
+    """
+
+    revisions: list[str]
+    changes: list[list[str]]
+
+    def __init__(self, revision: str) -> None:
+        self.revisions = [revision]
+        self.changes = []
+
+    @staticmethod
+    def get_path(statepath: str) -> str:
+        return statepath + '.changes'
+
+    @classmethod
+    def load(cls, statepath: str) -> Self | None:
+        try:
+            with open(cls.get_path(statepath), encoding='utf-8') as changesfile:
+                data = json.load(changesfile)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        res = cls(data['revisions'][0])
+        res.revisions = data['revisions']
+        res.changes = data['changes']
+        return res
+
+    def save(self, statepath: str) -> None:
+        with AtomicFile(self.get_path(statepath), 'w', encoding='utf-8') as changesfile:
+            json.dump({'revisions': self.revisions, 'changes': self.changes}, changesfile.get_file())
+
+    def get_head(self) -> str:
+        return self.revisions[-1]
+
+    def get_changes_since(self, revision: str) -> set[str] | None:
+        """Return paths changed since the given revision, or None if these are not known."""
+        try:
+            index = self.revisions.index(revision)
+        except ValueError:
+            return None
+
+        res: set[str] = set()
+        for paths in self.changes[index:]:
+            res.update(paths)
+        return res
+
+    def add(self, revision: str, paths: list[str]) -> None:
+        self.revisions.append(revision)
+        self.changes.append(sorted(paths))
+
+        if len(self.changes) > _MAX_REVISIONS:
+            del self.revisions[0]
+            del self.changes[0]
@@ -0,0 +1,82 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+from repology.repomgr import RepositoryManager
+from repology.transformer.ruleset import Ruleset
+from repology.yamlloader import ParsedConfigCache, YamlConfig
+
+
+__all__ = ['ConfigReloader']
+
+
+class ConfigReloader:
+    """Holder of repository and rules configs for long-running processes.
+
+    On refresh(), configs are reloaded incrementally (see
+    YamlConfig.refresh()), RepositoryManager and Ruleset are rebuilt
+    if their configs have changed, and names of repositories which
+    need to be reparsed (or dropped) are returned: these are
+    repositories which were added, modified or removed, and ones
+    to which added, removed or moved rules apply.
+    """
+
+    _cache: ParsedConfigCache | None
+    _jobs: int
+
+    _repos_config: YamlConfig
+    _rules_config: YamlConfig
+    _repomgr: RepositoryManager
+    _ruleset: Ruleset
+
+    def __init__(self, repos_dir: str, rules_dir: str, cache: ParsedConfigCache | None = None, jobs: int = 1) -> None:
+        self._cache = cache
+        self._jobs = jobs
+
+        self._repos_config = YamlConfig.from_path(repos_dir, cache, jobs)
+        self._rules_config = YamlConfig.from_path(rules_dir, cache, jobs)
+        self._repomgr = RepositoryManager(self._repos_config)
+        self._ruleset = Ruleset(self._rules_config, cache)
+
+    def get_repo_manager(self) -> RepositoryManager:
+        return self._repomgr
+
+    def get_ruleset(self) -> Ruleset:
+        return self._ruleset
+
+    def refresh(self) -> list[str]:
+        affected: set[str] = set()
+
+        repos_config = self._repos_config.refresh(self._cache, self._jobs)
+        if repos_config.get_hash() != self._repos_config.get_hash():
+            repomgr = RepositoryManager(repos_config)
+            affected.update(repomgr.get_changed_names(self._repomgr))
+            self._repos_config = repos_config
+            self._repomgr = repomgr
+
+        rules_config = self._rules_config.refresh(self._cache, self._jobs)
+        if rules_config.get_hash() != self._rules_config.get_hash():
+            ruleset = Ruleset(rules_config, self._cache)
+            changed_rules = ruleset.get_changed_rules(self._ruleset)
+            self._rules_config = rules_config
+            self._ruleset = ruleset
+
+            for repository in self._repomgr.get_all_repositories():
+                rulesets = set(repository.ruleset)
+                if any(rule.is_applicable(rulesets) for rule in changed_rules):
+                    affected.add(repository.name)
+
+        return sorted(affected)
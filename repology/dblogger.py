@@ -21,6 +21,7 @@ import traceback
 from typing import Any
 
 from repology.database import Database
+from repology.fetchers.telemetry import FetchTelemetry, activate_telemetry, deactivate_telemetry
 from repology.logger import Logger, format_log_entry
 
 
@@ -112,6 +113,7 @@ class RunHandler(Logger):
     _run_id: int
     _start_rusage: Any
     _logger: Logger
+    _telemetry: FetchTelemetry | None
     _no_changes: bool = False
     _num_lines: int = 0
     _num_warnings: int = 0
@@ -123,6 +125,11 @@ class RunHandler(Logger):
         self._start_rusage = resource.getrusage(resource.RUSAGE_SELF)
         self._logger = RealtimeDatabaseLogger(self._db, self._run_id)
 
+        # fetch runs collect transfer statistics
+        self._telemetry = FetchTelemetry() if run_type == 'fetch' else None
+        if self._telemetry is not None:
+            activate_telemetry(self._telemetry)
+
     def _log(self, message: str, severity: int, indent: int, prefix: str) -> None:
         self._logger._log(message, severity, indent, prefix)
         self._num_lines += 1
@@ -137,6 +144,9 @@ class RunHandler(Logger):
     def finish(self, status: str = 'successful', traceback_text: str | None = None) -> None:
         end_rusage = resource.getrusage(resource.RUSAGE_SELF)
 
+        if self._telemetry is not None:
+            deactivate_telemetry()
+
         self._db.finish_run(
             id=self._run_id,
             status=status,
@@ -148,6 +158,7 @@ class RunHandler(Logger):
             stime=datetime.timedelta(seconds=end_rusage.ru_stime - self._start_rusage.ru_stime),
             maxrss=end_rusage.ru_maxrss,
             maxrss_delta=end_rusage.ru_maxrss - self._start_rusage.ru_maxrss,
+            fetch_stats=self._telemetry.serialize() if self._telemetry is not None else None,
             traceback=traceback_text
         )
 
@@ -15,41 +15,51 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-import os
 import xml.etree.ElementTree
 
+import requests
+
 from repology.atomic_fs import AtomicDir
 from repology.fetchers import PersistentData, ScratchDirFetcher
 from repology.fetchers.http import PoliteHTTP
+from repology.fetchers.pagination import PageRequest, PaginatedFetch, save_page
 from repology.logger import Logger
 
 
+_ATOM = '{http://www.w3.org/2005/Atom}'
+
+
 class ChocolateyFetcher(ScratchDirFetcher):
-    def __init__(self, url: str, fetch_timeout: int = 5, fetch_delay: int | None = None) -> None:
+    def __init__(self, url: str, fetch_timeout: int = 5, fetch_delay: int | None = None, fetch_concurrency: int = 2, page_size: int = 40, max_tries: int = 5, retry_delay: int = 5) -> None:
         self.url = url
         self.do_http = PoliteHTTP(timeout=fetch_timeout, delay=fetch_delay)
+        self.fetch_concurrency = fetch_concurrency
+        self.page_size = page_size
+        self.max_tries = max_tries
+        self.retry_delay = retry_delay
 
     def _do_fetch(self, statedir: AtomicDir, persdata: PersistentData, logger: Logger) -> bool:
-        numpage = 0
-        nextpageurl = self.url + 'Packages()?$filter=IsLatestVersion&$orderby=Id'
-        while True:
-            logger.log('getting ' + nextpageurl)
-
-            text = self.do_http(nextpageurl).text
-            with open(os.path.join(statedir.get_path(), '{}.xml'.format(numpage)), 'w', encoding='utf-8') as pagefile:
-                pagefile.write(text)
-                pagefile.flush()
-                os.fsync(pagefile.fileno())
-
-            # parse next page
-            logger.log('parsing ' + nextpageurl)
-            root = xml.etree.ElementTree.fromstring(text)
-
-            next_link = root.find('{http://www.w3.org/2005/Atom}link[@rel="next"]')
-            if next_link is None:
-                break
-
-            nextpageurl = next_link.attrib['href']
-            numpage += 1
+        def get_request(numpage: int) -> PageRequest:
+            return PageRequest(self.url + f'Packages()?$filter=IsLatestVersion&$orderby=Id&$skip={numpage * self.page_size}&$top={self.page_size}')
+
+        def is_last(response: requests.Response) -> bool:
+            root = xml.etree.ElementTree.fromstring(response.text)
+            if len(root.findall(f'{_ATOM}entry')) == self.page_size:
+                return False
+
+            # short page followed by more data means that the server
+            # limits page size, and offsets computed from ours skip entries
+            if root.find(f'{_ATOM}link[@rel="next"]') is not None:
+                raise RuntimeError(f'server returned less than {self.page_size} entries per page, page_size needs to be decreased')
+
+            return True
+
+        pages = PaginatedFetch(self.do_http, logger, concurrency=self.fetch_concurrency, max_tries=self.max_tries, retry_delay=self.retry_delay).iter_by_offset(
+            get_request,
+            is_last
+        )
+
+        for numpage, response in enumerate(pages):
+            save_page(statedir, '{}.xml'.format(numpage), response.text)
 
         return True
@@ -15,14 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-import json
-import os
-import time
-from itertools import count
+import requests
 
 from repology.atomic_fs import AtomicDir
 from repology.fetchers import PersistentData, ScratchDirFetcher
 from repology.fetchers.http import PoliteHTTP
+from repology.fetchers.pagination import PageRequest, PaginatedFetch, save_page
 from repology.logger import Logger
 
 
@@ -34,36 +32,18 @@ class CratesIOFetcher(ScratchDirFetcher):
         self.max_tries = max_tries
         self.retry_delay = retry_delay
 
-    def _do_fetch_retry(self, url: str, logger: Logger) -> str:
-        num_try = 1
-        while True:
-            logger.log(f'getting {url}' if num_try == 1 else f'getting {url} (try #{num_try})')
-
-            try:
-                return self.do_http(url).text
-            except ConnectionError as e:
-                if num_try >= self.max_tries:
-                    raise
-                else:
-                    logger.log(f'failed to fetch {url}: {str(e)}, retrying after delay...', Logger.ERROR)
-                    time.sleep(self.retry_delay)
-                    num_try += 1
-
     def _do_fetch(self, statedir: AtomicDir, persdata: PersistentData, logger: Logger) -> bool:
-        page_counter = count()
-        query = '?per_page={}&sort=alpha'.format(self.per_page)
-        while query:
-            url = self.url + query
-            #logger.log('getting ' + url)
+        def get_next(response: requests.Response) -> PageRequest | None:
+            query = response.json()['meta']['next_page']
+            return PageRequest(self.url + query) if query else None
 
-            text = self._do_fetch_retry(url, logger)
-            with open(os.path.join(statedir.get_path(), '{}.json'.format(next(page_counter))), 'w', encoding='utf-8') as pagefile:
-                pagefile.write(text)
-                pagefile.flush()
-                os.fsync(pagefile.fileno())
+        pages = PaginatedFetch(self.do_http, logger, max_tries=self.max_tries, retry_delay=self.retry_delay).iter_sequential(
+            PageRequest(self.url + '?per_page={}&sort=alpha'.format(self.per_page)),
+            get_next
+        )
 
-            # parse next page
-            query = json.loads(text)['meta']['next_page']
+        for numpage, response in enumerate(pages):
+            save_page(statedir, '{}.json'.format(numpage), response.text)
 
         logger.log('last page detected')
         return True
@@ -16,7 +16,6 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
-import os
 from typing import Any
 
 import requests
@@ -24,6 +23,7 @@ import requests
 from repology.atomic_fs import AtomicDir
 from repology.fetchers import PersistentData, ScratchDirFetcher
 from repology.fetchers.http import PoliteHTTP
+from repology.fetchers.pagination import PageRequest, PaginatedFetch, save_page
 from repology.logger import Logger
 
 
@@ -48,30 +48,38 @@ class ElasticSearchFetcher(ScratchDirFetcher):
         self._max_pages = max_pages
 
     def _do_fetch_scroll(self, statedir: AtomicDir, logger: Logger) -> None:
-        numpage = 0
+        scroll_id: str | None = None
+
+        # only called after a page with hits was processed
+        def get_next(response: requests.Response) -> PageRequest | None:
+            return PageRequest('{}?scroll={}&scroll_id={}'.format(self._scroll_url, self._scroll, scroll_id))
 
         logger.log(f'getting first page with payload {json.dumps(self._request_data)}')
-        response = self._do_http('{}?scroll={}'.format(self._url, self._scroll), json=self._request_data).json()
 
-        scroll_id = response['_scroll_id']
+        # scroll requests are not idempotent, so these are not retried
+        pages = PaginatedFetch(self._do_http, logger, max_tries=1).iter_sequential(
+            PageRequest('{}?scroll={}'.format(self._url, self._scroll), json=self._request_data),
+            get_next
+        )
+
+        for numpage, response in enumerate(pages):
+            data = response.json()
 
-        while response['hits']['hits']:
-            with open(os.path.join(statedir.get_path(), '{}.json'.format(numpage)), 'w', encoding='utf-8') as pagefile:
-                json.dump(response['hits']['hits'], pagefile)
-                pagefile.flush()
-                os.fsync(pagefile.fileno())
+            if scroll_id is None:
+                scroll_id = data['_scroll_id']
 
-            numpage += 1
+            hits = data['hits']['hits']
+            if not hits:
+                break
 
-            if self._max_pages is not None and numpage >= self._max_pages:
+            save_page(statedir, '{}.json'.format(numpage), json.dumps(hits))
+
+            if self._max_pages is not None and numpage + 1 >= self._max_pages:
                 import shutil
                 shutil.rmtree("/tmp/metacpan.debug", ignore_errors=True)
                 shutil.copytree(statedir.get_path(), "/tmp/metacpan.debug")
                 raise RuntimeError(f'pages limit ({self._max_pages}) exceeded (runaway elasticsearch scroll?)')
 
-            logger.log(f'getting page {numpage} (scroll_id={scroll_id})')
-            response = self._do_http('{}?scroll={}&scroll_id={}'.format(self._scroll_url, self._scroll, scroll_id)).json()
-
         try:
             self._do_http(self._scroll_url, method='DELETE', json={'scroll_id': scroll_id}).json()
         except requests.exceptions.HTTPError as e:
@@ -17,10 +17,13 @@
 
 import time
 
+import xxhash
+
 from repology.atomic_fs import AtomicFile
 from repology.fetchers import PersistentData, ScratchFileFetcher
-from repology.fetchers.http import NotModifiedException, save_http_stream
+from repology.fetchers.http import NotModifiedException, get_conditional_headers, save_http_stream, store_validators
 from repology.logger import Logger
+from repology.parsers.compression import TRANSPARENT_COMPRESSIONS
 
 
 class FileFetcher(ScratchFileFetcher):
@@ -31,7 +34,9 @@ class FileFetcher(ScratchFileFetcher):
                  headers: dict[str, str] | None = None,
                  nocache: bool = False,
                  fetch_timeout: int | None = 60,
-                 allow_zero_size: bool = True) -> None:
+                 allow_zero_size: bool = True,
+                 compressed_state: bool = False,
+                 resumable: bool = False) -> None:
         super(FileFetcher, self).__init__(binary=True)
 
         self.url = url
@@ -40,6 +45,8 @@ class FileFetcher(ScratchFileFetcher):
         self.headers = headers
         self.fetch_timeout = fetch_timeout
         self.allow_zero_size = allow_zero_size
+        self.compressed_state = compressed_state
+        self.resumable = resumable
 
         # cache bypass
         if nocache:
@@ -60,12 +67,28 @@ class FileFetcher(ScratchFileFetcher):
 
         logger.log('fetching ' + ', with '.join(fetching_what))
 
-        if 'last-modified' in persdata:
-            headers['if-modified-since'] = persdata['last-modified']
-            logger.log('using if-modified-since: {}'.format(headers['if-modified-since']))
+        headers.update(get_conditional_headers(persdata, logger))
+
+        # in compressed state mode the file is stored as is and
+        # decompressed by parsers while reading
+        compression = self.compression
+        if self.compressed_state and compression in TRANSPARENT_COMPRESSIONS:
+            logger.log(f'keeping state {compression} compressed')
+            compression = None
+
+        hasher = xxhash.xxh3_64()
 
         try:
-            response = save_http_stream(self.url, statefile.get_file(), compression=self.compression, data=self.post, headers=headers, timeout=self.fetch_timeout)
+            response = save_http_stream(
+                self.url,
+                statefile.get_file(),
+                compression=compression,
+                hasher=hasher,
+                partial_path=statefile.get_partial_path() if self.resumable else None,
+                data=self.post,
+                headers=headers,
+                timeout=self.fetch_timeout
+            )
         except NotModifiedException:
             logger.log('got 304 not modified')
             return False
@@ -77,8 +100,16 @@ class FileFetcher(ScratchFileFetcher):
         if size == 0 and not self.allow_zero_size:
             raise RuntimeError('refusing zero size file')
 
-        if response.headers.get('last-modified'):
-            persdata['last-modified'] = response.headers['last-modified']
-            logger.log('storing last-modified: {}'.format(persdata['last-modified']))
+        store_validators(persdata, response, logger)
+
+        # many servers ignore conditional requests, so also detect
+        # unchanged content by its hash
+        content_hash = hasher.hexdigest()
+        if content_hash == persdata.get('content-hash'):
+            logger.log('content hash not changed: {}'.format(content_hash))
+            return False
+
+        persdata['content-hash'] = content_hash
+        logger.log('storing content hash: {}'.format(content_hash))
 
         return True
@@ -16,26 +16,45 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import re
 import shutil
 
+from repology.changedpaths import ChangedPaths
 from repology.fetchers import PersistentDirFetcher
+from repology.fetchers.telemetry import record_command, record_download
 from repology.logger import Logger
 from repology.subprocess import Runner
 
 
+_RECEIVED_UNITS = {'bytes': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3}
+
+
+def _record_git_command(command_time: float, output: str) -> None:
+    record_command(command_time)
+
+    # git reports progress like "Receiving objects: 100% (10/10), 1.50 MiB | 1.00 MiB/s, done.",
+    # repeatedly updating it, so the last report is used
+    if (matches := re.findall('Receiving objects: [^\n\r]*, ([0-9.]+) (bytes|KiB|MiB|GiB)', output)):
+        size, unit = matches[-1]
+        record_download(None, int(float(size) * _RECEIVED_UNITS[unit]), command_time)
+
+
 class GitFetcher(PersistentDirFetcher):
     _url: str
     _branch: str
     _sparse_checkout: list[str] | None
     _timeout_arg: str
     _depth_arg: str | None
+    _filter: str
 
-    def __init__(self, url: str, branch: str = 'master', sparse_checkout: list[str] | None = None, fetch_timeout: int = 600, depth: int | None = 1) -> None:
+    def __init__(self, url: str, branch: str = 'master', sparse_checkout: list[str] | None = None, fetch_timeout: int = 600, depth: int | None = 1, blobless: bool = False) -> None:
         self._url = url
         self._branch = branch
         self._sparse_checkout = sparse_checkout
         self._timeout_arg = str(fetch_timeout)
         self._depth_arg = None if depth is None else f'--depth={depth}'
+        # partial clone, blobs are only fetched when checked out
+        self._filter = 'blob:none' if blobless else ''
 
     def _setup_sparse_checkout(self, statepath: str) -> None:
         sparse_checkout_path = os.path.join(statepath, '.git', 'info', 'sparse-checkout')
@@ -55,16 +74,17 @@ class GitFetcher(PersistentDirFetcher):
             os.fsync(sparse_checkout_file.fileno())
 
     def _do_fetch(self, statepath: str, logger: Logger) -> bool:
-        Runner(logger=logger).run(
+        Runner(logger=logger, on_finish=_record_git_command).run(
             'timeout', self._timeout_arg,
             'git', 'clone', '--progress', '--no-checkout',
             self._depth_arg,
+            f'--filter={self._filter}' if self._filter else None,
             '--branch', self._branch,
             self._url,
             statepath
         )
 
-        r = Runner(logger=logger, cwd=statepath)
+        r = Runner(logger=logger, cwd=statepath, on_finish=_record_git_command)
 
         r.run('git', 'config', 'core.sparsecheckout', 'true')
         self._setup_sparse_checkout(statepath)
@@ -73,10 +93,11 @@ class GitFetcher(PersistentDirFetcher):
         return True
 
     def _do_update(self, statepath: str, logger: Logger) -> bool:
-        r = Runner(logger=logger, cwd=statepath)
+        r = Runner(logger=logger, cwd=statepath, on_finish=_record_git_command)
 
         old_url = r.get('git', 'remote', 'get-url', 'origin').strip()
         old_branch = r.get('git', 'rev-parse', '--abbrev-ref', 'HEAD').strip()
+        old_filter = r.get('git', 'config', '--default', '', '--get', 'remote.origin.partialclonefilter').strip()
 
         need_refetch = False
 
@@ -86,6 +107,9 @@ class GitFetcher(PersistentDirFetcher):
         if old_branch != self._branch:
             logger.log(f'repository branch has changed {old_branch} -> {self._branch}, will clone from scratch')
             need_refetch = True
+        if old_filter != self._filter:
+            logger.log(f'partial clone filter has changed "{old_filter}" -> "{self._filter}", will clone from scratch')
+            need_refetch = True
 
         if need_refetch:
             shutil.rmtree(statepath)
@@ -97,14 +121,32 @@ class GitFetcher(PersistentDirFetcher):
         r.run('git', 'checkout')  # needed for reset to not fail on changed sparse checkout
         self._setup_sparse_checkout(statepath)
         r.run('git', 'reset', '--hard', f'origin/{self._branch}')
-        r.run('git', 'reflog', 'expire', '--expire=0', '--all')
-        r.run('git', 'prune')
 
         new_head = r.get('git', 'rev-parse', 'HEAD').strip()
 
         if new_head == old_head:
             logger.log('HEAD has not changed: {}'.format(new_head))
-            return False
+        else:
+            logger.log('HEAD was updated from {} to {}'.format(old_head, new_head))
+            self._record_changes(statepath, old_head, new_head, r, logger)
 
-        logger.log('HEAD was updated from {} to {}'.format(old_head, new_head))
-        return True
+        r.run('git', 'reflog', 'expire', '--expire=0', '--all')
+        r.run('git', 'prune')
+
+        return new_head != old_head
+
+    def _record_changes(self, statepath: str, old_head: str, new_head: str, r: Runner, logger: Logger) -> None:
+        # must be done before pruning, which removes old HEAD; only
+        # trees are compared, so no blobs are fetched for partial clones
+        changed_paths = [path for path in r.get('git', 'diff', '--name-only', '--no-renames', '-z', old_head, new_head).split('\0') if path]
+
+        logger.log(f'{len(changed_paths)} path(s) changed')
+
+        # fresh clones do not record anything, as these cannot be
+        # compared to previous state; consumers do full processing
+        # if they don't find revision they know of in the history
+        changes = ChangedPaths.load(statepath)
+        if changes is None or changes.get_head() != old_head:
+            changes = ChangedPaths(old_head)
+        changes.add(new_head, changed_paths)
+        changes.save(statepath)
@@ -20,18 +20,23 @@ import xml.etree.ElementTree
 
 from repology.atomic_fs import AtomicFile
 from repology.fetchers import PersistentData, ScratchFileFetcher
-from repology.fetchers.http import do_http, save_http_stream
+from repology.fetchers.http import do_http, get_conditional_headers, save_http_stream, store_validators
 from repology.logger import Logger
+from repology.parsers.compression import TRANSPARENT_COMPRESSIONS
 
 
 class RepodataFetcher(ScratchFileFetcher):
     primary_key = 'primary'
 
-    def __init__(self, url: str, fetch_timeout: int = 60):
+    # whether parser can read compressed state
+    allow_compressed_state = True
+
+    def __init__(self, url: str, fetch_timeout: int = 60, compressed_state: bool = False):
         super(RepodataFetcher, self).__init__(binary=True)
 
         self.url = url
         self.fetch_timeout = fetch_timeout
+        self.compressed_state = compressed_state and self.allow_compressed_state
 
     def _do_fetch(self, statefile: AtomicFile, persdata: PersistentData, logger: Logger) -> bool:
 
@@ -47,8 +52,12 @@ class RepodataFetcher(ScratchFileFetcher):
         # fetch and parse repomd.xml
         repomd_url = baseurl + 'repodata/repomd.xml'
         logger.log('fetching metadata from ' + repomd_url)
-        repomd_content = do_http(repomd_url, check_status=True, timeout=self.fetch_timeout).text
-        repomd = xml.etree.ElementTree.fromstring(repomd_content)
+        repomd_response = do_http(repomd_url, check_status=True, timeout=self.fetch_timeout, headers=get_conditional_headers(persdata, logger, 'repomd-'))
+        if repomd_response.status_code == 304:
+            logger.log('got 304 not modified')
+            return False
+
+        repomd = xml.etree.ElementTree.fromstring(repomd_response.text)
         repomd_elt_primary = repomd.find('{{http://linux.duke.edu/metadata/repo}}data[@type="{}"]'.format(self.primary_key))
         if repomd_elt_primary is None:
             raise RuntimeError('Cannot find <{}> element in repomd.xml'.format(self.primary_key))
@@ -63,6 +72,8 @@ class RepodataFetcher(ScratchFileFetcher):
         else:
             logger.log('no supported checksum', Logger.WARNING)
 
+        store_validators(persdata, repomd_response, logger, 'repomd-')
+
         if checksum == persdata.get('open-checksum'):
             logger.log('checksum not changed: {}'.format(checksum))
             return False
@@ -83,6 +94,10 @@ class RepodataFetcher(ScratchFileFetcher):
         elif repodata_url.endswith('zst'):
             compression = 'zstd'
 
+        if self.compressed_state and compression in TRANSPARENT_COMPRESSIONS:
+            logger.log(f'keeping state {compression} compressed')
+            compression = None
+
         logger.log('fetching {}'.format(repodata_url))
 
         save_http_stream(repodata_url, statefile.get_file(), compression=compression, timeout=self.fetch_timeout, headers={'Accept-Encoding': None})
@@ -98,3 +113,6 @@ class RepodataFetcher(ScratchFileFetcher):
 
 class RepodataSqliteFetcher(RepodataFetcher):
     primary_key = 'primary_db'
+
+    # sqlite database must be decompressed
+    allow_compressed_state = False
@@ -15,49 +15,86 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-import os
+import fnmatch
+import io
+import tarfile
+
+import xxhash
 
 from repology.atomic_fs import AtomicDir
 from repology.fetchers import PersistentData, ScratchDirFetcher
-from repology.fetchers.http import NotModifiedException, save_http_stream
+from repology.fetchers.http import NotModifiedException, get_conditional_headers, open_http_stream, store_validators
+from repology.fetchers.telemetry import record_write
 from repology.logger import Logger
-from repology.subprocess import run_subprocess
 
 
 class TarFetcher(ScratchDirFetcher):
-    def __init__(self, url: str, fetch_timeout: int = 60) -> None:
+    """Fetches and extracts a (possibly compressed) tarball.
+
+    Archive is decompressed and extracted while being downloaded,
+    without being stored on disk. If its content hash turns out to
+    be unchanged, extracted state is discarded.
+
+    Members matching exclude patterns are skipped, as well as unsafe
+    ones (absolute paths, links pointing outside of the state, device
+    files), which are reported as warnings. Ownership is not preserved,
+    and files and dirs are made readable (as archives may contain
+    non-readable ones, e.g. blackarch), other mode bits are kept.
+    """
+
+    def __init__(self, url: str, fetch_timeout: int = 60, exclude: list[str] | None = None) -> None:
         self.url = url
         self.fetch_timeout = fetch_timeout
+        self.exclude = exclude or []
 
-    def _do_fetch(self, statedir: AtomicDir, persdata: PersistentData, logger: Logger) -> bool:
-        tarpath = os.path.join(statedir.get_path(), '.temporary.tar')
+    def _filter_member(self, member: tarfile.TarInfo, path: str, logger: Logger) -> tarfile.TarInfo | None:
+        if any(fnmatch.fnmatchcase(member.name, pattern) for pattern in self.exclude):
+            return None
+
+        try:
+            res = tarfile.data_filter(member, path)
+        except tarfile.FilterError as e:
+            logger.log('skipping unsafe member: {}'.format(e), severity=Logger.WARNING)
+            return None
 
-        headers = {}
+        return res.replace(mode=(res.mode or 0) | (0o755 if res.isdir() else 0o644), deep=False)
 
-        if persdata.get('last-modified'):
-            headers['if-modified-since'] = persdata.get('last-modified')
-            logger.log('using if-modified-since: {}'.format(headers['if-modified-since']))
+    def _do_fetch(self, statedir: AtomicDir, persdata: PersistentData, logger: Logger) -> bool:
+        headers = get_conditional_headers(persdata, logger)
 
         logger.log('fetching {}'.format(self.url))
 
+        hasher = xxhash.xxh3_64()
+
         try:
-            with open(tarpath, 'wb') as tarfile:
-                response = save_http_stream(self.url, tarfile, headers=headers, timeout=self.fetch_timeout)
+            stream = open_http_stream(self.url, 'auto', hasher=hasher, headers=headers, timeout=self.fetch_timeout)
         except NotModifiedException:
             logger.log('got 304 not modified')
             return False
 
-        # XXX: may be unportable, FreeBSD tar automatically handles compression type,
-        # may not be the case on linuxes
-        # XXX: this extracts tarball permissions, which is not desirable and it may
-        # produce non-readable files and dirs (blackarch). GNU tar has --mode, BSD tar
-        # lacks this. We should probably require GNU tar, and handle binary name which
-        # may differ on BSD.
-        run_subprocess(['tar', '-x', '-z', '-f', tarpath, '-C', statedir.get_path()], logger)
-        os.remove(tarpath)
-
-        if response.headers.get('last-modified'):
-            persdata['last-modified'] = response.headers['last-modified']
-            logger.log('storing last-modified: {}'.format(persdata['last-modified']))
+        with stream:
+            with tarfile.open(fileobj=stream, mode='r|') as tar:
+                for member in tar:
+                    if (filtered := self._filter_member(member, statedir.get_path(), logger)) is not None:
+                        tar.extract(filtered, statedir.get_path(), filter='fully_trusted')
+                        if filtered.isfile():
+                            record_write(filtered.size)
+
+            # consume possible trailing data, so it's accounted in the hash
+            while stream.read(io.DEFAULT_BUFFER_SIZE):
+                pass
+
+        store_validators(persdata, stream.response, logger)
+
+        # many servers ignore conditional requests, so also detect
+        # unchanged content by its hash; as the archive is extracted
+        # on the fly, extracted state is discarded in this case
+        content_hash = hasher.hexdigest()
+        if content_hash == persdata.get('content-hash'):
+            logger.log('content hash not changed: {}'.format(content_hash))
+            return False
+
+        persdata['content-hash'] = content_hash
+        logger.log('storing content hash: {}'.format(content_hash))
 
         return True
@@ -0,0 +1,173 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import threading
+import time
+from typing import Any, Iterator
+
+import requests
+
+from repology.atomic_fs import AtomicFile
+
+
+__all__ = ['HostHealth', 'HostHealthTracker', 'HostUnavailableException']
+
+
+# number of recent latencies kept per host
+_MAX_LATENCIES = 100
+
+# number of latencies needed to derive timeout from
+_MIN_LATENCIES = 10
+
+_LATENCY_PERCENTILE = 0.95
+
+
+class HostUnavailableException(requests.RequestException):
+    pass
+
+
+class HostHealth:
+    __slots__ = ['latencies', 'failures', 'trips', 'open_until']
+
+    latencies: list[float]
+    failures: int
+    trips: int
+    open_until: float
+
+    def __init__(self) -> None:
+        self.latencies = []
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0
+
+    def get_latency_percentile(self, percentile: float) -> float | None:
+        if len(self.latencies) < _MIN_LATENCIES:
+            return None
+
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def serialize(self) -> dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def deserialize(cls, data: dict[str, Any]) -> 'HostHealth':
+        res = cls()
+        for slot in cls.__slots__:
+            setattr(res, slot, data[slot])
+        return res
+
+
+class HostHealthTracker:
+    """Tracker of per-host request latencies and failures.
+
+    Implements circuit breaker: after failure_threshold consecutive
+    failures (connection errors, timeouts and 5xx replies) requests
+    to the host fail right away for a cooldown period, which doubles
+    each time the host fails again after it. The first request
+    after the cooldown is let through, and closes the circuit if
+    it succeeds.
+
+    Also derives adaptive timeouts from observed latencies: once
+    enough of them are known, timeout for the host is reduced
+    to timeout_factor times 95th percentile of its latency (but not
+    below min_timeout), so a host which has become unresponsive
+    is detected sooner than the configured fetch timeout.
+
+    Statistics may be saved and loaded, so they persist across runs.
+    """
+
+    _failure_threshold: int
+    _cooldown: float
+    _max_cooldown: float
+    _min_timeout: float
+    _timeout_factor: float
+    _hosts: dict[str, HostHealth]
+    _lock: threading.Lock
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 600, max_cooldown: float = 86400, min_timeout: float = 10, timeout_factor: float = 4) -> None:
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._min_timeout = min_timeout
+        self._timeout_factor = timeout_factor
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get_host(self, host: str) -> HostHealth:
+        if (health := self._hosts.get(host)) is None:
+            health = self._hosts[host] = HostHealth()
+        return health
+
+    def check(self, host: str) -> None:
+        """Fail if the circuit for the host is open."""
+        with self._lock:
+            health = self._get_host(host)
+            if (remaining := health.open_until - time.time()) > 0:
+                raise HostUnavailableException(f'{host} is unavailable after {health.failures} consecutive failure(s), not retrying for {remaining:.0f}s')
+
+    def get_timeout(self, host: str, timeout: float | None) -> float | None:
+        with self._lock:
+            latency = self._get_host(host).get_latency_percentile(_LATENCY_PERCENTILE)
+
+        if timeout is None or latency is None:
+            return timeout
+
+        return min(timeout, max(self._min_timeout, latency * self._timeout_factor))
+
+    def record_success(self, host: str, latency: float) -> None:
+        with self._lock:
+            health = self._get_host(host)
+            health.latencies.append(latency)
+            del health.latencies[:-_MAX_LATENCIES]
+            health.failures = 0
+            health.trips = 0
+            health.open_until = 0
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            health = self._get_host(host)
+            health.failures += 1
+
+            if health.failures >= self._failure_threshold:
+                health.open_until = time.time() + min(self._max_cooldown, self._cooldown * 2 ** health.trips)
+                health.trips += 1
+
+    def iter_unavailable(self) -> Iterator[tuple[str, HostHealth]]:
+        now = time.time()
+        with self._lock:
+            for host, health in sorted(self._hosts.items()):
+                if health.open_until > now:
+                    yield host, health
+
+    def load(self, path: str) -> None:
+        try:
+            with open(path, encoding='utf-8') as healthfile:
+                data = json.load(healthfile)
+        except (FileNotFoundError, ValueError):
+            return
+
+        with self._lock:
+            self._hosts = {host: HostHealth.deserialize(health) for host, health in data.items()}
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {host: health.serialize() for host, health in self._hosts.items()}
+
+        with AtomicFile(path, 'w', encoding='utf-8') as healthfile:
+            json.dump(data, healthfile.get_file())
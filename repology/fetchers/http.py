@@ -16,38 +16,218 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 import bz2
-import contextlib
 import functools
-import gzip
+import io
 import lzma
-import tempfile
+import os
+import re
+import threading
 import time
-from json import dumps
-from typing import Any, AnyStr, Callable, IO, cast
+import zlib
+from json import dump, dumps, load
+from typing import Any, AnyStr, Callable, IO, Iterator, Protocol, cast
+from urllib.parse import urlsplit
 
 import brotli
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
 import zstandard
 
 from repology.config import config
+from repology.fetchers import PersistentData
+from repology.fetchers.hosthealth import HostHealthTracker
+from repology.fetchers.httpcache import HTTPCache
+from repology.fetchers.telemetry import iter_response_content, record_download, record_request, record_write
+from repology.logger import Logger
+from repology.parsers.compression import MAGIC_SIZE, detect_compression_by_magic
 
 USER_AGENT = 'repology-fetcher/0 (+{}/docs/bots)'.format(config['REPOLOGY_HOME'])
-STREAM_CHUNK_SIZE = 10240
+STREAM_CHUNK_SIZE = 65536
+
+
+class HostStats:
+    __slots__ = ['requests', 'connections_opened']
+
+    requests: int
+    connections_opened: int
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return self.requests - self.connections_opened
+
+
+def _make_counting_pool_classes(stats: dict[str, HostStats]) -> dict[str, type[HTTPConnectionPool]]:
+    # connections may be reestablished by urllib3 without creating
+    # new connection objects, so count actual connects and requests
+    # on connection level
+    def get_host_stats(connection: HTTPConnection) -> HostStats:
+        host = f'{connection.host}:{connection.port}'
+        if (host_stats := stats.get(host)) is None:
+            host_stats = stats[host] = HostStats()
+        return host_stats
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self) -> None:
+            get_host_stats(self).connections_opened += 1
+            super().connect()
+
+        def request(self, *args: Any, **kwargs: Any) -> None:
+            get_host_stats(self).requests += 1
+            super().request(*args, **kwargs)
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self) -> None:
+            get_host_stats(self).connections_opened += 1
+            super().connect()
+
+        def request(self, *args: Any, **kwargs: Any) -> None:
+            get_host_stats(self).requests += 1
+            super().request(*args, **kwargs)
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    _pool_classes: dict[str, type[HTTPConnectionPool]]
+
+    def __init__(self, pool_classes: dict[str, type[HTTPConnectionPool]], **kwargs: Any) -> None:
+        self._pool_classes = pool_classes
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+
+class HTTPSessionPool:
+    """Pool of keep-alive HTTP sessions, one per host.
+
+    Sessions keep connections open between requests, so fetchers
+    which do many requests to the same host (such as paginated API
+    fetchers) do not have to do TCP and TLS handshakes every time.
+    """
+
+    _pool_size: int
+    _keep_alive: bool
+    _sessions: dict[str, requests.Session]
+    _stats: dict[str, HostStats]
+    _pool_classes: dict[str, type[HTTPConnectionPool]]
+    _lock: threading.Lock
+
+    def __init__(self, pool_size: int = 4, keep_alive: bool = True) -> None:
+        self._pool_size = pool_size
+        self._keep_alive = keep_alive
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._pool_classes = _make_counting_pool_classes(self._stats)
+
+    def get_session(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc.lower()
+
+        with self._lock:
+            if (session := self._sessions.get(host)) is None:
+                session = self._sessions[host] = requests.Session()
+
+                adapter = _CountingHTTPAdapter(self._pool_classes, pool_maxsize=self._pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                if not self._keep_alive:
+                    session.headers['Connection'] = 'close'
+
+        return session
+
+    def get_stats(self) -> dict[str, HostStats]:
+        """Return request and connection counts, keyed by host:port actually connected to."""
+        return self._stats
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+
+_session_pool = HTTPSessionPool(config['HTTP_POOL_SIZE'], config['HTTP_KEEP_ALIVE'])
+
+
+def get_session_pool() -> HTTPSessionPool:
+    return _session_pool
+
+
+_http_cache = HTTPCache(config['HTTP_CACHE_DIR'], config['HTTP_CACHE_SIZE'], config['HTTP_CACHE_OFFLINE'], config['HTTP_CACHE_MAX_BODY_SIZE']) if config['HTTP_CACHE_DIR'] else None
+
+
+def get_http_cache() -> HTTPCache | None:
+    return _http_cache
+
+
+_host_health = HostHealthTracker(config['HTTP_CIRCUIT_BREAKER_THRESHOLD'], config['HTTP_CIRCUIT_BREAKER_COOLDOWN'], min_timeout=config['HTTP_MIN_ADAPTIVE_TIMEOUT'])
+
+
+def get_host_health() -> HostHealthTracker:
+    return _host_health
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter."""
+
+    _rate: float
+    _capacity: float
+    _tokens: float
+    _last: float
+    _lock: threading.Lock
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        # lock is held while sleeping, so waiting callers are
+        # served one by one
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self._rate)
+                self._tokens = 1
+                self._last = time.monotonic()
+
+            self._tokens -= 1
 
 
 class PoliteHTTP:
-    def __init__(self, timeout: int = 5, delay: int | None = None):
+    def __init__(self, timeout: int = 5, delay: float | None = None):
         self.do_http = functools.partial(do_http, timeout=timeout)
         self.delay = delay
-        self.had_requests = False
+        self.bucket = TokenBucket(1 / delay) if delay else None
 
     def __call__(self, *args: Any, **kwargs: Any) -> requests.Response:
-        if self.had_requests and self.delay:
-            time.sleep(self.delay)
+        # this may be called from multiple threads, so the delay
+        # is enforced with a token bucket
+        if self.bucket is not None:
+            self.bucket.acquire()
 
-        self.had_requests = True
         return self.do_http(*args, **kwargs)
 
 
@@ -68,16 +248,50 @@ def do_http(url: str,
     if json and not data:
         data = dumps(json)
 
-    request: Callable[..., requests.Response] = requests.get
+    if method is None:
+        method = 'POST' if data else 'GET'
+
+    session = _session_pool.get_session(url)
+    host = urlsplit(url).netloc.lower()
+
+    def send(request_headers: dict[str, str], stream: bool) -> requests.Response:
+        _host_health.check(host)
+
+        start = time.monotonic()
+
+        try:
+            response = session.request(method, url, headers=request_headers, timeout=_host_health.get_timeout(host, timeout), data=data, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            _host_health.record_failure(host)
+            raise
+
+        if response.status_code >= 500:
+            _host_health.record_failure(host)
+        else:
+            _host_health.record_success(host, response.elapsed.total_seconds())
+
+        record_request(host, response.elapsed.total_seconds(), response.status_code == 304)
+
+        # non-streamed body is already read by requests
+        if not stream:
+            record_download(host, response.raw.tell(), time.monotonic() - start - response.elapsed.total_seconds())
+
+        return response
+
+    # range requests are used to resume downloads, and are not cached;
+    # bodies too large for the cache are passed through by it as is
+    if _http_cache is not None and method == 'GET' and not data and not any(name.lower() == 'range' for name in headers):
+        response = _http_cache.request(url, headers, lambda request_headers: send(request_headers, True))
 
-    if method == 'POST' or (method is None and data):
-        request = requests.post
-    elif method == 'DELETE':
-        request = requests.delete
-    elif method == 'PUT':
-        request = requests.put
+        # load body right away, as requests does for non-streamed requests
+        if not stream:
+            response.content
+    else:
+        response = send(headers, stream)
 
-    response = request(url, headers=headers, timeout=timeout, data=data, stream=stream)
+    # sessions are shared between unrelated requests,
+    # so don't let cookies leak from one to another
+    session.cookies.clear()
 
     if check_status:
         response.raise_for_status()
@@ -89,55 +303,433 @@ class NotModifiedException(requests.RequestException):
     pass
 
 
-def save_http_stream(url: str, outfile: IO[AnyStr], compression: str | None = None, **kwargs: Any) -> requests.Response:
-    # TODO: we should really decompress stream on the fly or
-    # (better) store it as is and decompress when reading.
+_VALIDATOR_HEADERS = [
+    ('etag', 'if-none-match'),
+    ('last-modified', 'if-modified-since'),
+]
+
+
+def get_conditional_headers(persdata: PersistentData, logger: Logger, prefix: str = '') -> dict[str, str]:
+    """Produce conditional request headers from validators stored in persdata.
+
+    Prefix allows to keep validators for multiple resources
+    fetched by a single fetcher.
+    """
+    headers = {}
+
+    for validator, header in _VALIDATOR_HEADERS:
+        if value := persdata.get(prefix + validator):
+            headers[header] = value
+            logger.log(f'using {header}: {value}')
+
+    return headers
+
+
+def store_validators(persdata: PersistentData, response: requests.Response, logger: Logger, prefix: str = '') -> None:
+    """Store validators from response into persdata for subsequent conditional requests."""
+    for validator, _ in _VALIDATOR_HEADERS:
+        if value := response.headers.get(validator):
+            persdata[prefix + validator] = value
+            logger.log(f'storing {validator}: {value}')
+        else:
+            persdata.pop(prefix + validator, None)
+
+
+class _BrotliDecompressor:
+    _decompressor: brotli.Decompressor
+
+    def __init__(self) -> None:
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return cast(bytes, self._decompressor.process(data))
+
+    @property
+    def eof(self) -> bool:
+        return cast(bool, self._decompressor.is_finished())
+
+    @property
+    def unused_data(self) -> bytes:
+        return b''
+
+
+class _Decompressor(Protocol):
+    @property
+    def eof(self) -> bool:
+        pass
+
+    @property
+    def unused_data(self) -> bytes:
+        pass
+
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+
+_DECOMPRESSOR_FACTORIES: dict[str, Callable[[], _Decompressor]] = {
+    'gz': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    'xz': lzma.LZMADecompressor,
+    'bz2': bz2.BZ2Decompressor,
+    'br': _BrotliDecompressor,
+    'zstd': lambda: zstandard.ZstdDecompressor().decompressobj(),
+}
+
 
+class _StreamDecompressor:
+    """Incremental decompressor which handles concatenated streams.
+
+    Like gzip.open() and friends, continues decompressing after the
+    end of a stream if more data follows (multi-member gzip files,
+    multi-stream xz and bzip2 files, multiple zstd frames).
+    """
+
+    _factory: Callable[[], _Decompressor]
+    _decompressor: _Decompressor
+    _compression: str
+    _started: bool
+
+    def __init__(self, compression: str) -> None:
+        if compression not in _DECOMPRESSOR_FACTORIES:
+            raise ValueError('Unsupported compression {}'.format(compression))
+
+        self._factory = _DECOMPRESSOR_FACTORIES[compression]
+        self._decompressor = self._factory()
+        self._compression = compression
+        self._started = False
+
+    def decompress(self, data: bytes) -> bytes:
+        res = []
+
+        while data:
+            self._started = True
+            res.append(self._decompressor.decompress(data))
+
+            if not self._decompressor.eof:
+                break
+
+            data = self._decompressor.unused_data
+            if self._compression == 'gz':
+                # gzip files may be padded with zeroes
+                data = data.lstrip(b'\0')
+
+            if data:
+                self._decompressor = self._factory()
+
+        return b''.join(res)
+
+    def finish(self) -> None:
+        if self._started and not self._decompressor.eof:
+            raise EOFError('Compressed file ended before the end-of-stream marker was reached')
+
+
+class ContentHasher(Protocol):
+    def update(self, data: bytes, /) -> None:
+        pass
+
+
+class HTTPStream(io.RawIOBase):
+    """Readable binary file object over a streamed HTTP response body.
+
+    Allows to process data as it is being downloaded by consumers
+    which expect a file, such as tarfile in stream mode. Data is
+    decompressed on the fly if compression is specified ('auto'
+    detects it by magic number), and fed into the hasher before
+    decompression.
+    """
+
+    response: requests.Response
+    _chunks: Iterator[bytes]
+    _compression: str | None
+    _decompressor: _StreamDecompressor | None
+    _hasher: ContentHasher | None
+    _buffer: memoryview
+
+    def __init__(self, response: requests.Response, compression: str | None = None, hasher: ContentHasher | None = None) -> None:
+        self.response = response
+        self._chunks = iter_response_content(response, STREAM_CHUNK_SIZE)
+        self._compression = compression
+        self._decompressor = _StreamDecompressor(compression) if compression not in (None, 'auto') else None
+        self._hasher = hasher
+        self._buffer = memoryview(b'')
+
+    def _read_chunk(self) -> bytes | None:
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            return None
+
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+
+        return chunk
+
+    def _detect_compression(self) -> bytes:
+        head = b''
+        while len(head) < MAGIC_SIZE and (chunk := self._read_chunk()) is not None:
+            head += chunk
+
+        if (compression := detect_compression_by_magic(head)) is not None:
+            self._decompressor = _StreamDecompressor(compression)
+
+        self._compression = compression
+        return head
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._buffer:
+            if self._compression == 'auto':
+                chunk: bytes | None = self._detect_compression()
+            else:
+                chunk = self._read_chunk()
+
+            if chunk is None:
+                if self._decompressor is not None:
+                    self._decompressor.finish()
+                return 0
+
+            if self._decompressor is not None:
+                chunk = self._decompressor.decompress(chunk)
+
+            self._buffer = memoryview(chunk)
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        self.response.close()
+        super().close()
+
+
+def open_http_stream(url: str, compression: str | None = None, hasher: ContentHasher | None = None, **kwargs: Any) -> HTTPStream:
+    """Request URL and return its body as a readable stream."""
     kwargs = kwargs.copy()
     kwargs.update(stream=True)
 
     response = do_http(url, **kwargs)
 
     if response.status_code == 304:
+        response.close()
         raise NotModifiedException(response=response)
 
-    # no compression, just save to output
-    if compression is None:
-        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
-            outfile.write(chunk)
+    return HTTPStream(response, compression, hasher)
+
+
+class _ResumeInfo:
+    """Resumption state of a download."""
+
+    __slots__ = ['validator', 'total']
+
+    validator: str | None
+    total: int | None
+
+    def __init__(self, response: requests.Response) -> None:
+        self.validator = None
+        self.total = None
+
+        # offsets are meaningless if content is transparently decoded
+        if response.headers.get('content-encoding', 'identity') != 'identity':
+            return
+
+        if response.status_code == 206:
+            if (match := re.fullmatch('bytes [0-9]+-[0-9]+/([0-9]+)', response.headers.get('content-range', ''))):
+                self.total = int(match.group(1))
+        elif 'content-length' in response.headers:
+            self.total = int(response.headers['content-length'])
+
+        if response.status_code != 206 and response.headers.get('accept-ranges') != 'bytes':
+            return
+
+        # weak etags cannot be used in If-Range
+        if (etag := response.headers.get('etag')) and not etag.startswith('W/'):
+            self.validator = etag
+        elif last_modified := response.headers.get('last-modified'):
+            self.validator = last_modified
+
+
+def _load_partial_validator(validator_path: str, url: str) -> str | None:
+    try:
+        with open(validator_path, encoding='utf-8') as validatorfile:
+            saved = load(validatorfile)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    return cast(str, saved['validator']) if saved.get('url') == url else None
+
+
+def _save_partial_validator(validator_path: str, url: str, validator: str | None) -> None:
+    if validator is None:
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+        return
+
+    with open(validator_path, 'w', encoding='utf-8') as validatorfile:
+        dump({'url': url, 'validator': validator}, validatorfile)
+
+
+def _get_content_range_start(response: requests.Response) -> int | None:
+    if (match := re.fullmatch('bytes ([0-9]+)-[0-9]+/[0-9]+', response.headers.get('content-range', ''))):
+        return int(match.group(1))
+    return None
+
+
+def _is_new_file(outfile: IO[AnyStr]) -> bool:
+    return isinstance(outfile, io.BufferedWriter) and isinstance(outfile.name, str) and outfile.tell() == 0
+
+
+def _replace_file(outfile: IO[AnyStr], path: str) -> None:
+    """Move file at path in place of outfile, without copying its data.
+
+    outfile ends up referring to the moved file, positioned at its end.
+    """
+    os.replace(path, outfile.name)
+
+    fd = os.open(outfile.name, os.O_WRONLY)
+    try:
+        os.dup2(fd, outfile.fileno())
+    finally:
+        os.close(fd)
+
+    outfile.seek(0, os.SEEK_END)
+
+
+def save_http_stream(url: str,
+                     outfile: IO[AnyStr],
+                     compression: str | None = None,
+                     hasher: ContentHasher | None = None,
+                     partial_path: str | None = None,
+                     max_resumes: int = 5,
+                     **kwargs: Any) -> requests.Response:
+    """Save HTTP response body into a file.
+
+    Data is decompressed on the fly if compression is specified,
+    and fed into the hasher after decompression.
+
+    If partial_path is specified, raw data is downloaded there instead,
+    along with its validator (ETag or Last-Modified), so if the
+    connection is dropped, download is resumed with Range requests,
+    both in the same call (up to max_resumes times) and on the next
+    call with the same partial_path. Resumption is only possible if
+    the server supports ranges and does not use content encoding.
+    Size of complete download is verified against Content-Length
+    (or Content-Range), after which the data is decompressed into
+    outfile (or, if not compressed, the partial file itself is moved
+    in place of outfile when possible). Partial data is removed once
+    the download is complete or turns out to be corrupt.
+    """
+    kwargs = kwargs.copy()
+    kwargs.update(stream=True)
+
+    decompressor = _StreamDecompressor(compression) if compression is not None else None
+
+    def consume(chunk: bytes) -> None:
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        outfile.write(chunk)  # type: ignore
+        record_write(len(chunk))
+
+    if partial_path is None:
+        response = do_http(url, **kwargs)
+
+        if response.status_code == 304:
+            raise NotModifiedException(response=response)
+
+        # decompress on the fly, so data is written in a single pass
+        for chunk in iter_response_content(response, STREAM_CHUNK_SIZE):
+            consume(chunk)
+
+        if decompressor is not None:
+            decompressor.finish()
+
         return response
 
-    # read into temp file, then decompress into output
-    with tempfile.NamedTemporaryFile() as temp:
-        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
-            temp.write(chunk)
-
-        temp.seek(0)
-
-        with contextlib.ExitStack() as stack:
-            class _BrotliDecompress:
-                def read(self, size: int) -> bytes:
-                    return cast(bytes, brotli.process(temp.read(size)))
-
-            decompressor: gzip.GzipFile | lzma.LZMAFile | bz2.BZ2File | '_BrotliDecompress' | zstandard.ZstdDecompressionReader
-
-            if compression == 'gz':
-                decompressor = stack.enter_context(gzip.open(temp))
-            elif compression == 'xz':
-                decompressor = stack.enter_context(lzma.open(temp))
-            elif compression == 'bz2':
-                decompressor = stack.enter_context(bz2.open(temp))
-            elif compression == 'br':
-                decompressor = _BrotliDecompress()
-            elif compression == 'zstd':
-                decompressor = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(temp))
-            else:
-                raise ValueError('Unsupported compression {}'.format(compression))
+    validator_path = partial_path + '.validator'
+    validator = _load_partial_validator(validator_path, url) if os.path.exists(partial_path) else None
+    check_status = kwargs.pop('check_status', True)
+    headers = kwargs.pop('headers', None) or {}
+
+    with open(partial_path, 'ab' if validator is not None else 'wb') as partial:
+        received = partial.tell()
+        num_resumes = 0
+
+        while True:
+            request_headers = headers.copy()
+            if validator is not None and received:
+                request_headers['range'] = f'bytes={received}-'
+                request_headers['if-range'] = validator
+
+            response = do_http(url, check_status=False, headers=request_headers, **kwargs)
 
-            while True:
-                chunk = decompressor.read(STREAM_CHUNK_SIZE)
-                if not chunk:
-                    break
-                outfile.write(chunk)  # type: ignore
+            if response.status_code == 416:
+                # saved partial data is not valid for the resource anymore
+                partial.truncate(0)
+                received = 0
+                validator = None
+                continue
+
+            if check_status:
+                response.raise_for_status()
+
+            if response.status_code == 304:
+                raise NotModifiedException(response=response)
+
+            resume_info = _ResumeInfo(response)
+
+            if response.status_code == 206:
+                if _get_content_range_start(response) != received:
+                    raise RuntimeError('unexpected Content-Range in response: {}'.format(response.headers.get('content-range')))
+            else:
+                # nothing is consumed until the download is complete,
+                # so it's safe to start over if the resource has changed
+                partial.truncate(0)
+                received = 0
+                validator = resume_info.validator
+                _save_partial_validator(validator_path, url, validator)
+
+            try:
+                for chunk in iter_response_content(response, STREAM_CHUNK_SIZE):
+                    partial.write(chunk)
+                    received += len(chunk)
+                    record_write(len(chunk))
+
+                if resume_info.total is not None and received < resume_info.total:
+                    raise requests.ConnectionError(f'connection closed after {received} of {resume_info.total} bytes')
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                if validator is None or num_resumes >= max_resumes:
+                    raise
+
+                partial.flush()
+                num_resumes += 1
+                continue
+
+            break
+
+    try:
+        if resume_info.total is not None and received != resume_info.total:
+            raise RuntimeError(f'size mismatch: got {received} byte(s), expected {resume_info.total}')
+
+        if decompressor is None and _is_new_file(outfile):
+            if hasher is not None:
+                with open(partial_path, 'rb') as datafile:
+                    while chunk := datafile.read(STREAM_CHUNK_SIZE):
+                        hasher.update(chunk)
+            _replace_file(outfile, partial_path)
+        else:
+            with open(partial_path, 'rb') as datafile:
+                while chunk := datafile.read(STREAM_CHUNK_SIZE):
+                    consume(chunk)
+
+            if decompressor is not None:
+                decompressor.finish()
+    finally:
+        # either complete or corrupt, so no point in keeping it
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        _save_partial_validator(validator_path, url, None)
 
     return response
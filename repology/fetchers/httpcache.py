@@ -0,0 +1,349 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Callable, Self
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import xxhash
+
+from repology.atomic_fs import AtomicFile
+from repology.fetchers.telemetry import iter_response_content
+
+
+__all__ = ['HTTPCache']
+
+
+_CHUNK_SIZE = 65536
+
+# response headers which describe the body as transferred, and
+# are meaningless for the stored (decoded) body
+_SKIPPED_HEADERS = frozenset(['connection', 'content-encoding', 'content-length', 'keep-alive', 'set-cookie', 'transfer-encoding'])
+
+_VALIDATORS = [
+    ('etag', 'if-none-match'),
+    ('last-modified', 'if-modified-since'),
+]
+
+
+def _get_expiration(headers: CaseInsensitiveDict[str], now: float) -> float | None:
+    """Return time until which a response is fresh, or None if it has to be revalidated."""
+    cache_control = headers.get('cache-control', '').lower()
+
+    if 'no-cache' in cache_control:
+        return None
+
+    if (match := re.search('max-age=([0-9]+)', cache_control)):
+        age = int(headers['age']) if headers.get('age', '').isdecimal() else 0
+        return now + int(match.group(1)) - age
+
+    if (expires := headers.get('expires')):
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    return None
+
+
+def _is_cacheable(response: requests.Response) -> bool:
+    if response.status_code != 200:
+        return False
+
+    if 'no-store' in response.headers.get('cache-control', '').lower():
+        return False
+
+    # responses varying on request headers other than handled
+    # by requests itself are not distinguished in the cache
+    vary = {field.strip().lower() for field in response.headers.get('vary', '').split(',')} - {'', 'accept-encoding'}
+
+    return not vary
+
+
+class _Entry:
+    __slots__ = ['url', 'headers', 'body', 'size', 'expires']
+
+    url: str
+    headers: dict[str, str]
+    body: str
+    size: int
+    expires: float | None
+
+    def __init__(self, url: str, headers: dict[str, str], body: str, size: int, expires: float | None) -> None:
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.size = size
+        self.expires = expires
+
+    @classmethod
+    def load(cls, path: str) -> Self | None:
+        try:
+            with open(path, encoding='utf-8') as entryfile:
+                return cls(**json.load(entryfile))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        with AtomicFile(path, 'w', encoding='utf-8') as entryfile:
+            json.dump({slot: getattr(self, slot) for slot in self.__slots__}, entryfile.get_file())
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires is not None and now < self.expires
+
+    def matches(self, headers: CaseInsensitiveDict[str]) -> bool:
+        """Check whether the entry satisfies conditional request headers."""
+        return any(
+            header in headers and self.headers.get(validator) == headers[header]
+            for validator, header in _VALIDATORS
+        )
+
+
+class HTTPCache:
+    """Shared on-disk cache of HTTP responses.
+
+    Bodies are stored under their content hashes, so the same file
+    served under different URLs is only stored once, and entries
+    are keyed by URL (and Accept header). Fresh entries (according
+    to Cache-Control or Expires) are served without a request, and
+    stale ones are revalidated with conditional requests. When total
+    size of stored bodies exceeds max_size, least recently used
+    entries are evicted. Bodies larger than max_body_size are passed
+    through without being stored.
+
+    In offline mode, all stored entries are served regardless of
+    freshness, and requests for missing ones fail, which allows to
+    rerun fetchers from cache, e.g. for benchmarking.
+
+    Only plain GET requests are cached, and bodies are stored with
+    content encoding (but not compression of the file itself)
+    already decoded.
+    """
+
+    _path: str
+    _max_size: int
+    _max_body_size: int
+    _offline: bool
+    _lock: threading.Lock
+    _total_size: int
+
+    def __init__(self, path: str, max_size: int = 1024 * 1024 * 1024, offline: bool = False, max_body_size: int = 64 * 1024 * 1024) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._max_body_size = min(max_body_size, max_size)
+        self._offline = offline
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(path, 'index'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'data'), exist_ok=True)
+
+        # maintained in memory, and only recalculated on eviction,
+        # as the cache may be shared with other processes
+        self._total_size = self.get_size()
+
+    def _get_entry_path(self, url: str, headers: CaseInsensitiveDict[str]) -> str:
+        key = xxhash.xxh3_128(url.encode('utf-8') + b'\0' + headers.get('accept', '').encode('utf-8')).hexdigest()
+        return os.path.join(self._path, 'index', key)
+
+    def _get_body_path(self, body: str) -> str:
+        return os.path.join(self._path, 'data', body)
+
+    def _make_response(self, entry: _Entry, status_code: int = 200) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.reason = 'OK' if status_code == 200 else 'Not Modified'
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+
+        if status_code == 200:
+            response.headers['content-length'] = str(entry.size)
+            response.raw = open(self._get_body_path(entry.body), 'rb')
+            response.encoding = get_encoding_from_headers(response.headers)
+        else:
+            response.raw = io.BytesIO()
+
+        return response
+
+    def _load(self, entry_path: str) -> _Entry | None:
+        entry = _Entry.load(entry_path)
+
+        # body may have been evicted by another process
+        if entry is None or not os.path.exists(self._get_body_path(entry.body)):
+            return None
+
+        # mark entry as recently used
+        os.utime(entry_path)
+
+        return entry
+
+    def _store(self, entry_path: str, url: str, response: requests.Response, now: float) -> _Entry | requests.Response:
+        """Store response body in the cache.
+
+        If body turns out to be too large to be cached, returns a response
+        which serves the downloaded body without storing it instead.
+        """
+        hasher = xxhash.xxh3_128()
+        size = 0
+
+        # body is downloaded without holding the lock, so concurrent
+        # requests are not serialized
+        fd, incoming_path = tempfile.mkstemp(dir=os.path.join(self._path, 'data'), prefix='.incoming.')
+        try:
+            with os.fdopen(fd, 'wb') as bodyfile:
+                for chunk in iter_response_content(response, _CHUNK_SIZE):
+                    hasher.update(chunk)
+                    bodyfile.write(chunk)
+                    size += len(chunk)
+
+            if size > self._max_body_size:
+                return self._make_uncached_response(response, incoming_path, size)
+
+            body = hasher.hexdigest()
+            headers = {name.lower(): value for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS}
+            entry = _Entry(url, headers, body, size, _get_expiration(response.headers, now))
+
+            with self._lock:
+                # identical body may already be stored
+                if not os.path.exists(self._get_body_path(body)):
+                    self._total_size += size
+                os.replace(incoming_path, self._get_body_path(body))
+                entry.save(entry_path)
+
+                if self._total_size > self._max_size:
+                    self._evict()
+        finally:
+            if os.path.exists(incoming_path):
+                os.remove(incoming_path)
+
+        return entry
+
+    def _make_uncached_response(self, response: requests.Response, path: str, size: int) -> requests.Response:
+        uncached = requests.Response()
+        uncached.status_code = response.status_code
+        uncached.reason = response.reason
+        uncached.url = response.url
+        uncached.headers = CaseInsensitiveDict({name: value for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS})
+        uncached.headers['content-length'] = str(size)
+        uncached.encoding = response.encoding
+
+        # the file is gone as soon as the response is closed
+        uncached.raw = open(path, 'rb')
+        os.remove(path)
+
+        return uncached
+
+    def _evict(self) -> None:
+        index_path = os.path.join(self._path, 'index')
+
+        entries = []
+        for name in os.listdir(index_path):
+            entry_path = os.path.join(index_path, name)
+            if (entry := _Entry.load(entry_path)) is not None:
+                entries.append((os.path.getmtime(entry_path), entry_path, entry))
+
+        sizes = {entry.body: entry.size for _, _, entry in entries}
+        total = sum(sizes.values())
+        self._total_size = total
+        if total <= self._max_size:
+            return
+
+        refcounts = Counter(entry.body for _, _, entry in entries)
+
+        for _, entry_path, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self._max_size:
+                break
+
+            os.remove(entry_path)
+            refcounts[entry.body] -= 1
+
+            if refcounts[entry.body] == 0:
+                os.remove(self._get_body_path(entry.body))
+                total -= entry.size
+
+        self._total_size = total
+
+    def request(self, url: str, headers: dict[str, str], do_request: Callable[[dict[str, str]], requests.Response]) -> requests.Response:
+        """Perform request through the cache.
+
+        do_request is called with (possibly extended) request headers
+        to perform actual request, and should return a streamed response.
+        """
+        request_headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(headers)
+        entry_path = self._get_entry_path(url, request_headers)
+        now = time.time()
+
+        with self._lock:
+            entry = self._load(entry_path)
+
+        # conditional requests made by the caller itself are answered
+        # with 304 if the entry matches them
+        conditional = any(header in request_headers for _, header in _VALIDATORS)
+
+        if entry is not None and (self._offline or entry.is_fresh(now)):
+            return self._make_response(entry, 304 if conditional and entry.matches(request_headers) else 200)
+
+        if self._offline:
+            raise requests.ConnectionError(f'{url} is not cached, and offline mode is enabled')
+
+        if entry is not None and not conditional:
+            for validator, header in _VALIDATORS:
+                if validator in entry.headers:
+                    request_headers[header] = entry.headers[validator]
+
+        response = do_request(dict(request_headers))
+
+        # with validators supplied by the caller, 304 does not
+        # tell anything about the stored entry unless it matches them
+        if response.status_code == 304 and entry is not None and (not conditional or entry.matches(request_headers)):
+            response.close()
+
+            # revalidated, so the stored body may be used
+            entry.expires = _get_expiration(response.headers, now)
+            with self._lock:
+                entry.save(entry_path)
+
+            return self._make_response(entry, 304 if conditional else 200)
+
+        if not _is_cacheable(response):
+            return response
+
+        # decoded body is never smaller than the encoded one
+        if (length := response.headers.get('content-length', '')).isdecimal() and int(length) > self._max_body_size:
+            return response
+
+        try:
+            stored = self._store(entry_path, url, response, now)
+        finally:
+            response.close()
+
+        return self._make_response(stored) if isinstance(stored, _Entry) else stored
+
+    def get_size(self) -> int:
+        """Return total size of stored bodies, as found on disk."""
+        data_path = os.path.join(self._path, 'data')
+        return sum(os.path.getsize(os.path.join(data_path, name)) for name in os.listdir(data_path) if not name.startswith('.'))
@@ -0,0 +1,147 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+import requests
+
+from repology.atomic_fs import AtomicDir
+from repology.fetchers.http import PoliteHTTP
+from repology.fetchers.telemetry import record_write
+from repology.logger import Logger
+
+
+__all__ = ['PageRequest', 'PaginatedFetch', 'save_page']
+
+
+class PageRequest:
+    __slots__ = ['url', 'kwargs']
+
+    url: str
+    kwargs: dict[str, Any]
+
+    def __init__(self, url: str, **kwargs: Any) -> None:
+        self.url = url
+        self.kwargs = kwargs
+
+
+def _is_retryable(e: requests.RequestException) -> bool:
+    if isinstance(e, requests.HTTPError):
+        return e.response is not None and (e.response.status_code == 429 or e.response.status_code >= 500)
+    return isinstance(e, (requests.ConnectionError, requests.Timeout))
+
+
+class PaginatedFetch:
+    """Engine for fetching paginated APIs.
+
+    Supports two kinds of pagination: sequential, where URL of the
+    next page is only known from the current one (cursors, scroll
+    ids, next links), and offset based, where any page URL may be
+    computed up front. In the latter case, up to concurrency pages
+    are fetched in parallel. In both cases pages are returned in
+    order, rate limits of PoliteHTTP are respected, and failed
+    requests (connection errors, timeouts, 429 and 5xx replies) are
+    retried with exponential backoff.
+
+    Sequential pages are simply fetched in the calling thread. With
+    offset based pagination, pages are prefetched in worker threads
+    (retries are done in the calling thread), and all logging happens
+    in the calling thread as well.
+    """
+
+    _do_http: PoliteHTTP
+    _logger: Logger
+    _concurrency: int
+    _max_tries: int
+    _retry_delay: float
+
+    def __init__(self, do_http: PoliteHTTP, logger: Logger, concurrency: int = 1, max_tries: int = 5, retry_delay: float = 5) -> None:
+        self._do_http = do_http
+        self._logger = logger
+        self._concurrency = concurrency
+        self._max_tries = max_tries
+        self._retry_delay = retry_delay
+
+    def _fetch(self, request: PageRequest) -> requests.Response:
+        return self._do_http(request.url, **request.kwargs)
+
+    def _get(self, request: PageRequest, future: 'Future[requests.Response] | None' = None) -> requests.Response:
+        """Get a page, retrying on failures, possibly awaiting an already submitted first try."""
+        num_try = 1
+        while True:
+            try:
+                return future.result() if future is not None else self._fetch(request)
+            except requests.RequestException as e:
+                if not _is_retryable(e) or num_try >= self._max_tries:
+                    raise
+
+                delay = self._retry_delay * 2 ** (num_try - 1)
+                self._logger.log(f'failed to fetch {request.url}: {str(e)}, retrying after {delay}s', Logger.ERROR)
+                time.sleep(delay)
+
+                num_try += 1
+                self._logger.log(f'getting {request.url} (try #{num_try})')
+                future = None
+
+    def iter_sequential(self, request: PageRequest, get_next: Callable[[requests.Response], PageRequest | None]) -> Iterator[requests.Response]:
+        next_request: PageRequest | None = request
+        while next_request is not None:
+            self._logger.log(f'getting {next_request.url}')
+            response = self._get(next_request)
+            yield response
+            next_request = get_next(response)
+
+    def iter_by_offset(self, get_request: Callable[[int], PageRequest], is_last: Callable[[requests.Response], bool]) -> Iterator[requests.Response]:
+        executor = ThreadPoolExecutor(max_workers=self._concurrency)
+        pending: deque[tuple[PageRequest, Future[requests.Response]]] = deque()
+        next_page = 0
+
+        def submit_next_page() -> None:
+            nonlocal next_page
+            request = get_request(next_page)
+            pending.append((request, executor.submit(self._fetch, request)))
+            next_page += 1
+
+        try:
+            for _ in range(self._concurrency):
+                submit_next_page()
+
+            while True:
+                request, future = pending.popleft()
+                self._logger.log(f'getting {request.url}')
+                response = self._get(request, future)
+                yield response
+
+                if is_last(response):
+                    break
+
+                submit_next_page()
+        finally:
+            # pages prefetched past the last one are just dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def save_page(statedir: AtomicDir, filename: str, text: str) -> None:
+    with open(os.path.join(statedir.get_path(), filename), 'w', encoding='utf-8') as pagefile:
+        pagefile.write(text)
+        pagefile.flush()
+        os.fsync(pagefile.fileno())
+        record_write(pagefile.tell())
@@ -0,0 +1,214 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+import requests
+
+import urllib3
+
+
+__all__ = [
+    'FetchTelemetry',
+    'TransferStats',
+    'activate_telemetry',
+    'deactivate_telemetry',
+    'iter_response_content',
+    'record_command',
+    'record_download',
+    'record_request',
+    'record_write',
+    'telemetry_source',
+]
+
+
+class TransferStats:
+    __slots__ = ['requests', 'not_modified', 'bytes_downloaded', 'bytes_written', 'first_byte_time', 'transfer_time', 'commands', 'command_time']
+
+    requests: int
+    not_modified: int
+    bytes_downloaded: int
+    bytes_written: int
+    first_byte_time: float
+    transfer_time: float
+    commands: int
+    command_time: float
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_downloaded = 0
+        self.bytes_written = 0
+        self.first_byte_time = 0
+        self.transfer_time = 0
+        self.commands = 0
+        self.command_time = 0
+
+    def get_avg_first_byte_time(self) -> float | None:
+        return self.first_byte_time / self.requests if self.requests else None
+
+    def get_throughput(self) -> float | None:
+        """Return download throughput in bytes per second."""
+        return self.bytes_downloaded / self.transfer_time if self.transfer_time else None
+
+    def serialize(self) -> dict[str, Any]:
+        res: dict[str, Any] = {slot: getattr(self, slot) for slot in self.__slots__}
+        res['avg_first_byte_time'] = self.get_avg_first_byte_time()
+        res['throughput'] = self.get_throughput()
+        return res
+
+    def __str__(self) -> str:
+        res = f'{self.requests} request(s) ({self.not_modified} not modified), {self.bytes_downloaded} byte(s) downloaded, {self.bytes_written} byte(s) written'
+
+        if (first_byte_time := self.get_avg_first_byte_time()) is not None:
+            res += f', avg time to first byte {first_byte_time:.3f}s'
+        if (throughput := self.get_throughput()) is not None:
+            res += f', {throughput / 1024:.0f} KiB/s'
+        if self.commands:
+            res += f', {self.commands} command(s) taking {self.command_time:.2f}s'
+
+        return res
+
+
+class FetchTelemetry:
+    """Statistics of data transfers during a fetch run.
+
+    Collected per host and per source, where the source is the one
+    being fetched at the time (see telemetry_source()).
+    """
+
+    _sources: dict[str, TransferStats]
+    _hosts: dict[str, TransferStats]
+    _source: str | None
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self._sources = {}
+        self._hosts = {}
+        self._source = None
+        self._lock = threading.Lock()
+
+    def _iter_stats(self, host: str | None) -> Iterator[TransferStats]:
+        if self._source is not None:
+            yield self._sources.setdefault(self._source, TransferStats())
+        if host is not None:
+            yield self._hosts.setdefault(host, TransferStats())
+
+    def set_source(self, source: str | None) -> TransferStats | None:
+        """Set current source, returning its (live) statistics."""
+        with self._lock:
+            self._source = source
+            return None if source is None else self._sources.setdefault(source, TransferStats())
+
+    def record_request(self, host: str, first_byte_time: float, not_modified: bool) -> None:
+        with self._lock:
+            for stats in self._iter_stats(host):
+                stats.requests += 1
+                stats.not_modified += not_modified
+                stats.first_byte_time += first_byte_time
+
+    def record_download(self, host: str | None, size: int, transfer_time: float) -> None:
+        with self._lock:
+            for stats in self._iter_stats(host):
+                stats.bytes_downloaded += size
+                stats.transfer_time += transfer_time
+
+    def record_write(self, size: int) -> None:
+        with self._lock:
+            for stats in self._iter_stats(None):
+                stats.bytes_written += size
+
+    def record_command(self, command_time: float) -> None:
+        with self._lock:
+            for stats in self._iter_stats(None):
+                stats.commands += 1
+                stats.command_time += command_time
+
+    def serialize(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'sources': {source: stats.serialize() for source, stats in self._sources.items()},
+                'hosts': {host: stats.serialize() for host, stats in self._hosts.items()},
+            }
+
+
+# telemetry of the current fetch run, fed by HTTP and subprocess helpers
+_active: FetchTelemetry | None = None
+
+
+def activate_telemetry(telemetry: FetchTelemetry) -> None:
+    global _active
+    _active = telemetry
+
+
+def deactivate_telemetry() -> None:
+    global _active
+    _active = None
+
+
+@contextmanager
+def telemetry_source(source: str) -> Iterator[TransferStats | None]:
+    """Attribute all transfers within the context to the given source.
+
+    Yields statistics of the source, or None if telemetry is not active.
+    """
+    telemetry = _active
+
+    stats = telemetry.set_source(source) if telemetry is not None else None
+
+    try:
+        yield stats
+    finally:
+        if telemetry is not None:
+            telemetry.set_source(None)
+
+
+def record_request(host: str, first_byte_time: float, not_modified: bool) -> None:
+    if _active is not None:
+        _active.record_request(host, first_byte_time, not_modified)
+
+
+def record_download(host: str | None, size: int, transfer_time: float) -> None:
+    if _active is not None:
+        _active.record_download(host, size, transfer_time)
+
+
+def record_write(size: int) -> None:
+    if _active is not None:
+        _active.record_write(size)
+
+
+def record_command(command_time: float) -> None:
+    if _active is not None:
+        _active.record_command(command_time)
+
+
+def iter_response_content(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """Iterate over response body, recording the download."""
+    start = time.monotonic()
+
+    try:
+        yield from response.iter_content(chunk_size)
+    finally:
+        # responses served from HTTP cache are not downloads; note
+        # that partial downloads are recorded as well
+        if isinstance(response.raw, urllib3.HTTPResponse):
+            record_download(urlsplit(response.url).netloc.lower(), response.raw.tell(), time.monotonic() - start)
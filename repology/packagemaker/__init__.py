@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
+import pickle
 import warnings
 from abc import abstractmethod
 from copy import deepcopy
@@ -406,6 +407,13 @@ class PackageMaker(PackageMakerBase):
 
         return offspring
 
+    def get_state(self) -> bytes:
+        """Serialize collected package data, e.g. for caching."""
+        return pickle.dumps((self._ident, self._package, self._name_mapper), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def set_state(self, state: bytes) -> None:
+        self._ident, self._package, self._name_mapper = pickle.loads(state)
+
     def __getattr__(self, key: str) -> Any:
         return getattr(self._package, key)
 
@@ -0,0 +1,86 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import bz2
+import gzip
+import io
+import lzma
+from typing import IO, Any, cast
+
+import zstandard
+
+
+__all__ = ['MAGIC_SIZE', 'TRANSPARENT_COMPRESSIONS', 'detect_compression', 'detect_compression_by_magic', 'open_decompressed']
+
+
+_MAGICS = [
+    (b'\x1f\x8b', 'gz'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+# compressions which open_decompressed() can detect and handle
+TRANSPARENT_COMPRESSIONS = frozenset(compression for _, compression in _MAGICS)
+
+
+# number of leading bytes enough to detect compression
+MAGIC_SIZE = max(len(magic) for magic, _ in _MAGICS)
+
+
+def detect_compression_by_magic(head: bytes) -> str | None:
+    """Detect compression of data by its leading bytes."""
+    for magic, compression in _MAGICS:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+def detect_compression(path: str) -> str | None:
+    """Detect compression of a file by its magic number."""
+    with open(path, 'rb') as fd:
+        return detect_compression_by_magic(fd.read(MAGIC_SIZE))
+
+
+def open_decompressed(path: str, encoding: str | None = None, errors: str | None = None) -> IO[Any]:
+    """Open possibly compressed file for reading.
+
+    Fetchers may keep state files in their original compressed form,
+    so parsers should open them with this function, which decompresses
+    gz, xz, bz2 and zstd files transparently. File is opened in text
+    mode if encoding is specified, and in binary mode otherwise.
+    """
+    compression = detect_compression(path)
+
+    stream: io.BufferedIOBase
+
+    if compression == 'gz':
+        stream = gzip.GzipFile(path, 'rb')
+    elif compression == 'xz':
+        stream = lzma.LZMAFile(path, 'rb')
+    elif compression == 'bz2':
+        stream = bz2.BZ2File(path, 'rb')
+    elif compression == 'zstd':
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True))
+    else:
+        stream = open(path, 'rb')
+
+    if encoding is None:
+        return cast(IO[bytes], stream)
+
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
@@ -0,0 +1,282 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pickle
+import sys
+from abc import abstractmethod
+from typing import Any, Iterable, Iterator
+
+import xxhash
+
+import repology.packagemaker
+from repology.atomic_fs import AtomicFile
+from repology.changedpaths import ChangedPaths
+from repology.logger import Logger
+from repology.packagemaker import PackageFactory, PackageMaker
+from repology.parsers.sharding import ShardedParser
+from repology.parsers.walk import walk_tree
+from repology.subprocess import get_subprocess_output
+from repology.utils.itertools import split_evenly
+
+
+__all__ = ['IncrementalParser', 'ParseUnit', 'iter_parse_incremental', 'iter_walk_units']
+
+
+_CACHE_FORMAT_VERSION = 1
+
+
+class ParseUnit:
+    """Independently parsed part of a tree.
+
+    Key uniquely identifies the unit, and paths list files and
+    directories (relative to the tree root) which all the output
+    of the unit depends on.
+    """
+
+    __slots__ = ['key', 'paths']
+
+    key: str
+    paths: list[str]
+
+    def __init__(self, key: str, paths: list[str]) -> None:
+        self.key = key
+        self.paths = paths
+
+
+class IncrementalParser(ShardedParser):
+    """Parser which processes a tree as a sequence of independent units.
+
+    Output of a unit only depends on the paths it lists, so it may be
+    cached and reused while these stay unchanged; see
+    iter_parse_incremental(). Units may also be parsed in shards.
+    """
+
+    @abstractmethod
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        pass
+
+    @abstractmethod
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        pass
+
+    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
+        for unit in self.iter_units(path):
+            yield from self.iter_parse_unit(path, unit, factory)
+
+    def iter_shards(self, path: str, num_shards: int) -> Iterable[list[ParseUnit]]:
+        return split_evenly(list(self.iter_units(path)), num_shards)
+
+    def iter_parse_shard(self, path: str, shard: list[ParseUnit], factory: PackageFactory) -> Iterable[PackageMaker]:
+        for unit in shard:
+            yield from self.iter_parse_unit(path, unit, factory)
+
+    def get_cache_key(self) -> str:
+        """Return key identifying parser code and configuration.
+
+        Cached output is discarded when it changes. Parsers with
+        configuration which cannot be reliably represented with
+        repr() should override this.
+        """
+        hasher = xxhash.xxh3_64()
+        for module in [sys.modules[type(self).__module__], repology.packagemaker]:
+            if module.__file__ is not None:
+                with open(module.__file__, 'rb') as source:
+                    hasher.update(source.read())
+
+        return '{}:{}:{}'.format(type(self).__qualname__, repr(sorted(vars(self).items())), hasher.hexdigest())
+
+
+def iter_walk_units(path: str, suffix: str | None = None, name: str | None = None) -> Iterable[ParseUnit]:
+    """Produce a unit for each file matched by walk_tree().
+
+    Unit key is a path to the file, and the unit depends on the
+    whole directory containing it.
+    """
+    for filepath in walk_tree(path, suffix=suffix, name=name):
+        relpath = os.path.relpath(filepath, path)
+        yield ParseUnit(relpath, [os.path.dirname(relpath)])
+
+
+class _CachedUnit:
+    __slots__ = ['signature', 'makers', 'logs']
+
+    signature: int
+    makers: list[bytes]
+    logs: list[tuple[str, int, int, str]]
+
+    def __init__(self, signature: int) -> None:
+        self.signature = signature
+        self.makers = []
+        self.logs = []
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        return (self.signature, self.makers, self.logs)
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        self.signature, self.makers, self.logs = state
+
+
+class _RecordingLogger(Logger):
+    """Logger which records messages while parsing a unit, for later replay."""
+
+    _parent: Logger
+    records: list[tuple[str, int, int, str]] | None
+
+    def __init__(self, parent: Logger) -> None:
+        self._parent = parent
+        self.records = None
+
+    def _log(self, message: str, severity: int, indent: int, prefix: str) -> None:
+        if self.records is not None:
+            self.records.append((message, severity, indent, prefix))
+        self._parent._log(message, severity, indent, prefix)
+
+
+def _hash_path(hasher: xxhash.xxh3_64, abspath: str, relpath: str) -> None:
+    hasher.update(relpath.encode('utf-8', errors='surrogateescape') + b'\0')
+
+    if os.path.isdir(abspath):
+        hasher.update(b'd')
+        for name in sorted(os.listdir(abspath)):
+            _hash_path(hasher, os.path.join(abspath, name), os.path.join(relpath, name))
+        hasher.update(b'\0')
+    elif os.path.isfile(abspath):
+        hasher.update(b'f%d\0' % os.path.getsize(abspath))
+        with open(abspath, 'rb') as fd:
+            while chunk := fd.read(65536):
+                hasher.update(chunk)
+    else:
+        hasher.update(b'-')
+
+
+def _get_unit_signature(path: str, unit: ParseUnit) -> int:
+    hasher = xxhash.xxh3_64()
+    for relpath in unit.paths:
+        _hash_path(hasher, os.path.join(path, relpath), relpath)
+    return hasher.intdigest()
+
+
+def _get_affected_paths(changed_paths: set[str]) -> set[str]:
+    """Return changed paths along with all their parent directories."""
+    affected = {'', '.'} if changed_paths else set()
+
+    for changed_path in changed_paths:
+        while changed_path and changed_path not in affected:
+            affected.add(changed_path)
+            changed_path = os.path.dirname(changed_path)
+
+    return affected
+
+
+def _get_git_head(path: str, logger: Logger) -> str | None:
+    if not os.path.exists(os.path.join(path, '.git')):
+        return None
+    return get_subprocess_output(['git', 'rev-parse', 'HEAD'], logger, cwd=path).strip()
+
+
+def _load_cache(cache_path: str, cache_key: str) -> tuple[str | None, dict[str, _CachedUnit]]:
+    try:
+        with open(cache_path, 'rb') as cachefile:
+            format_version, key, revision, units = pickle.load(cachefile)
+    except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
+        return None, {}
+
+    if format_version != _CACHE_FORMAT_VERSION or key != cache_key:
+        return None, {}
+
+    return revision, units
+
+
+def iter_parse_incremental(parser: IncrementalParser, path: str, cache_path: str, logger: Logger) -> Iterator[PackageMaker]:
+    """Parse a tree, reusing cached output of unchanged units.
+
+    Produces the same package stream as parser.iter_parse(), but
+    only units affected by changes are actually parsed, while output
+    (including log messages) of the rest is taken from the cache
+    stored in cache_path.
+
+    Changes are detected with the changed paths list provided by the
+    fetcher (see ChangedPaths) if it covers the revision the cache was
+    built from, and by comparing content hashes of unit paths otherwise.
+    The cache is only updated when the tree is parsed completely.
+    """
+    cache_key = parser.get_cache_key()
+    cached_revision, cached_units = _load_cache(cache_path, cache_key)
+
+    # changes list may be stale if the tree was recreated from
+    # scratch, so it's only used if it ends with the actual revision
+    revision = _get_git_head(path, logger)
+    changes = ChangedPaths.load(path)
+    affected_paths: set[str] | None = None
+
+    if cached_revision is not None and revision is not None and changes is not None and changes.get_head() == revision:
+        if (changed_paths := changes.get_changes_since(cached_revision)) is not None:
+            logger.log(f'using list of {len(changed_paths)} path(s) changed since {cached_revision}')
+            affected_paths = _get_affected_paths(changed_paths)
+
+    recorder = _RecordingLogger(logger)
+    factory = PackageFactory(recorder)
+    units: dict[str, _CachedUnit] = {}
+    num_reused = 0
+
+    for unit in parser.iter_units(path):
+        signature = None
+        if affected_paths is None:
+            signature = _get_unit_signature(path, unit)
+
+        cached = cached_units.get(unit.key)
+
+        if cached is not None and (signature == cached.signature if affected_paths is None else affected_paths.isdisjoint(unit.paths)):
+            for record in cached.logs:
+                logger._log(*record)
+
+            for state in cached.makers:
+                pkg = factory.begin()
+                pkg.set_state(state)
+                yield pkg
+
+            units[unit.key] = cached
+            num_reused += 1
+            continue
+
+        # signature is still needed in case the next run has to
+        # fall back to comparing contents
+        if signature is None:
+            signature = _get_unit_signature(path, unit)
+
+        parsed = units[unit.key] = _CachedUnit(signature)
+        makers = iter(parser.iter_parse_unit(path, unit, factory))
+
+        while True:
+            # only record messages produced by the parser, not by
+            # the consumer of produced packages
+            recorder.records = parsed.logs
+            try:
+                pkg = next(makers)
+            except StopIteration:
+                break
+            finally:
+                recorder.records = None
+
+            parsed.makers.append(pkg.get_state())
+            yield pkg
+
+    logger.log(f'{num_reused} of {len(units)} unit(s) reused from cache')
+
+    with AtomicFile(cache_path, 'wb') as cachefile:
+        pickle.dump((_CACHE_FORMAT_VERSION, cache_key, revision, units), cachefile.get_file(), protocol=pickle.HIGHEST_PROTOCOL)
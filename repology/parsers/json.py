@@ -19,12 +19,14 @@ from typing import Any, Iterable
 
 from jsonslicer import JsonSlicer
 
+from repology.parsers.compression import open_decompressed
+
 
 def iter_json_list(path: str, json_path: tuple[str | None, ...], **kwargs: Any) -> Iterable[dict[str, Any]]:
-    with open(path, 'rb') as jsonfile:
+    with open_decompressed(path) as jsonfile:
         yield from JsonSlicer(jsonfile, json_path, **kwargs)
 
 
 def iter_json_dict(path: str, json_path: tuple[str | None, ...], **kwargs: Any) -> Iterable[tuple[str, dict[str, Any]]]:
-    with open(path, 'rb') as jsonfile:
+    with open_decompressed(path) as jsonfile:
         yield from JsonSlicer(jsonfile, json_path, path_mode='map_keys', **kwargs)
@@ -23,8 +23,7 @@ from typing import Any, Callable, Iterable, Iterator
 import yaml
 
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
-from repology.parsers.walk import walk_tree
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 
 
 def _traverse_arbitrary_structure(data: Any, handler: Callable[[list[str], str], None], tags: list[str] = []) -> None:
@@ -84,33 +83,36 @@ def _extract_patches(conandata: dict[str, Any]) -> dict[str, list[str]]:
     return result
 
 
-class ConanGitParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for conandata_abs_path in walk_tree(path, name='conandata.yml'):
-            conandata_rel_path = os.path.relpath(conandata_abs_path, path)
+class ConanGitParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, name='conandata.yml')
 
-            with factory.begin(conandata_rel_path) as pkg:
-                pkg.add_name(conandata_rel_path.split('/')[1], NameType.CONAN_RECIPE_NAME)
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        conandata_abs_path = os.path.join(path, unit.key)
+        conandata_rel_path = os.path.relpath(conandata_abs_path, path)
 
-                with open(conandata_abs_path) as fd:
-                    conandata = yaml.safe_load(fd)
+        with factory.begin(conandata_rel_path) as pkg:
+            pkg.add_name(conandata_rel_path.split('/')[1], NameType.CONAN_RECIPE_NAME)
 
-                patches = _extract_patches(conandata)
+            with open(conandata_abs_path) as fd:
+                conandata = yaml.safe_load(fd)
 
-                for version_info in _extract_version_infos(conandata):
-                    verpkg = pkg.clone(append_ident=':' + version_info.version)
+            patches = _extract_patches(conandata)
 
-                    verpkg.set_version(version_info.version)
+            for version_info in _extract_version_infos(conandata):
+                verpkg = pkg.clone(append_ident=':' + version_info.version)
 
-                    # XXX: we may create more subpackages here based on url_info.tags
-                    # which may contain various OSes, architectures, compilers and probably
-                    # other specifics (see cspice/all/conandata.yml for example)
-                    for url_info in version_info.url_infos:
-                        verpkg.add_downloads(url_info.url)
+                verpkg.set_version(version_info.version)
 
-                    if version_info.version in patches:
-                        verpkg.set_extra_field('patch', patches[version_info.version])
+                # XXX: we may create more subpackages here based on url_info.tags
+                # which may contain various OSes, architectures, compilers and probably
+                # other specifics (see cspice/all/conandata.yml for example)
+                for url_info in version_info.url_infos:
+                    verpkg.add_downloads(url_info.url)
 
-                    verpkg.set_extra_field('folder', conandata_rel_path.split('/')[2])
+                if version_info.version in patches:
+                    verpkg.set_extra_field('patch', patches[version_info.version])
 
-                    yield verpkg
+                verpkg.set_extra_field('folder', conandata_rel_path.split('/')[2])
+
+                yield verpkg
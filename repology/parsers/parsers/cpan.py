@@ -20,6 +20,7 @@ from typing import Iterable
 from repology.logger import Logger
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.parsers import Parser
+from repology.parsers.compression import open_decompressed
 from repology.parsers.maintainers import extract_maintainers
 
 
@@ -44,7 +45,7 @@ class CPANPackagesParser(Parser):
         # equal to package name. Some entries are lost, some entries
         # are not even in 02packages.details.txt, some are unparsable
         # (no version, or garbage in version) but these are negligible.
-        with open(path) as packagesfile:
+        with open_decompressed(path, encoding='utf-8') as packagesfile:
             skipping_header = True
             for nline, line in enumerate(packagesfile, 1):
                 line = line.strip()
@@ -15,67 +15,156 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
+import mmap
+import os
 import re
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from repology.package import LinkType, PackageFlags
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.parsers import Parser
+from repology.parsers.compression import detect_compression, open_decompressed
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.versions import DebianVersionParser
 
 
-_DEBIAN_KEYVAL_RE = re.compile('([A-Za-z0-9_-]+):(.*?)')
+# size of decompressed blocks for compressed files, which cannot be mapped
+_BLOCK_SIZE = 1024 * 1024
 
 
-def _iter_packages(path: str) -> Iterable[dict[str, str]]:
-    with open(path, encoding='utf-8', errors='ignore') as f:
-        current_data: dict[str, str] = {}
-        last_key = None
+def _get_markers(key: str) -> tuple[bytes, bytes]:
+    marker = key.encode('ascii') + b':'
+    return marker, b'\n' + marker
 
-        for line in f:
-            line = line.rstrip('\n')
 
-            # empty line, yield ready package
-            if line == '':
-                if not current_data:
-                    continue  # may happen on empty package list
+class _Stanza:
+    """Single stanza (paragraph) of Debian control file.
 
-                yield current_data
+    Fields are located with byte level search and decoded on access,
+    so fields not needed by the parser (descriptions, checksums, file
+    lists) are never processed.
+    """
 
-                current_data = {}
-                last_key = None
-                continue
+    __slots__ = ['_data']
 
-            # key - value pair
-            match = _DEBIAN_KEYVAL_RE.fullmatch(line)
-            if match:
-                key = match.group(1)
-                value = match.group(2).strip()
-                current_data[key] = value
-                last_key = key
-                continue
+    _data: bytes
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def _find_value(self, key: str) -> int:
+        marker, line_marker = _MARKERS.get(key) or _MARKERS.setdefault(key, _get_markers(key))
+
+        # last occurrence wins, as with repeated keys
+        if (pos := self._data.rfind(line_marker)) != -1:
+            return pos + len(line_marker)
+        if self._data.startswith(marker):
+            return len(marker)
+        return -1
+
+    def _get_value(self, start: int) -> str:
+        data = self._data
+
+        if (end := data.find(b'\n', start)) == -1:
+            end = len(data)
+        value = data[start:end].decode('utf-8', errors='ignore').strip()
+
+        # continuation lines
+        while data.startswith(b' ', end + 1):
+            start = end + 1
+            if (end := data.find(b'\n', start)) == -1:
+                end = len(data)
+            value += data[start:end].decode('utf-8', errors='ignore').strip()
+
+        return value
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        if (start := self._find_value(key)) == -1:
+            return default
+        return self._get_value(start)
+
+    def get_prefixed(self, prefix: str) -> str | None:
+        """Return value of the first field with name starting with prefix."""
+        marker = prefix.encode('ascii')
+
+        if self._data.startswith(marker):
+            pos = 0
+        elif (pos := self._data.find(b'\n' + marker)) != -1:
+            pos += 1
+        else:
+            return None
+
+        if (colon := self._data.find(b':', pos)) == -1:
+            return None
+
+        return self._get_value(colon + 1)
 
-            # continuation of previous key
-            if line.startswith(' '):
-                if last_key is None:
-                    raise RuntimeError('unable to parse line: {}'.format(line))
+    def __getitem__(self, key: str) -> str:
+        if (start := self._find_value(key)) == -1:
+            raise KeyError(key)
+        return self._get_value(start)
 
-                current_data[last_key] += line.strip()
+    def __contains__(self, key: str) -> bool:
+        return self._find_value(key) != -1
+
+
+# field name -> (marker at stanza start, marker at line start)
+_MARKERS: dict[str, tuple[bytes, bytes]] = {}
+
+
+def _iter_blocks(path: str) -> Iterator[bytes | mmap.mmap]:
+    """Produce blocks of the file which consist of whole stanzas."""
+    if detect_compression(path) is None:
+        with open(path, 'rb') as fd:
+            # empty files cannot be mapped
+            if os.fstat(fd.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+        return
+
+    with open_decompressed(path) as fd:
+        tail = b''
+
+        while block := fd.read(_BLOCK_SIZE):
+            block = tail + block
+
+            if (boundary := block.rfind(b'\n\n')) == -1:
+                tail = block
+            else:
+                yield block[:boundary]
+                tail = block[boundary + 2:]
+
+        if tail:
+            yield tail
+
+
+def _iter_packages(path: str) -> Iterable[_Stanza]:
+    for block in _iter_blocks(path):
+        pos = 0
+        size = len(block)
+
+        while pos < size:
+            # skip extra empty lines
+            if block[pos] == 0x0a:
+                pos += 1
                 continue
 
-            raise RuntimeError('unable to parse line: {}'.format(line))
+            if (end := block.find(b'\n\n', pos)) == -1:
+                end = size
+
+            yield _Stanza(block[pos:end])
 
+            pos = end + 2
 
-def _extract_vcs_link(pkgdata: dict[str, str]) -> str | None:
-    if 'Vcs-Browser' in pkgdata:
-        return pkgdata['Vcs-Browser']
 
-    for key, value in pkgdata.items():
-        if key.startswith('Vcs-'):
-            return value
+def _extract_vcs_link(pkgdata: _Stanza) -> str | None:
+    if (url := pkgdata.get('Vcs-Browser')) is not None:
+        return url
 
-    return None
+    return pkgdata.get_prefixed('Vcs-')
 
 
 class DebianSourcesParser(Parser):
@@ -92,7 +181,7 @@ class DebianSourcesParser(Parser):
             case _:
                 self._version_parser = DebianVersionParser()
 
-    def _extra_handling(self, pkg: PackageMaker, pkgdata: dict[str, str]) -> None:
+    def _extra_handling(self, pkg: PackageMaker, pkgdata: _Stanza) -> None:
         if 'Binary' not in pkgdata or 'Source' in pkgdata:
             raise RuntimeError('Sanity check failed, expected Package descriptions with Binary, but without Source field')
         pkg.add_name(pkgdata['Package'], NameType.DEBIAN_SOURCE_PACKAGE)
@@ -122,7 +211,7 @@ class DebianSourcesParser(Parser):
 
 
 class OpenWrtPackagesParser(DebianSourcesParser):
-    def _extra_handling(self, pkg: PackageMaker, pkgdata: dict[str, str]) -> None:
+    def _extra_handling(self, pkg: PackageMaker, pkgdata: _Stanza) -> None:
         pkgpath = pkgdata['Source'].split('/')
         pkg.add_name(pkgdata['Package'], NameType.OPENWRT_PACKAGE)
         pkg.add_name(pkgpath[-1], NameType.OPENWRT_SOURCEDIR)
@@ -152,7 +241,7 @@ class OpenWrtPackagesParser(DebianSourcesParser):
 
 
 class DebianPackagesParser(DebianSourcesParser):
-    def _extra_handling(self, pkg: PackageMaker, pkgdata: dict[str, str]) -> None:
+    def _extra_handling(self, pkg: PackageMaker, pkgdata: _Stanza) -> None:
         if 'Binary' in pkgdata or 'Source' in pkgdata:
             raise RuntimeError('Sanity check failed, expected Package descriptions without Binary or Source fields')
         pkg.add_name(pkgdata['Package'], NameType.DEBIAN_BINARY_PACKAGE)
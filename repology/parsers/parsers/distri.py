@@ -21,29 +21,31 @@ from typing import Iterable
 from google.protobuf.text_format import Parse as ParseTextFormat
 
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 from repology.parsers.pb.distri_pb2 import Build as BuildMessage
-from repology.parsers.walk import walk_tree
 
 
-class DistriGitParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for protofile in walk_tree(path, name='build.textproto'):
-            protofile_rel = os.path.relpath(protofile, path)
-            with factory.begin(protofile_rel) as pkg:
-                pkgpath = os.path.dirname(protofile_rel)
+class DistriGitParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, name='build.textproto')
 
-                pkg.add_name(os.path.basename(pkgpath), NameType.DISTRI_NAME)
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        protofile = os.path.join(path, unit.key)
+        protofile_rel = os.path.relpath(protofile, path)
+        with factory.begin(protofile_rel) as pkg:
+            pkgpath = os.path.dirname(protofile_rel)
 
-                with open(protofile) as f:
-                    build = BuildMessage()
-                    ParseTextFormat(f.read(), build, allow_unknown_field=True)
+            pkg.add_name(os.path.basename(pkgpath), NameType.DISTRI_NAME)
 
-                pkg.set_version(build.version, lambda ver: ver.rsplit('-', 1)[0])
-                pkg.add_downloads(build.source)
-                pkg.set_extra_field('path', pkgpath)
+            with open(protofile) as f:
+                build = BuildMessage()
+                ParseTextFormat(f.read(), build, allow_unknown_field=True)
 
-                if patches := list(build.cherry_pick):
-                    pkg.set_extra_field('patch', patches)
+            pkg.set_version(build.version, lambda ver: ver.rsplit('-', 1)[0])
+            pkg.add_downloads(build.source)
+            pkg.set_extra_field('path', pkgpath)
 
-                yield pkg
+            if patches := list(build.cherry_pick):
+                pkg.set_extra_field('patch', patches)
+
+            yield pkg
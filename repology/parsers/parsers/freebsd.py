@@ -20,6 +20,7 @@ from typing import Iterable
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.package import LinkType
 from repology.parsers import Parser
+from repology.parsers.compression import open_decompressed
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.versions import VersionStripper
 
@@ -28,7 +29,7 @@ class FreeBSDIndexParser(Parser):
     def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
         normalize_version = VersionStripper().strip_right(',').strip_right('_')
 
-        with open(path, encoding='utf-8') as indexfile:
+        with open_decompressed(path, encoding='utf-8') as indexfile:
             for line in indexfile:
                 with factory.begin() as pkg:
                     fields = line.strip().split('|')
@@ -24,7 +24,7 @@ from typing import Iterable
 from repology.logger import Logger
 from repology.package import LinkType, PackageFlags
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
+from repology.parsers.incremental import IncrementalParser, ParseUnit
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.cpe import split_cpe
 
@@ -176,7 +176,7 @@ def _normalize_version(version: str) -> str:
     return re.sub('-r[0-9]+$', '', version)
 
 
-class GentooGitParser(Parser):
+class GentooGitParser(IncrementalParser):
     _require_xml_metadata: bool
     _require_md5cache_metadata: bool
 
@@ -184,62 +184,77 @@ class GentooGitParser(Parser):
         self._require_xml_metadata = require_xml_metadata
         self._require_md5cache_metadata = require_md5cache_metadata
 
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        # besides the package directory, unit depends on md5-cache
+        # entries of all its ebuilds; these are also used to get the
+        # list of ebuilds in iter_parse_unit(), so the package
+        # directory is only listed once
         for category, package in _iter_packages(path):
-            with factory.begin(category + '/' + package) as pkg:
-                pkg.add_name(package, NameType.GENTOO_NAME)
-                pkg.add_name(category + '/' + package, NameType.GENTOO_FULL_NAME)
-                pkg.add_categories(category)
-
-                xml_metadata_path = os.path.join(path, category, package, 'metadata.xml')
-                if os.path.isfile(xml_metadata_path):
-                    xml_metadata = _parse_xml_metadata(xml_metadata_path)
-                    for upstream_type in xml_metadata.unsupported_upstream_types:
-                        pkg.log(f'Unsupported upstream type {upstream_type}', Logger.ERROR)
-                elif self._require_xml_metadata:
-                    pkg.log('cannot find metadata ({}), package dropped'.format(os.path.relpath(xml_metadata_path, path)), Logger.ERROR)
+            yield ParseUnit(
+                category + '/' + package,
+                [os.path.join(category, package)] + [
+                    os.path.join('metadata', 'md5-cache', category, ebuild)
+                    for ebuild in _iter_ebuilds(path, category, package)
+                ]
+            )
+
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        category, package = unit.key.split('/')
+
+        with factory.begin(category + '/' + package) as pkg:
+            pkg.add_name(package, NameType.GENTOO_NAME)
+            pkg.add_name(category + '/' + package, NameType.GENTOO_FULL_NAME)
+            pkg.add_categories(category)
+
+            xml_metadata_path = os.path.join(path, category, package, 'metadata.xml')
+            if os.path.isfile(xml_metadata_path):
+                xml_metadata = _parse_xml_metadata(xml_metadata_path)
+                for upstream_type in xml_metadata.unsupported_upstream_types:
+                    pkg.log(f'Unsupported upstream type {upstream_type}', Logger.ERROR)
+            elif self._require_xml_metadata:
+                pkg.log('cannot find metadata ({}), package dropped'.format(os.path.relpath(xml_metadata_path, path)), Logger.ERROR)
+                return
+            else:
+                xml_metadata = _ParsedXmlMetadata()
+
+            pkg.add_maintainers(xml_metadata.maintainers)
+
+            if xml_metadata.cpe is not None:
+                cpe = split_cpe(xml_metadata.cpe)
+                pkg.add_cpe(cpe[2], cpe[3])
+
+            for ebuild in (os.path.basename(ebuild_path) for ebuild_path in unit.paths[1:]):
+                subpkg = pkg.clone(append_ident='/' + ebuild)
+
+                subpkg.set_version(ebuild[len(package) + 1:], _normalize_version)
+                if subpkg.version.endswith('9999'):
+                    subpkg.set_flags(PackageFlags.ROLLING)
+
+                md5cache_metadata_path = os.path.join(path, 'metadata', 'md5-cache', category, ebuild)
+
+                if os.path.isfile(md5cache_metadata_path):
+                    md5cache_metadata = _parse_md5cache_metadata(md5cache_metadata_path)
+
+                    subpkg.set_summary(md5cache_metadata.get('DESCRIPTION'))
+
+                    if 'LICENSE' in md5cache_metadata:
+                        if '(' in md5cache_metadata['LICENSE']:
+                            # XXX: conditionals and OR's: need more
+                            # complex parsing and backend support
+                            subpkg.add_licenses(md5cache_metadata['LICENSE'])
+                        else:
+                            subpkg.add_licenses(md5cache_metadata['LICENSE'].split(' '))
+
+                    if 'SRC_URI' in md5cache_metadata:
+                        # skip local files
+                        subpkg.add_links(LinkType.UPSTREAM_DOWNLOAD, filter(lambda s: '/' in s, _parse_conditional_expr(md5cache_metadata['SRC_URI'])))
+
+                    subpkg.add_links(LinkType.UPSTREAM_HOMEPAGE, md5cache_metadata.get('HOMEPAGE', '').split(' '))
+                elif self._require_md5cache_metadata:
+                    subpkg.log('cannot find metadata ({}), package dropped'.format(os.path.relpath(md5cache_metadata_path, path)), Logger.ERROR)
                     continue
-                else:
-                    xml_metadata = _ParsedXmlMetadata()
 
-                pkg.add_maintainers(xml_metadata.maintainers)
+                # upstreams should be added after "real" homepages
+                subpkg.add_links(LinkType.UPSTREAM_HOMEPAGE, xml_metadata.upstreams)
 
-                if xml_metadata.cpe is not None:
-                    cpe = split_cpe(xml_metadata.cpe)
-                    pkg.add_cpe(cpe[2], cpe[3])
-
-                for ebuild in _iter_ebuilds(path, category, package):
-                    subpkg = pkg.clone(append_ident='/' + ebuild)
-
-                    subpkg.set_version(ebuild[len(package) + 1:], _normalize_version)
-                    if subpkg.version.endswith('9999'):
-                        subpkg.set_flags(PackageFlags.ROLLING)
-
-                    md5cache_metadata_path = os.path.join(path, 'metadata', 'md5-cache', category, ebuild)
-
-                    if os.path.isfile(md5cache_metadata_path):
-                        md5cache_metadata = _parse_md5cache_metadata(md5cache_metadata_path)
-
-                        subpkg.set_summary(md5cache_metadata.get('DESCRIPTION'))
-
-                        if 'LICENSE' in md5cache_metadata:
-                            if '(' in md5cache_metadata['LICENSE']:
-                                # XXX: conditionals and OR's: need more
-                                # complex parsing and backend support
-                                subpkg.add_licenses(md5cache_metadata['LICENSE'])
-                            else:
-                                subpkg.add_licenses(md5cache_metadata['LICENSE'].split(' '))
-
-                        if 'SRC_URI' in md5cache_metadata:
-                            # skip local files
-                            subpkg.add_links(LinkType.UPSTREAM_DOWNLOAD, filter(lambda s: '/' in s, _parse_conditional_expr(md5cache_metadata['SRC_URI'])))
-
-                        subpkg.add_links(LinkType.UPSTREAM_HOMEPAGE, md5cache_metadata.get('HOMEPAGE', '').split(' '))
-                    elif self._require_md5cache_metadata:
-                        subpkg.log('cannot find metadata ({}), package dropped'.format(os.path.relpath(md5cache_metadata_path, path)), Logger.ERROR)
-                        continue
-
-                    # upstreams should be added after "real" homepages
-                    subpkg.add_links(LinkType.UPSTREAM_HOMEPAGE, xml_metadata.upstreams)
-
-                    yield subpkg
+                yield subpkg
@@ -23,47 +23,50 @@ import tomli
 from repology.logger import Logger
 from repology.package import LinkType
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.walk import walk_tree
 
 
-class GlaucusGitParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for info_path_abs in walk_tree(path, name='info'):
-            package_path_abs = os.path.dirname(info_path_abs)
-            package_subdir = os.path.basename(package_path_abs)
+class GlaucusGitParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, name='info')
 
-            with factory.begin(package_subdir) as pkg:
-                patches_path_abs = os.path.join(package_path_abs, 'patches')
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        info_path_abs = os.path.join(path, unit.key)
+        package_path_abs = os.path.dirname(info_path_abs)
+        package_subdir = os.path.basename(package_path_abs)
 
-                with open(info_path_abs, 'r') as f:
-                    info_contents = f.read()
-                    pkgdata = tomli.loads(info_contents)
+        with factory.begin(package_subdir) as pkg:
+            patches_path_abs = os.path.join(package_path_abs, 'patches')
 
-                pkg.add_name(package_subdir, NameType.GENERIC_SRC_NAME)
+            with open(info_path_abs, 'r') as f:
+                info_contents = f.read()
+                pkgdata = tomli.loads(info_contents)
 
-                if 'ver' not in pkgdata:
-                    pkg.log('package without version, skipping', Logger.ERROR)
-                    continue
-                if 'url' not in pkgdata:
-                    pkg.log('package without url, assuming virtual package and skipping', Logger.ERROR)
-                    continue
+            pkg.add_name(package_subdir, NameType.GENERIC_SRC_NAME)
 
-                pkg.set_version(pkgdata['ver'])
-                pkg.add_links(LinkType.UPSTREAM_DOWNLOAD, pkgdata.get('url'))
+            if 'ver' not in pkgdata:
+                pkg.log('package without version, skipping', Logger.ERROR)
+                return
+            if 'url' not in pkgdata:
+                pkg.log('package without url, assuming virtual package and skipping', Logger.ERROR)
+                return
 
-                for line in info_contents.split('\n'):
-                    if line.startswith('# Voyager:'):
-                        pkg.add_maintainers(extract_maintainers(line.split(':', 1)[1]))
+            pkg.set_version(pkgdata['ver'])
+            pkg.add_links(LinkType.UPSTREAM_DOWNLOAD, pkgdata.get('url'))
 
-                if os.path.exists(patches_path_abs):
-                    pkg.set_extra_field(
-                        'patch',
-                        sorted(
-                            os.path.relpath(patch_path_abs, patches_path_abs)
-                            for patch_path_abs in walk_tree(patches_path_abs, suffix='.patch')
-                        )
+            for line in info_contents.split('\n'):
+                if line.startswith('# Voyager:'):
+                    pkg.add_maintainers(extract_maintainers(line.split(':', 1)[1]))
+
+            if os.path.exists(patches_path_abs):
+                pkg.set_extra_field(
+                    'patch',
+                    sorted(
+                        os.path.relpath(patch_path_abs, patches_path_abs)
+                        for patch_path_abs in walk_tree(patches_path_abs, suffix='.patch')
                     )
+                )
 
-                yield pkg
+            yield pkg
@@ -19,11 +19,12 @@ from typing import Iterable
 
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.parsers import Parser
+from repology.parsers.compression import open_decompressed
 
 
 class HPPADepothelperListParser(Parser):
     def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        with open(path, encoding='utf-8') as indexfile:
+        with open_decompressed(path, encoding='utf-8') as indexfile:
             for line in indexfile:
                 pkg = factory.begin()
 
@@ -21,10 +21,9 @@ from typing import Iterable, Iterator
 
 from repology.logger import Logger
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.patches import add_patch_files
-from repology.parsers.walk import walk_tree
+from repology.parsers.sharding import ShardedParser, iter_walk_tree_shards
 
 
 def read_version(path: str) -> str:
@@ -66,7 +65,7 @@ def read_carbs_meta(path: str) -> dict[str, str]:
     return meta
 
 
-class KissGitParser(Parser):
+class KissGitParser(ShardedParser):
     _maintainer_from_git: bool
     _use_meta: bool
 
@@ -74,8 +73,11 @@ class KissGitParser(Parser):
         self._maintainer_from_git = maintainer_from_git
         self._use_meta = use_meta
 
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for version_path_abs in walk_tree(path, name='version'):
+    def iter_shards(self, path: str, num_shards: int) -> Iterable[list[str]]:
+        return iter_walk_tree_shards(path, num_shards, name='version')
+
+    def iter_parse_shard(self, path: str, shard: list[str], factory: PackageFactory) -> Iterable[PackageMaker]:
+        for version_path_abs in shard:
             version_path_rel = os.path.relpath(version_path_abs, path)
 
             package_path_abs = os.path.dirname(version_path_abs)
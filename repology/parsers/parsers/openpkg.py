@@ -21,12 +21,14 @@ from typing import Iterable
 from repology.package import PackageFlags
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.parsers import Parser
+from repology.parsers.compression import open_decompressed
 from repology.parsers.xml import safe_findalltexts, safe_findtext
 
 
 class OpenPkgRdfParser(Parser):
     def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        root = xml.etree.ElementTree.parse(path)
+        with open_decompressed(path) as xmlfile:
+            root = xml.etree.ElementTree.parse(xmlfile)
 
         repository = root.find('{http://www.openpkg.org/xml-rdf-index/0.9}Repository')
 
@@ -21,41 +21,43 @@ from typing import Iterable
 
 from repology.logger import Logger
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
-from repology.parsers.walk import walk_tree
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 from repology.parsers.xml import safe_findtext
 
 
-class PisiParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for filename in walk_tree(path, suffix='pspec.xml'):
-            relpath = os.path.relpath(filename, path)
+class PisiParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, suffix='pspec.xml')
 
-            with factory.begin(relpath) as pkg:
-                try:
-                    root = xml.etree.ElementTree.parse(filename).getroot()
-                except xml.etree.ElementTree.ParseError as e:
-                    pkg.log('Cannot parse XML: ' + str(e), Logger.ERROR)
-                    continue
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        filename = os.path.join(path, unit.key)
+        relpath = os.path.relpath(filename, path)
 
-                name = safe_findtext(root, './Source/Name')
-                pkgdir = os.path.dirname(relpath)
+        with factory.begin(relpath) as pkg:
+            try:
+                root = xml.etree.ElementTree.parse(filename).getroot()
+            except xml.etree.ElementTree.ParseError as e:
+                pkg.log('Cannot parse XML: ' + str(e), Logger.ERROR)
+                return
 
-                pathname = relpath.split(os.sep)[-2]
-                if name != pathname:
-                    # there's only one exception ATOW
-                    pkg.log(f'name "{name}" != package directory "{pathname}"', Logger.ERROR)
+            name = safe_findtext(root, './Source/Name')
+            pkgdir = os.path.dirname(relpath)
 
-                pkg.add_name(name, NameType.PISI_NAME)
-                pkg.add_name(pkgdir, NameType.PISI_PKGDIR)
-                pkg.set_summary(safe_findtext(root, './Source/Summary'))
-                pkg.add_homepages(map(lambda el: el.text, root.findall('./Source/Homepage')))
-                pkg.add_downloads(map(lambda el: el.text, root.findall('./Source/Archive')))
-                pkg.add_licenses(map(lambda el: el.text, root.findall('./Source/License')))
-                pkg.add_categories(map(lambda el: el.text, root.findall('./Source/IsA')))
-                pkg.add_maintainers(map(lambda el: el.text, root.findall('./Source/Packager/Email')))
+            pathname = relpath.split(os.sep)[-2]
+            if name != pathname:
+                # there's only one exception ATOW
+                pkg.log(f'name "{name}" != package directory "{pathname}"', Logger.ERROR)
 
-                lastupdate = max(root.findall('./History/Update'), key=lambda el: int(el.attrib['release']))
-                pkg.set_version(safe_findtext(lastupdate, './Version'))
+            pkg.add_name(name, NameType.PISI_NAME)
+            pkg.add_name(pkgdir, NameType.PISI_PKGDIR)
+            pkg.set_summary(safe_findtext(root, './Source/Summary'))
+            pkg.add_homepages(map(lambda el: el.text, root.findall('./Source/Homepage')))
+            pkg.add_downloads(map(lambda el: el.text, root.findall('./Source/Archive')))
+            pkg.add_licenses(map(lambda el: el.text, root.findall('./Source/License')))
+            pkg.add_categories(map(lambda el: el.text, root.findall('./Source/IsA')))
+            pkg.add_maintainers(map(lambda el: el.text, root.findall('./Source/Packager/Email')))
 
-                yield pkg
+            lastupdate = max(root.findall('./History/Update'), key=lambda el: int(el.attrib['release']))
+            pkg.set_version(safe_findtext(lastupdate, './Version'))
+
+            yield pkg
@@ -23,13 +23,14 @@ import rubymarshal.reader
 
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
 from repology.parsers import Parser
+from repology.parsers.compression import open_decompressed
 
 
 class RubyGemParser(Parser):
     def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
         skipped_gemplats: dict[str, int] = Counter()
 
-        with open(path, 'rb') as fd:
+        with open_decompressed(path) as fd:
             for gemname, gemversion, gemplat in rubymarshal.reader.load(fd):
                 gemname = str(gemname)
 
@@ -20,10 +20,9 @@ from typing import Iterable
 
 from repology.logger import Logger
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
 from repology.parsers.patches import add_patch_files
+from repology.parsers.sharding import ShardedParser, iter_walk_tree_shards
 from repology.parsers.versions import VersionStripper
-from repology.parsers.walk import walk_tree
 
 
 def _parse_upstream_url(pkgpath: str) -> str | None:
@@ -40,11 +39,14 @@ def _parse_upstream_url(pkgpath: str) -> str | None:
         return None
 
 
-class SageMathParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
+class SageMathParser(ShardedParser):
+    def iter_shards(self, path: str, num_shards: int) -> Iterable[list[str]]:
+        return iter_walk_tree_shards(path, num_shards, name='package-version.txt')
+
+    def iter_parse_shard(self, path: str, shard: list[str], factory: PackageFactory) -> Iterable[PackageMaker]:
         normalize_version = VersionStripper().strip_right('.p')
 
-        for versionfile_abs in walk_tree(path, name='package-version.txt'):
+        for versionfile_abs in shard:
             pkgpath_abs = os.path.dirname(versionfile_abs)
             pkgpath_rel = os.path.relpath(pkgpath_abs, path)
             with factory.begin(pkgpath_rel) as pkg:
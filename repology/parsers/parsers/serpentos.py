@@ -23,38 +23,40 @@ import yaml
 from repology.logger import Logger
 from repology.package import LinkType
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
-from repology.parsers.walk import walk_tree
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 
 
-class SerpentOsGitParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for filename in walk_tree(path, suffix='stone.yaml'):
-            relpath = os.path.relpath(filename, path)
-            subdir = os.path.basename(os.path.dirname(relpath))
+class SerpentOsGitParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, suffix='stone.yaml')
 
-            with factory.begin(relpath) as pkg:
-                with open(filename, 'r') as fd:
-                    pkgdata = yaml.safe_load(fd)
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        filename = os.path.join(path, unit.key)
+        relpath = os.path.relpath(filename, path)
+        subdir = os.path.basename(os.path.dirname(relpath))
 
-                if pkgdata['name'] != subdir:
-                    raise RuntimeError(f'subdir "{subdir}" != name "{pkgdata["name"]}"')
+        with factory.begin(relpath) as pkg:
+            with open(filename, 'r') as fd:
+                pkgdata = yaml.safe_load(fd)
 
-                if isinstance(pkgdata['version'], float):
-                    pkg.log(f'version "{pkgdata["version"]}" is a floating point, should be quoted in YAML', Logger.ERROR)
+            if pkgdata['name'] != subdir:
+                raise RuntimeError(f'subdir "{subdir}" != name "{pkgdata["name"]}"')
 
-                pkg.add_name(pkgdata['name'], NameType.SERPENTOS_NAME)
-                pkg.set_version(str(pkgdata['version']))
-                pkg.add_links(LinkType.UPSTREAM_HOMEPAGE, pkgdata.get('homepage'))
-                pkg.add_licenses(pkgdata.get('license'))
-                pkg.set_summary(pkgdata.get('summary'))
+            if isinstance(pkgdata['version'], float):
+                pkg.log(f'version "{pkgdata["version"]}" is a floating point, should be quoted in YAML', Logger.ERROR)
 
-                if upstreams := pkgdata.get('upstreams'):
-                    for upstream in upstreams:
-                        for url, checksum in upstream.items():
-                            if url.startswith('git|'):
-                                pkg.add_links(LinkType.UPSTREAM_REPOSITORY, url[4:])
-                            else:
-                                pkg.add_links(LinkType.UPSTREAM_DOWNLOAD, url)
+            pkg.add_name(pkgdata['name'], NameType.SERPENTOS_NAME)
+            pkg.set_version(str(pkgdata['version']))
+            pkg.add_links(LinkType.UPSTREAM_HOMEPAGE, pkgdata.get('homepage'))
+            pkg.add_licenses(pkgdata.get('license'))
+            pkg.set_summary(pkgdata.get('summary'))
 
-                yield pkg
+            if upstreams := pkgdata.get('upstreams'):
+                for upstream in upstreams:
+                    for url, checksum in upstream.items():
+                        if url.startswith('git|'):
+                            pkg.add_links(LinkType.UPSTREAM_REPOSITORY, url[4:])
+                        else:
+                            pkg.add_links(LinkType.UPSTREAM_DOWNLOAD, url)
+
+            yield pkg
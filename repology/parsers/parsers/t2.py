@@ -23,10 +23,9 @@ from typing import Iterable
 from repology.logger import Logger
 from repology.package import PackageFlags
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
+from repology.parsers.incremental import IncrementalParser, ParseUnit, iter_walk_units
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.patches import add_patch_files
-from repology.parsers.walk import walk_tree
 
 
 def _parse_descfile(path: str, logger: Logger) -> dict[str, list[str]]:
@@ -79,39 +78,42 @@ def _parse_descfile(path: str, logger: Logger) -> dict[str, list[str]]:
     return data
 
 
-class T2DescParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for desc_path in walk_tree(path, suffix='.desc'):
-            rel_desc_path = os.path.relpath(desc_path, path)
-            with factory.begin(rel_desc_path) as pkg:
-                pkgpath = os.path.dirname(rel_desc_path)
-                subdir = os.path.basename(pkgpath)
-                name = os.path.basename(rel_desc_path).removesuffix('.desc')
+class T2DescParser(IncrementalParser):
+    def iter_units(self, path: str) -> Iterable[ParseUnit]:
+        return iter_walk_units(path, suffix='.desc')
 
-                if subdir != name:
-                    raise RuntimeError(f'recipe name "{name}" is different from its subdirectory name "{subdir}", this is not expected; see https://github.com/rxrbln/t2sde/issues/173')
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        desc_path = os.path.join(path, unit.key)
+        rel_desc_path = os.path.relpath(desc_path, path)
+        with factory.begin(rel_desc_path) as pkg:
+            pkgpath = os.path.dirname(rel_desc_path)
+            subdir = os.path.basename(pkgpath)
+            name = os.path.basename(rel_desc_path).removesuffix('.desc')
 
-                data = _parse_descfile(desc_path, pkg)
+            if subdir != name:
+                raise RuntimeError(f'recipe name "{name}" is different from its subdirectory name "{subdir}", this is not expected; see https://github.com/rxrbln/t2sde/issues/173')
 
-                pkg.add_name(name, NameType.T2_NAME)
-                pkg.set_extra_field('path', pkgpath)
-                pkg.set_version(data['version'][0])
-                pkg.set_summary(data['title'][0])
+            data = _parse_descfile(desc_path, pkg)
 
-                pkg.add_homepages((url.split()[0] for url in data.get('url', []) if url))
-                #pkg.add_homepages(data.get('cv-url'))  # url used by version checker; may be garbage
-                pkg.add_licenses(data['license'])
-                pkg.add_maintainers(map(extract_maintainers, data['maintainer']))
-                pkg.add_categories(data['category'])
+            pkg.add_name(name, NameType.T2_NAME)
+            pkg.set_extra_field('path', pkgpath)
+            pkg.set_version(data['version'][0])
+            pkg.set_summary(data['title'][0])
 
-                for cksum, filename, url, *rest in (line.split() for line in data.get('download', [])):
-                    url = url.lstrip('-!')
+            pkg.add_homepages((url.split()[0] for url in data.get('url', []) if url))
+            #pkg.add_homepages(data.get('cv-url'))  # url used by version checker; may be garbage
+            pkg.add_licenses(data['license'])
+            pkg.add_maintainers(map(extract_maintainers, data['maintainer']))
+            pkg.add_categories(data['category'])
 
-                    if url.endswith('/'):
-                        url += filename
+            for cksum, filename, url, *rest in (line.split() for line in data.get('download', [])):
+                url = url.lstrip('-!')
 
-                    pkg.add_downloads(url)
+                if url.endswith('/'):
+                    url += filename
 
-                add_patch_files(pkg, os.path.dirname(desc_path), '*.patch')
+                pkg.add_downloads(url)
 
-                yield pkg
+            add_patch_files(pkg, os.path.dirname(desc_path), '*.patch')
+
+            yield pkg
@@ -23,8 +23,9 @@ import yaml
 from repology.logger import Logger
 from repology.package import LinkType
 from repology.packagemaker import NameType, PackageFactory, PackageMaker
-from repology.parsers import Parser
+from repology.parsers.sharding import ShardedParser
 from repology.parsers.walk import walk_tree
+from repology.utils.itertools import split_evenly
 
 
 _DOCUMENT_LABEL_TO_LINK_TYPE = {
@@ -86,9 +87,12 @@ def _parse_manifest(manifest_data: dict[str, Any], pkg: PackageMaker) -> None:
         pkg.add_categories(map(str, manifest_data.get('Tags', [])))
 
 
-class WingetGitParser(Parser):
-    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
-        for pkgpath_abs in _iter_directories(path):
+class WingetGitParser(ShardedParser):
+    def iter_shards(self, path: str, num_shards: int) -> Iterable[list[str]]:
+        return split_evenly(list(_iter_directories(path)), num_shards)
+
+    def iter_parse_shard(self, path: str, shard: list[str], factory: PackageFactory) -> Iterable[PackageMaker]:
+        for pkgpath_abs in shard:
             pkgpath_rel = os.path.relpath(pkgpath_abs, path)
 
             with factory.begin(pkgpath_rel) as pkg:
@@ -0,0 +1,54 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+from abc import abstractmethod
+from typing import Any, Iterable
+
+from repology.packagemaker import PackageFactory, PackageMaker
+from repology.parsers import Parser
+from repology.parsers.walk import walk_tree
+from repology.utils.itertools import split_evenly
+
+
+__all__ = ['ShardedParser', 'iter_walk_tree_shards']
+
+
+class ShardedParser(Parser):
+    """Parser which can split its input into independently parsed shards.
+
+    Shards may be parsed in separate processes, so shard descriptions
+    should be small and picklable. Concatenated output of all shards,
+    in order, should be the same as output of iter_parse().
+    """
+
+    @abstractmethod
+    def iter_shards(self, path: str, num_shards: int) -> Iterable[Any]:
+        """Split input into no more than num_shards shards."""
+        pass
+
+    @abstractmethod
+    def iter_parse_shard(self, path: str, shard: Any, factory: PackageFactory) -> Iterable[PackageMaker]:
+        pass
+
+    def iter_parse(self, path: str, factory: PackageFactory) -> Iterable[PackageMaker]:
+        for shard in self.iter_shards(path, 1):
+            yield from self.iter_parse_shard(path, shard, factory)
+
+
+def iter_walk_tree_shards(path: str, num_shards: int, suffix: str | None = None, name: str | None = None) -> Iterable[list[str]]:
+    """Split files matched by walk_tree() into shards."""
+    return split_evenly(list(walk_tree(path, suffix=suffix, name=name)), num_shards)
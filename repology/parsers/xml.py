@@ -18,27 +18,70 @@
 import xml.etree.cElementTree as ElementTree
 from typing import Iterable
 
+from repology.parsers.compression import open_decompressed
+
+try:
+    from lxml import etree as lxml_etree
+    _HAVE_LXML = True
+except ImportError:
+    _HAVE_LXML = False
+
 
 XmlElement = ElementTree.Element
 
 
+def _iter_xml_elements_at_level_lxml(path: str, level: int, tags: list[str]) -> Iterable[XmlElement]:
+    with open_decompressed(path) as xmlfile:
+        # parser only produces events for requested tags, which
+        # is much faster than handling all elements in python
+        for _, elem in lxml_etree.iterparse(xmlfile, events=['end'], tag=tags, huge_tree=True, resolve_entities='internal'):
+            depth = 0
+            parent = elem.getparent()
+            while parent is not None:
+                depth += 1
+                parent = parent.getparent()
+
+            # elements with same tags nested deeper are left in place,
+            # as they are part of elements being yielded
+            if depth != level:
+                continue
+
+            # release all preceding siblings, including ones
+            # not matched by tags
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+            yield elem
+
+            elem.clear(keep_tail=True)
+
+
+def _iter_xml_elements_at_level_stdlib(path: str, level: int, tags: list[str]) -> Iterable[XmlElement]:
+    nestlevel = 0
+
+    with open_decompressed(path) as xmlfile:
+        for event, elem in ElementTree.iterparse(xmlfile, events=['start', 'end']):
+            if event == 'start':
+                nestlevel += 1
+            elif event == 'end':
+                nestlevel -= 1
+                if nestlevel == level:
+                    if elem.tag in tags:
+                        yield elem
+                    elem.clear()
+
+
 def iter_xml_elements_at_level(path: str, level: int, tags: list[str]) -> Iterable[XmlElement]:
     """Iterate all specified elements from XML at given nesting level.
 
     Processed elements are cleared so large XML files may be processed
-    without taking too much memory.
+    without taking too much memory. lxml is used when available, with
+    fallback to the standard library parser.
     """
-    nestlevel = 0
-
-    for event, elem in ElementTree.iterparse(path, events=['start', 'end']):
-        if event == 'start':
-            nestlevel += 1
-        elif event == 'end':
-            nestlevel -= 1
-            if nestlevel == level:
-                if elem.tag in tags:
-                    yield elem
-                elem.clear()
+    if _HAVE_LXML:
+        return _iter_xml_elements_at_level_lxml(path, level, tags)
+    else:
+        return _iter_xml_elements_at_level_stdlib(path, level, tags)
 
 
 def safe_getattr(elt: XmlElement, name: str) -> str:
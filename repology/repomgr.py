@@ -234,8 +234,23 @@ class RepositoryManager:
 
         return filtered_repositories
 
+    def get_all_repositories(self) -> list[Repository]:
+        return self._repositories
+
     def get_names(self, names: RepositoryNameList = None) -> list[str]:
         return [repository.name for repository in self.get_repositories(names)]
 
+    def get_changed_names(self, other: 'RepositoryManager') -> list[str]:
+        """Return names of repositories which were added, modified or removed compared to other manager."""
+        return [
+            repository.name
+            for repository in self._repositories
+            if other._repo_by_name.get(repository.name) != repository
+        ] + [
+            repository.name
+            for repository in other._repositories
+            if repository.name not in self._repo_by_name
+        ]
+
     def get_repository_json(self, name: str) -> str:
         return json.dumps(self.get_repository(name), default=pydantic_encoder)
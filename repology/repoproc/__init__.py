@@ -15,28 +15,36 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
+import multiprocessing
 import os
+import traceback
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from itertools import chain
-from typing import Iterable, Iterator
+from typing import Any, Iterable, Iterator
 
 from repology.atomic_fs import AtomicDir
 from repology.fetchers import Fetcher
+from repology.fetchers.telemetry import telemetry_source
 from repology.linkformatter import format_package_links
-from repology.logger import Logger, NoopLogger
+from repology.logger import AccumulatingLogger, Logger, NoopLogger
 from repology.maintainermgr import MaintainerManager
 from repology.moduleutils import ClassFactory
 from repology.package import Package, PackageFlags, PackageLinkTuple
 from repology.packagemaker import PackageFactory, PackageMaker
 from repology.packageproc import packageset_deduplicate
 from repology.parsers import Parser
+from repology.parsers.incremental import IncrementalParser, iter_parse_incremental
+from repology.parsers.sharding import ShardedParser
 from repology.repomgr import Repository, RepositoryManager, RepositoryNameList, Source
 from repology.repoproc.serialization import ChunkedSerializer, heap_deserialize
 from repology.transformer import PackageTransformer
-from repology.utils.itertools import unicalize
+from repology.transformer.statistics import RuleMatchStatistics
+from repology.utils.itertools import chunked, unicalize
 
 
 MAX_PACKAGES_PER_CHUNK = 10240
+TRANSFORM_BATCH_SIZE = 1024
 
 
 class StateFileFormatCheckProblem(Exception):
@@ -53,12 +61,57 @@ class InconsistentPackage(Exception):
     pass
 
 
+class _ParseWorker:
+    """State of a parallel parsing worker process.
+
+    Set up by the pool initializer, as transformer rules (which
+    are closures) cannot be pickled, so the state can only be
+    passed to forked processes.
+    """
+
+    instance: '_ParseWorker | None' = None
+
+    processor: 'RepositoryProcessor'
+    repository: Repository
+    transformer: PackageTransformer | None
+    maintainermgr: MaintainerManager | None
+    path: str
+
+    def __init__(self, processor: 'RepositoryProcessor', repository: Repository, transformer: PackageTransformer | None, maintainermgr: MaintainerManager | None, path: str) -> None:
+        self.processor = processor
+        self.repository = repository
+        self.transformer = transformer
+        self.maintainermgr = maintainermgr
+        self.path = path
+
+    @staticmethod
+    def initialize(*args: Any) -> None:
+        worker = _ParseWorker.instance = _ParseWorker(*args)
+
+        # forked transformer still holds statistics gathered by the
+        # parent, while only ones gathered here are to be merged back
+        if worker.transformer is not None:
+            worker.transformer.reset_statistics()
+
+    @staticmethod
+    def parse(source: Source, shard: Any, prefix: str) -> tuple[int, AccumulatingLogger, str | None, tuple[int, RuleMatchStatistics] | None]:
+        """Parse source shard, returning results of _serialize_source() and worker's cumulative transformer statistics."""
+        worker = _ParseWorker.instance
+        assert worker is not None
+
+        num_packages, logger, error = worker.processor._serialize_source(worker.repository, source, shard, worker.transformer, worker.maintainermgr, worker.path, prefix)
+
+        return num_packages, logger, error, (os.getpid(), worker.transformer.get_statistics()) if worker.transformer is not None else None
+
+
 class RepositoryProcessor:
-    def __init__(self, repomgr: RepositoryManager, statedir: str, parseddir: str, safety_checks: bool = True) -> None:
+    def __init__(self, repomgr: RepositoryManager, statedir: str, parseddir: str, safety_checks: bool = True, incremental_parsing: bool = False, parse_jobs: int = 1) -> None:
         self.repomgr = repomgr
         self.statedir = statedir
         self.parseddir = parseddir
         self.safety_checks = safety_checks
+        self.incremental_parsing = incremental_parsing
+        self.parse_jobs = parse_jobs
 
         self.fetcher_factory = ClassFactory('repology.fetchers.fetchers', superclass=Fetcher)
         self.parser_factory = ClassFactory('repology.parsers.parsers', superclass=Parser)
@@ -79,6 +132,24 @@ class RepositoryProcessor:
             for filename in os.listdir(dirpath)
         ] if os.path.isdir(dirpath) else []
 
+    def _spawn_parser(self, source: Source) -> Parser:
+        parser: Parser = self.parser_factory.spawn(
+            source.parser['class'],
+            **{k: v for k, v in source.parser.items() if k != 'class'}
+        )
+        return parser
+
+    def _iter_source_shards(self, repository: Repository, source: Source) -> Iterable[Any]:
+        """Split source for parallel parsing, None standing for the whole source."""
+        parser = self._spawn_parser(source)
+
+        # incrementally parsed sources are not sharded, as
+        # cache is maintained for the whole source
+        if not isinstance(parser, ShardedParser) or self.incremental_parsing and isinstance(parser, IncrementalParser):
+            return [None]
+
+        return parser.iter_shards(self._get_state_source_path(repository, source), self.parse_jobs)
+
     # source level private methods
     def _fetch_source(self, repository: Repository, update: bool, source: Source, logger: Logger) -> bool:
         logger.log(f'fetching source {source.name} started')
@@ -88,11 +159,15 @@ class RepositoryProcessor:
             **{k: v for k, v in source.fetcher.items() if k != 'class'}
         )
 
-        have_changes = fetcher.fetch(
-            self._get_state_source_path(repository, source),
-            update=update,
-            logger=logger.get_indented()
-        )
+        with telemetry_source(source.name) as stats:
+            have_changes = fetcher.fetch(
+                self._get_state_source_path(repository, source),
+                update=update,
+                logger=logger.get_indented()
+            )
+
+        if stats is not None:
+            logger.get_indented().log(str(stats))
 
         logger.log(f'fetching source {source.name} complete' + ('' if have_changes else ' (no changes)'))
 
@@ -104,9 +179,10 @@ class RepositoryProcessor:
         source: Source,
         transformer: PackageTransformer | None,
         maintainermgr: MaintainerManager | None,
-        logger: Logger
+        logger: Logger,
+        shard: Any = None
     ) -> Iterator[Package]:
-        def postprocess_parsed_packages(packages_iter: Iterable[PackageMaker]) -> Iterator[Package]:
+        def spawn_packages(packages_iter: Iterable[PackageMaker]) -> Iterator[Package]:
             for packagemaker in packages_iter:
                 try:
                     package = packagemaker.spawn(
@@ -148,39 +224,54 @@ class RepositoryProcessor:
                     )
                 )
 
+                yield package
+
+        def postprocess_parsed_packages(packages_iter: Iterable[PackageMaker]) -> Iterator[Package]:
+            # packages are transformed in batches, which allows
+            # transformer to process them in rule-major order
+            for packages in chunked(spawn_packages(packages_iter), TRANSFORM_BATCH_SIZE):
                 # transform
                 if transformer:
-                    transformer.process(package)
+                    transformer.process_batch(packages)
 
-                # skip removed packages
-                if package.has_flag(PackageFlags.REMOVE):
-                    continue
+                for package in packages:
+                    # skip removed packages
+                    if package.has_flag(PackageFlags.REMOVE):
+                        continue
 
-                # postprocess flavors
-                def strip_flavor(flavor: str) -> str:
-                    flavor.removeprefix(package.effname + '-')
-                    return flavor
+                    # postprocess flavors
+                    def strip_flavor(flavor: str) -> str:
+                        flavor.removeprefix(package.effname + '-')
+                        return flavor
 
-                package.flavors = sorted(set(map(strip_flavor, package.flavors)))
+                    package.flavors = sorted(set(map(strip_flavor, package.flavors)))
 
-                # postprocess maintainers
-                if maintainermgr and package.maintainers:
-                    package.maintainers = [
-                        converted
-                        for maintainer in package.maintainers
-                        if (converted := maintainermgr.convert_maintainer(maintainer)) is not None
-                    ]
+                    # postprocess maintainers
+                    if maintainermgr and package.maintainers:
+                        package.maintainers = [
+                            converted
+                            for maintainer in package.maintainers
+                            if (converted := maintainermgr.convert_maintainer(maintainer)) is not None
+                        ]
 
-                yield package
+                    yield package
 
-        return postprocess_parsed_packages(
-            self.parser_factory.spawn(
-                source.parser['class'],
-                **{k: v for k, v in source.parser.items() if k != 'class'}
-            ).iter_parse(
-                self._get_state_source_path(repository, source),
-                PackageFactory(logger)
+        parser = self._spawn_parser(source)
+        statepath = self._get_state_source_path(repository, source)
+
+        if shard is not None:
+            assert isinstance(parser, ShardedParser)
+            return postprocess_parsed_packages(
+                parser.iter_parse_shard(statepath, shard, PackageFactory(logger))
+            )
+
+        if self.incremental_parsing and isinstance(parser, IncrementalParser):
+            return postprocess_parsed_packages(
+                iter_parse_incremental(parser, statepath, statepath + '.parsecache', logger)
             )
+
+        return postprocess_parsed_packages(
+            parser.iter_parse(statepath, PackageFactory(logger))
         )
 
     def _iter_parse_all_sources(
@@ -195,6 +286,94 @@ class RepositoryProcessor:
             yield from self._iter_parse_source(repository, source, transformer, maintainermgr, logger.get_indented())
             logger.log(f'parsing source {source.name} complete')
 
+    def _serialize_source(
+        self,
+        repository: Repository,
+        source: Source,
+        shard: Any,
+        transformer: PackageTransformer | None,
+        maintainermgr: MaintainerManager | None,
+        path: str,
+        prefix: str
+    ) -> tuple[int, AccumulatingLogger, str | None]:
+        """Parse a single source or its shard into own chunks, for parallel parsing.
+
+        Returns number of packages, log of parsing and error description
+        if parsing has failed.
+        """
+        logger = AccumulatingLogger()
+        serializer = ChunkedSerializer(path, MAX_PACKAGES_PER_CHUNK, prefix=prefix)
+
+        try:
+            serializer.serialize(self._iter_parse_source(repository, source, transformer, maintainermgr, logger, shard))
+        except Exception:
+            return serializer.get_num_packages(), logger, traceback.format_exc()
+
+        return serializer.get_num_packages(), logger, None
+
+    def _serialize_all_sources_parallel(
+        self,
+        repository: Repository,
+        transformer: PackageTransformer | None,
+        maintainermgr: MaintainerManager | None,
+        path: str,
+        logger: Logger
+    ) -> int:
+        # chunks of each source or shard are sorted runs, so they are merged
+        # along with all other chunks when parsed packages are read
+        with ProcessPoolExecutor(
+            max_workers=self.parse_jobs,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_ParseWorker.initialize,
+            initargs=(self, repository, transformer, maintainermgr, path)
+        ) as executor:
+            # shards are submitted as soon as their source is split,
+            # so splitting of subsequent sources runs in parallel
+            # with parsing
+            tasks = [
+                (
+                    source,
+                    [
+                        executor.submit(_ParseWorker.parse, source, shard, '{}.{}.'.format(source.name.replace('/', '_'), nshard))
+                        for nshard, shard in enumerate(self._iter_source_shards(repository, source))
+                    ]
+                )
+                for source in repository.sources
+            ]
+
+            num_packages = 0
+
+            # statistics are cumulative for each worker process, so only
+            # the latest (that is, largest) ones from each are merged
+            worker_statistics: dict[int, RuleMatchStatistics] = {}
+
+            # logs are replayed in order of sources, as their parsing completes
+            for source, futures in tasks:
+                logger.log(f'parsing source {source.name} started')
+
+                for future in futures:
+                    shard_packages, shard_logger, error, statistics = future.result()
+                    shard_logger.forward(logger.get_indented())
+
+                    if statistics is not None:
+                        pid, current = statistics
+                        if pid not in worker_statistics or current.get_total_packages() > worker_statistics[pid].get_total_packages():
+                            worker_statistics[pid] = current
+
+                    if error is not None:
+                        executor.shutdown(cancel_futures=True)
+                        raise RuntimeError(f'parsing source {source.name} failed in worker process:\n{error}')
+
+                    num_packages += shard_packages
+
+                logger.log(f'parsing source {source.name} complete')
+
+            if transformer is not None:
+                for current in worker_statistics.values():
+                    transformer.merge_statistics(current)
+
+            return num_packages
+
     # repository level private methods
     def _fetch(self, repository: Repository, update: bool, logger: Logger) -> bool:
         logger.log('fetching started')
@@ -225,14 +404,18 @@ class RepositoryProcessor:
             os.mkdir(self.parseddir)
 
         with AtomicDir(self._get_parsed_path(repository)) as state_dir:
-            serializer = ChunkedSerializer(state_dir.get_path(), MAX_PACKAGES_PER_CHUNK)
-
-            serializer.serialize(self._iter_parse_all_sources(repository, transformer, maintainermgr, logger))
-
-            if self.safety_checks and serializer.get_num_packages() < repository.minpackages:
-                raise TooLittlePackages(serializer.get_num_packages(), repository.minpackages)
-
-        logger.log('parsing complete, {} packages'.format(serializer.get_num_packages()))
+            # profiles are collected in the parent process only
+            if self.parse_jobs > 1 and (transformer is None or not transformer.is_profiling()) and 'fork' in multiprocessing.get_all_start_methods():
+                num_packages = self._serialize_all_sources_parallel(repository, transformer, maintainermgr, state_dir.get_path(), logger)
+            else:
+                serializer = ChunkedSerializer(state_dir.get_path(), MAX_PACKAGES_PER_CHUNK)
+                serializer.serialize(self._iter_parse_all_sources(repository, transformer, maintainermgr, logger))
+                num_packages = serializer.get_num_packages()
+
+            if self.safety_checks and num_packages < repository.minpackages:
+                raise TooLittlePackages(num_packages, repository.minpackages)
+
+        logger.log('parsing complete, {} packages'.format(num_packages))
 
     # public methods
     def fetch(self, reponames: RepositoryNameList, update: bool = True, logger: Logger = NoopLogger()) -> bool:
@@ -25,13 +25,15 @@ from repology.package import Package
 
 class ChunkedSerializer:
     path: str
+    prefix: str
     next_chunk_number: int
     chunk_size: int
     packages: list[Package]
     total_packages: int
 
-    def __init__(self, path: str, chunk_size: int) -> None:
+    def __init__(self, path: str, chunk_size: int, prefix: str = '') -> None:
         self.path = path
+        self.prefix = prefix
         self.next_chunk_number = 0
         self.chunk_size = chunk_size
         self.packages = []
@@ -43,7 +45,7 @@ class ChunkedSerializer:
 
         packages = sorted(self.packages, key=lambda package: package.effname)
 
-        with open(os.path.join(self.path, str(self.next_chunk_number)), 'wb') as outfile:
+        with open(os.path.join(self.path, self.prefix + str(self.next_chunk_number)), 'wb') as outfile:
             pickler = pickle.Pickler(outfile, protocol=pickle.HIGHEST_PROTOCOL)
             pickler.fast = True  # deprecated, but I don't see any alternatives
             pickler.dump(len(packages))
@@ -16,11 +16,17 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 import subprocess
+import time
+from typing import Callable
 
 from repology.logger import Logger
 
 
-def run_subprocess(command: list[str], logger: Logger, cwd: str | None = None) -> None:
+# called with command run time and its output once it finishes
+CommandCallback = Callable[[float, str], None]
+
+
+def run_subprocess(command: list[str], logger: Logger, cwd: str | None = None, on_finish: CommandCallback | None = None) -> None:
     message = 'running "{}"'.format(' '.join(command))
     if cwd is not None:
         message += ' in "{}"'.format(cwd)
@@ -34,16 +40,25 @@ def run_subprocess(command: list[str], logger: Logger, cwd: str | None = None) -
                           encoding='utf-8',
                           errors='ignore',
                           cwd=cwd) as proc:
+        start = time.monotonic()
+        output = []
+
         assert proc.stdout
         for line in proc.stdout:
             logger.get_indented().log(line.strip())
+            if on_finish is not None:
+                output.append(line)
         proc.wait()
+
+        if on_finish is not None:
+            on_finish(time.monotonic() - start, ''.join(output))
+
         logger.log('command finished with code {}'.format(proc.returncode), logger.NOTICE if proc.returncode == 0 else logger.ERROR)
         if proc.returncode != 0:
             raise subprocess.CalledProcessError(cmd=command, returncode=proc.returncode)
 
 
-def get_subprocess_output(command: list[str], logger: Logger, cwd: str | None = None) -> str:
+def get_subprocess_output(command: list[str], logger: Logger, cwd: str | None = None, on_finish: CommandCallback | None = None) -> str:
     message = 'running "{}"'.format(' '.join(command))
     if cwd is not None:
         message += ' in "{}"'.format(cwd)
@@ -59,10 +74,16 @@ def get_subprocess_output(command: list[str], logger: Logger, cwd: str | None =
                           encoding='utf-8',
                           errors='ignore',
                           cwd=cwd) as proc:
+        start = time.monotonic()
+
         assert proc.stdout
         for line in proc.stdout:
             res += line
         proc.wait()
+
+        if on_finish is not None:
+            on_finish(time.monotonic() - start, res)
+
         logger.log('command finished with code {}'.format(proc.returncode), logger.NOTICE if proc.returncode == 0 else logger.ERROR)
         if proc.returncode != 0:
             raise subprocess.CalledProcessError(cmd=command, returncode=proc.returncode)
@@ -73,13 +94,15 @@ def get_subprocess_output(command: list[str], logger: Logger, cwd: str | None =
 class Runner:
     _logger: Logger
     _cwd: str | None
+    _on_finish: CommandCallback | None
 
-    def __init__(self, logger: Logger, cwd: str | None = None) -> None:
+    def __init__(self, logger: Logger, cwd: str | None = None, on_finish: CommandCallback | None = None) -> None:
         self._logger = logger
         self._cwd = cwd
+        self._on_finish = on_finish
 
     def run(self, *args: str | None) -> None:
-        run_subprocess([arg for arg in args if arg is not None], logger=self._logger, cwd=self._cwd)
+        run_subprocess([arg for arg in args if arg is not None], logger=self._logger, cwd=self._cwd, on_finish=self._on_finish)
 
     def get(self, *args: str | None) -> str:
-        return get_subprocess_output([arg for arg in args if arg is not None], logger=self._logger, cwd=self._cwd)
+        return get_subprocess_output([arg for arg in args if arg is not None], logger=self._logger, cwd=self._cwd, on_finish=self._on_finish)
@@ -19,8 +19,10 @@ import sys
 from typing import Iterable
 
 from repology.package import Package, PackageFlags
+from repology.transformer.blocks import RuleBlock
 from repology.transformer.contexts import PackageContext
 from repology.transformer.iterator import RulesetIterator
+from repology.transformer.profile import RuleProfiler
 from repology.transformer.ruleset import Ruleset
 from repology.transformer.statistics import RuleMatchStatistics
 
@@ -31,24 +33,26 @@ class PackageTransformer:
     _active_statistics: RuleMatchStatistics
     _next_statistics: RuleMatchStatistics
     _iterator: RulesetIterator
+    _profiler: RuleProfiler | None
+    _rule_major: bool
 
     # XXX: introduce a dataclass in RepoMgr to hold repository information and pass it here
     # instead of repository_name and rulesets. We should also get path to persistent rule match
     # statistics file from it.
-    def __init__(self, ruleset: Ruleset, repository_name: str, rulesets: Iterable[str]) -> None:
+    def __init__(self, ruleset: Ruleset, repository_name: str, rulesets: Iterable[str], profiler: RuleProfiler | None = None, rule_major: bool = False) -> None:
         self._ruleset = ruleset
         self._repository_name = repository_name
         self._active_statistics = RuleMatchStatistics()  # XXX: load persistent statistics here
         self._next_statistics = RuleMatchStatistics()
 
         self._iterator = RulesetIterator(ruleset, set(rulesets), self._active_statistics)
+        self._profiler = profiler
+        self._rule_major = rule_major
 
-    def process(self, package: Package) -> None:
+    def _begin_package(self, package: Package) -> PackageContext:
         # XXX: duplicate code: PackageMaker does the same
         package.effname = package.projectname_seed
 
-        package_context = PackageContext()
-
         if package.repo != self._repository_name:
             raise RuntimeError(f'not expected package from repository "{package.repo}" with ruleset for repository "{self._repository_name}"')
 
@@ -62,25 +66,132 @@ class PackageTransformer:
 
         self._next_statistics.count_package()
 
+        return PackageContext()
+
+    def _finish_package(self, package: Package, package_context: PackageContext) -> None:
+        if package_context.warnings and not package.has_flag(PackageFlags.REMOVE):
+            for warning in package_context.warnings:
+                print('Rule warning for {} ({}) in {}: {}'.format(package.effname, package.trackname or '???', package.repo, warning), file=sys.stderr)
+
+        if package.has_flag(PackageFlags.TRACE):
+            print('Rule trace for {} ({}) {} in {}'.format(package.effname, package.trackname or '???', package.version, package.repo), file=sys.stderr)
+            for rulenum in package_context.matched_rules:
+                print('{:5d} {}'.format(rulenum, self._ruleset.get_rules()[rulenum].pretty), file=sys.stderr)
+
+    def process(self, package: Package) -> None:
+        package_context = self._begin_package(package)
+
+        if self._profiler is not None:
+            self._process_profiled(package, package_context, self._profiler)
+        else:
+            for rule in self._iterator.iter_rules_for_package(package):
+                match_context = rule.match(package, package_context)
+                if not match_context:
+                    continue
+
+                self._next_statistics.count_rule_match(rule.texthash)
+
+                rule.apply(package, package_context, match_context)
+                if match_context.last:
+                    break
+
+        self._finish_package(package, package_context)
+
+    def _process_profiled(self, package: Package, package_context: PackageContext, profiler: RuleProfiler) -> None:
+        profiler.count_package()
+
         for rule in self._iterator.iter_rules_for_package(package):
-            match_context = rule.match(package, package_context)
+            match_context = profiler.match(rule, package, package_context)
             if not match_context:
                 continue
 
             self._next_statistics.count_rule_match(rule.texthash)
 
-            rule.apply(package, package_context, match_context)
+            profiler.apply(rule, package, package_context, match_context)
             if match_context.last:
                 break
 
-        if package_context.warnings and not package.has_flag(PackageFlags.REMOVE):
-            for warning in package_context.warnings:
-                print('Rule warning for {} ({}) in {}: {}'.format(package.effname, package.trackname or '???', package.repo, warning), file=sys.stderr)
+    def process_batch(self, packages: list[Package]) -> None:
+        """Transform a batch of packages.
 
-        if package.has_flag(PackageFlags.TRACE):
-            print('Rule trace for {} ({}) {} in {}'.format(package.effname, package.trackname or '???', package.version, package.repo), file=sys.stderr)
-            for rulenum in package_context.matched_rules:
-                print('{:5d} {}'.format(rulenum, self._ruleset.get_rules()[rulenum].pretty), file=sys.stderr)
+        Produces the same result as calling process() on each package.
+        In rule-major mode, instead of running each package through
+        all rules, each rule block is run over all packages of the
+        batch, which allows blocks to prune non-matching packages in
+        bulk. Rules are still applied in the same order for each
+        package. Profiling is only supported in package-major mode.
+        """
+        if not self._rule_major or self._profiler is not None:
+            for package in packages:
+                self.process(package)
+            return
+
+        package_contexts = [self._begin_package(package) for package in packages]
+
+        self._process_blocks_rule_major(self._iterator.get_rule_blocks(), packages, package_contexts, list(range(len(packages))))
+
+        for package, package_context in zip(packages, package_contexts):
+            self._finish_package(package, package_context)
+
+    def _process_blocks_rule_major(self, blocks: list[RuleBlock], packages: list[Package], package_contexts: list[PackageContext], active: list[int]) -> set[int]:
+        # active are indexes of packages to process; returns
+        # indexes of packages finished by a `last' rule
+        finished: set[int] = set()
+        num_finished = 0
+
+        for block in blocks:
+            if len(finished) != num_finished:
+                active = [index for index in active if index not in finished]
+                num_finished = len(finished)
+
+            if not active:
+                break
+
+            candidates = [active[position] for position in block.prefilter([packages[index].effname for index in active])]
+
+            if not candidates:
+                continue
+
+            if sub_blocks := block.get_sub_blocks():
+                finished.update(self._process_blocks_rule_major(sub_blocks, packages, package_contexts, candidates))
+                continue
+
+            for index in candidates:
+                package = packages[index]
+                package_context = package_contexts[index]
+
+                for rule in block.iter_rules(package):
+                    match_context = rule.match(package, package_context)
+                    if not match_context:
+                        continue
+
+                    self._next_statistics.count_rule_match(rule.texthash)
+
+                    rule.apply(package, package_context, match_context)
+                    if match_context.last:
+                        finished.add(index)
+                        break
+
+        return finished
+
+    def is_profiling(self) -> bool:
+        return self._profiler is not None
+
+    def get_statistics(self) -> RuleMatchStatistics:
+        """Return rule match statistics gathered so far."""
+        return self._next_statistics
+
+    def reset_statistics(self) -> None:
+        """Start gathering rule match statistics from scratch.
+
+        Used in copies of this transformer, so these only gather
+        statistics to be merged back with merge_statistics().
+        """
+        self._next_statistics = RuleMatchStatistics()
+
+    def merge_statistics(self, statistics: RuleMatchStatistics) -> None:
+        """Add rule match statistics gathered by a copy of this transformer, e.g. in another process."""
+        self._next_statistics.merge(statistics)
 
     def finalize(self) -> None:
         pass  # XXX: save _next_statistics here
@@ -18,6 +18,7 @@
 import re
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from itertools import compress
 from typing import Iterable, Pattern
 
 from repology.package import Package
@@ -37,12 +38,35 @@ class RuleBlock(ABC):
     def get_rule_range(self) -> tuple[int, int]:
         pass
 
+    def prefilter(self, effnames: list[str]) -> Iterable[int]:
+        """Return indexes of effnames which rules of this block may match.
+
+        Used to prune packages in bulk in batched (rule-major)
+        transformation mode.
+        """
+        return range(len(effnames))
+
+    def get_sub_blocks(self) -> list['RuleBlock']:
+        return []
+
 
 class SingleRuleBlock(RuleBlock):
     _rule: Rule
+    _names: set[str] | None
+    _namepat: Pattern[str] | None
 
     def __init__(self, rule: Rule) -> None:
         self._rule = rule
+        self._names = set(rule.names) if rule.names else None
+        self._namepat = re.compile(rule.namepat, re.ASCII) if rule.namepat else None
+
+    def prefilter(self, effnames: list[str]) -> Iterable[int]:
+        if self._names is not None:
+            return compress(range(len(effnames)), map(self._names.__contains__, effnames))
+        elif self._namepat is not None:
+            return compress(range(len(effnames)), map(self._namepat.fullmatch, effnames))
+        else:
+            return range(len(effnames))
 
     def iter_rules(self, package: Package) -> Iterable[Rule]:
         return [self._rule]
@@ -69,6 +93,9 @@ class NameMapRuleBlock(RuleBlock):
             for name in rule.names:
                 self._name_map[name].append(rule)
 
+    def prefilter(self, effnames: list[str]) -> Iterable[int]:
+        return compress(range(len(effnames)), map(self._name_map.__contains__, effnames))
+
     def iter_rules(self, package: Package) -> Iterable[Rule]:
         min_rule_num = 0
         while True:
@@ -117,6 +144,18 @@ class CoveringRuleBlock(RuleBlock):
         self._megaregexp = re.compile('|'.join(megaregexp_parts), re.ASCII)
         self._sub_blocks = blocks
 
+    def prefilter(self, effnames: list[str]) -> Iterable[int]:
+        # both checks are done over the whole column of names without
+        # leaving C code, which is much faster than per-package checks
+        return compress(
+            range(len(effnames)),
+            map(
+                bool.__or__,
+                map(self._names.__contains__, effnames),
+                map(bool, map(self._megaregexp.fullmatch, effnames))
+            )
+        )
+
     def iter_rules(self, package: Package) -> Iterable[Rule]:
         if package.effname in self._names or self._megaregexp.fullmatch(package.effname):
             for block in self._sub_blocks:
@@ -126,5 +165,8 @@ class CoveringRuleBlock(RuleBlock):
         for block in self._sub_blocks:
             yield from block.iter_all_rules()
 
+    def get_sub_blocks(self) -> list[RuleBlock]:
+        return self._sub_blocks
+
     def get_rule_range(self) -> tuple[int, int]:
         return self._sub_blocks[0].get_rule_range()[0], self._sub_blocks[-1].get_rule_range()[-1]
@@ -17,18 +17,29 @@
 
 from typing import Match
 
+from repology.package import LinkType, Package
+from repology.transformer.urlindex import UrlIndex
 from repology.transformer.util import DOLLAR0, DOLLARN
+from repology.transformer.versionindex import VersionBoundIndex
 
 
 class PackageContext:
-    __slots__ = ['_flags', 'warnings', 'matched_rules']
+    __slots__ = ['_flags', '_urls', '_lower_urls', '_url_matches', '_version_bound_searches', 'warnings', 'matched_rules']
 
     _flags: set[str]
+    _urls: list[str] | None
+    _lower_urls: list[str] | None
+    _url_matches: set[int] | None
+    _version_bound_searches: dict[int, tuple[str, int, int]]
     warnings: list[str]
     matched_rules: list[int]
 
     def __init__(self) -> None:
         self._flags = set()
+        self._urls = None
+        self._lower_urls = None
+        self._url_matches = None
+        self._version_bound_searches = {}
         self.warnings = []
         self.matched_rules = []
 
@@ -41,6 +52,37 @@ class PackageContext:
     def has_flags(self, names: set[str]) -> bool:
         return not self._flags.isdisjoint(names)
 
+    # package links are never modified by rules, so it's safe
+    # to compute URL related data once per package
+    def get_urls(self, package: Package) -> list[str]:
+        if self._urls is None:
+            self._urls = [
+                '#'.join(url_frag)
+                for link_type, *url_frag in package.links
+                if LinkType.is_relevant_for_rule_matching(link_type)
+            ] if package.links is not None else []
+        return self._urls
+
+    def get_lower_urls(self, package: Package) -> list[str]:
+        if self._lower_urls is None:
+            self._lower_urls = [url.lower() for url in self.get_urls(package)]
+        return self._lower_urls
+
+    def get_url_matches(self, package: Package, url_index: UrlIndex) -> set[int]:
+        if self._url_matches is None:
+            self._url_matches = url_index.match(self.get_lower_urls(package))
+        return self._url_matches
+
+    # unlike links, package version may be changed by rules, so
+    # search results are remembered along with the version
+    def compare_version_bound(self, package: Package, version_index: VersionBoundIndex, group_id: int, bound_id: int) -> int:
+        search = self._version_bound_searches.get(group_id)
+        if search is None or search[0] != package.version:
+            search = self._version_bound_searches[group_id] = (package.version, *version_index.search(package.version, group_id))
+
+        position = version_index.get_position(group_id, bound_id)
+        return 1 if position < search[1] else 0 if position < search[2] else -1
+
     def add_warning(self, warning: str) -> None:
         self.warnings.append(warning)
 
@@ -49,9 +49,7 @@ class RulesetIterator:
             current_name_rules = []
 
         for rule in ruleset.get_rules():
-            if rule.rulesets is not None and rule.rulesets.isdisjoint(rulesets):
-                continue
-            if rule.norulesets is not None and not rule.norulesets.isdisjoint(rulesets):
+            if not rule.is_applicable(rulesets):
                 continue
 
             if rule.names:
@@ -102,6 +100,9 @@ class RulesetIterator:
         self._statistics = statistics
         self._recalc_opt_ruleblocks()
 
+    def get_rule_blocks(self) -> list[RuleBlock]:
+        return self._optruleblocks
+
     def iter_rules_for_package(self, package: Package) -> Iterator[Rule]:
         for ruleblock in self._optruleblocks:
             yield from ruleblock.iter_rules(package)
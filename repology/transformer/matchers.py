@@ -18,34 +18,66 @@
 import re
 from typing import Any, Callable, Final, cast
 
-from libversion import LOWER_BOUND, UPPER_BOUND, version_compare
+from libversion import LOWER_BOUND, UPPER_BOUND
 
-from repology.package import LinkType, Package, PackageFlags
+from repology.package import Package, PackageFlags
 from repology.transformer.contexts import MatchContext, PackageContext
+from repology.transformer.urlindex import UrlIndex
 from repology.transformer.util import yaml_as_list, yaml_as_lowercase_list, yaml_as_lowercase_set, yaml_as_set
+from repology.transformer.versionindex import VersionBoundIndex
 
 
-__all__ = ['get_matcher_generators']
+__all__ = ['MatcherIndexes', 'get_matcher_generators']
+
+
+class MatcherIndexes:
+    """Ruleset-wide indexes shared by matchers of all rules."""
+
+    __slots__ = ['urls', 'versions']
+
+    urls: UrlIndex
+    versions: VersionBoundIndex
+
+    def __init__(self) -> None:
+        self.urls = UrlIndex()
+        self.versions = VersionBoundIndex()
 
 
 # types
 Matcher = Callable[[Package, PackageContext, MatchContext], bool]
 MatcherGenerator = Callable[[Any], Matcher]
+IndexedMatcherGenerator = Callable[[Any, MatcherIndexes], Matcher]
 
 
-# machinery for matcher registration
-_matcher_generators: list[tuple[str, MatcherGenerator]] = []
+# machinery for matcher registration; plain and indexed matchers
+# are kept in a single list, so matchers of a rule are checked in
+# order of their definition
+_matcher_generators: list[tuple[str, IndexedMatcherGenerator]] = []
 
 
-def get_matcher_generators() -> list[tuple[str, MatcherGenerator]]:
+def get_matcher_generators() -> list[tuple[str, IndexedMatcherGenerator]]:
     return _matcher_generators
 
 
 def _matcher_generator(func: MatcherGenerator) -> MatcherGenerator:
+    _matcher_generators.append((func.__name__, lambda ruledata, indexes: func(ruledata)))
+    return func
+
+
+# these matchers register their data (URL prefixes or substrings,
+# version bounds) in ruleset-wide indexes, so these are checked
+# for all rules at once
+def _indexed_matcher_generator(func: IndexedMatcherGenerator) -> IndexedMatcherGenerator:
     _matcher_generators.append((func.__name__, func))
     return func
 
 
+# version bounds of rules for the same name are grouped together
+def _get_version_bound_group(ruledata: Any) -> str | None:
+    names = ruledata.get('name')
+    return names[0] if names is not None and len(names) == 1 else None
+
+
 # matchers
 @_matcher_generator
 def category(ruledata: Any) -> Matcher:
@@ -182,123 +214,151 @@ def vercomps(ruledata: Any) -> Matcher:
 
 
 # ver* matchers
-@_matcher_generator
-def vergt(ruledata: Any) -> Matcher:
-    vergt: Final[str] = ruledata['vergt']
+@_indexed_matcher_generator
+def vergt(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['vergt'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, vergt) > 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) > 0
 
     return matcher
 
 
-@_matcher_generator
-def verge(ruledata: Any) -> Matcher:
-    verge: Final[str] = ruledata['verge']
+@_indexed_matcher_generator
+def verge(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['verge'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, verge) >= 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) >= 0
 
     return matcher
 
 
-@_matcher_generator
-def verlt(ruledata: Any) -> Matcher:
-    verlt: Final[str] = ruledata['verlt']
+@_indexed_matcher_generator
+def verlt(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['verlt'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, verlt) < 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) < 0
 
     return matcher
 
 
-@_matcher_generator
-def verle(ruledata: Any) -> Matcher:
-    verle: Final[str] = ruledata['verle']
+@_indexed_matcher_generator
+def verle(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['verle'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, verle) <= 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) <= 0
 
     return matcher
 
 
-@_matcher_generator
-def vereq(ruledata: Any) -> Matcher:
-    vereq: Final[str] = ruledata['vereq']
+@_indexed_matcher_generator
+def vereq(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['vereq'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, vereq) == 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) == 0
 
     return matcher
 
 
-@_matcher_generator
-def verne(ruledata: Any) -> Matcher:
-    verne: Final[str] = ruledata['verne']
+@_indexed_matcher_generator
+def verne(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['verne'])
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, verne) != 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) != 0
 
     return matcher
 
 
 # rel* matchers
-@_matcher_generator
-def relgt(ruledata: Any) -> Matcher:
-    relgt: Final[str] = ruledata['relgt']
+@_indexed_matcher_generator
+def relgt(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['relgt'], UPPER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, relgt, 0, UPPER_BOUND) > 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) > 0
 
     return matcher
 
 
-@_matcher_generator
-def relge(ruledata: Any) -> Matcher:
-    relge: Final[str] = ruledata['relge']
+@_indexed_matcher_generator
+def relge(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['relge'], LOWER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, relge, 0, LOWER_BOUND) > 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) > 0
 
     return matcher
 
 
-@_matcher_generator
-def rellt(ruledata: Any) -> Matcher:
-    rellt: Final[str] = ruledata['rellt']
+@_indexed_matcher_generator
+def rellt(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['rellt'], LOWER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, rellt, 0, LOWER_BOUND) < 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) < 0
 
     return matcher
 
 
-@_matcher_generator
-def relle(ruledata: Any) -> Matcher:
-    relle: Final[str] = ruledata['relle']
+@_indexed_matcher_generator
+def relle(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    bound_id = versions.add_bound(group_id, ruledata['relle'], UPPER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, relle, 0, UPPER_BOUND) < 0
+        return package_context.compare_version_bound(package, versions, group_id, bound_id) < 0
 
     return matcher
 
 
-@_matcher_generator
-def releq(ruledata: Any) -> Matcher:
+@_indexed_matcher_generator
+def releq(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
     releq = cast(str, ruledata['releq'])
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    lower_bound_id = versions.add_bound(group_id, releq, LOWER_BOUND)
+    upper_bound_id = versions.add_bound(group_id, releq, UPPER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, releq, 0, LOWER_BOUND) > 0 and version_compare(package.version, releq, 0, UPPER_BOUND) < 0
+        return package_context.compare_version_bound(package, versions, group_id, lower_bound_id) > 0 and package_context.compare_version_bound(package, versions, group_id, upper_bound_id) < 0
 
     return matcher
 
 
-@_matcher_generator
-def relne(ruledata: Any) -> Matcher:
+@_indexed_matcher_generator
+def relne(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    versions = indexes.versions
     relne = cast(str, ruledata['relne'])
+    group_id = versions.get_group(_get_version_bound_group(ruledata))
+    lower_bound_id = versions.add_bound(group_id, relne, LOWER_BOUND)
+    upper_bound_id = versions.add_bound(group_id, relne, UPPER_BOUND)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        return version_compare(package.version, relne, 0, LOWER_BOUND) < 0 or version_compare(package.version, relne, 0, UPPER_BOUND) > 0
+        return package_context.compare_version_bound(package, versions, group_id, lower_bound_id) < 0 or package_context.compare_version_bound(package, versions, group_id, upper_bound_id) > 0
 
     return matcher
 
@@ -309,54 +369,40 @@ def wwwpat(ruledata: Any) -> Matcher:
     wwwpat = re.compile(ruledata['wwwpat'].replace('\n', '').lower(), re.ASCII)
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        if package.links is not None:
-            for link_type, *url_frag in package.links:
-                if LinkType.is_relevant_for_rule_matching(link_type) and wwwpat.fullmatch('#'.join(url_frag)):
-                    return True
+        for url in package_context.get_urls(package):
+            if wwwpat.fullmatch(url):
+                return True
 
         return False
 
     return matcher
 
 
-@_matcher_generator
-def wwwpart(ruledata: Any) -> Matcher:
-    wwwparts = yaml_as_lowercase_list(ruledata['wwwpart'])
+@_indexed_matcher_generator
+def wwwpart(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    url_index = indexes.urls
+    key = url_index.add_parts(yaml_as_lowercase_list(ruledata['wwwpart']))
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        if package.links is not None:
-            for link_type, *url_frag in package.links:
-                if LinkType.is_relevant_for_rule_matching(link_type):
-                    lower_url = '#'.join(url_frag).lower()
-                    for wwwpart in wwwparts:
-                        if wwwpart in lower_url:
-                            return True
-
-        return False
+        return key in package_context.get_url_matches(package, url_index)
 
     return matcher
 
 
-@_matcher_generator
-def wwwprefix(ruledata: Any) -> Matcher:
-    wwwprefixes = yaml_as_lowercase_list(ruledata['wwwprefix'])
+@_indexed_matcher_generator
+def wwwprefix(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    url_index = indexes.urls
+    key = url_index.add_prefixes(yaml_as_lowercase_list(ruledata['wwwprefix']))
 
     def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        if package.links is not None:
-            for link_type, *url_frag in package.links:
-                if LinkType.is_relevant_for_rule_matching(link_type):
-                    lower_url = '#'.join(url_frag).lower()
-                    for wwwprefix in wwwprefixes:
-                        if lower_url.startswith(wwwprefix):
-                            return True
-
-        return False
+        return key in package_context.get_url_matches(package, url_index)
 
     return matcher
 
 
-@_matcher_generator
-def sourceforge(ruledata: Any) -> Matcher:
+@_indexed_matcher_generator
+def sourceforge(ruledata: Any, indexes: MatcherIndexes) -> Matcher:
+    url_index = indexes.urls
     url_prefixes = []
     for project in yaml_as_lowercase_list(ruledata['sourceforge']):
         url_prefixes.extend([
@@ -372,16 +418,10 @@ def sourceforge(ruledata: Any) -> Matcher:
             f'http://{project}.sf.net/',
         ])
 
-    def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
-        if package.links is not None:
-            for link_type, *url_frag in package.links:
-                lower_url = '#'.join(url_frag).lower()
-                if LinkType.is_relevant_for_rule_matching(link_type):
-                    for prefix in url_prefixes:
-                        if lower_url.startswith(prefix):
-                            return True
+    key = url_index.add_prefixes(url_prefixes)
 
-        return False
+    def matcher(package: Package, package_context: PackageContext, match_context: MatchContext) -> bool:
+        return key in package_context.get_url_matches(package, url_index)
 
     return matcher
 
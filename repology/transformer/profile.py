@@ -0,0 +1,159 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Iterator
+
+from repology.package import Package
+from repology.transformer.contexts import MatchContext, PackageContext
+from repology.transformer.rule import Rule
+
+
+__all__ = ['RuleProfiler']
+
+
+class _RuleProfile:
+    __slots__ = ['rule', 'evaluations', 'matches', 'match_time', 'apply_time', 'matcher_times']
+
+    rule: Rule
+    evaluations: int
+    matches: int
+    match_time: float
+    apply_time: float
+    matcher_times: dict[str, float]
+
+    def __init__(self, rule: Rule) -> None:
+        self.rule = rule
+        self.evaluations = 0
+        self.matches = 0
+        self.match_time = 0.0
+        self.apply_time = 0.0
+        self.matcher_times = defaultdict(float)
+
+    def get_total_time(self) -> float:
+        return self.match_time + self.apply_time
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'number': self.rule.number,
+            'texthash': self.rule.texthash,
+            'rule': self.rule.pretty,
+            'evaluations': self.evaluations,
+            'matches': self.matches,
+            'match_time': self.match_time,
+            'apply_time': self.apply_time,
+            'matcher_times': dict(self.matcher_times),
+        }
+
+
+class RuleProfiler:
+    """Collector of per-Rule evaluation costs.
+
+    When passed to PackageTransformer, it is used instead of plain
+    Rule.match and Rule.apply calls, and records how many times each
+    Rule was evaluated and matched, along with cumulative time spent
+    in matching (split by matcher keyword) and in applying actions.
+
+    This is intended to find rules (most likely, heavy regular
+    expressions) which slow parsing down, and is not meant to be
+    enabled in production as it imposes noticeable overhead.
+    """
+
+    _profiles: dict[int, _RuleProfile]
+    _total_packages: int
+
+    def __init__(self) -> None:
+        self._profiles = {}
+        self._total_packages = 0
+
+    def _get_profile(self, rule: Rule) -> _RuleProfile:
+        if (profile := self._profiles.get(rule.number)) is None:
+            profile = self._profiles[rule.number] = _RuleProfile(rule)
+        return profile
+
+    def count_package(self) -> None:
+        self._total_packages += 1
+
+    def match(self, rule: Rule, package: Package, package_context: PackageContext) -> MatchContext | None:
+        profile = self._get_profile(rule)
+        profile.evaluations += 1
+
+        match_context = MatchContext()
+        matched = True
+
+        match_start = perf_counter()
+
+        for keyword, matcher in rule.iter_matchers():
+            matcher_start = perf_counter()
+            matched = matcher(package, package_context, match_context)
+            profile.matcher_times[keyword] += perf_counter() - matcher_start
+
+            if not matched:
+                break
+
+        profile.match_time += perf_counter() - match_start
+
+        if not matched:
+            return None
+
+        profile.matches += 1
+        package_context.add_matched_rule(rule.number)
+
+        return match_context
+
+    def apply(self, rule: Rule, package: Package, package_context: PackageContext, match_context: MatchContext) -> None:
+        profile = self._get_profile(rule)
+
+        apply_start = perf_counter()
+        rule.apply(package, package_context, match_context)
+        profile.apply_time += perf_counter() - apply_start
+
+    def iter_hottest(self, limit: int | None = None) -> Iterator[_RuleProfile]:
+        yield from sorted(self._profiles.values(), key=lambda profile: profile.get_total_time(), reverse=True)[:limit]
+
+    def iter_report_lines(self, limit: int = 20) -> Iterator[str]:
+        total_time = sum(profile.get_total_time() for profile in self._profiles.values())
+
+        yield f'{self._total_packages} package(s) processed, {len(self._profiles)} rule(s) evaluated, {total_time:.3f} s total'
+
+        for profile in self.iter_hottest(limit):
+            matchers = ', '.join(
+                f'{keyword} {seconds:.3f}s'
+                for keyword, seconds in sorted(profile.matcher_times.items(), key=lambda item: item[1], reverse=True)
+            )
+
+            yield (
+                f'{profile.rule.number:5d} {profile.rule.texthash:016x}: {profile.get_total_time():.3f}s '
+                f'(match {profile.match_time:.3f}s [{matchers}], apply {profile.apply_time:.3f}s), '
+                f'{profile.evaluations} evaluation(s), {profile.matches} match(es): {profile.rule.pretty}'
+            )
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w') as fd:
+            json.dump(
+                {
+                    'total_packages': self._total_packages,
+                    'rules': [profile.as_dict() for profile in self.iter_hottest()],
+                },
+                fd,
+                indent=1
+            )
+            fd.flush()
+            os.fsync(fd.fileno())
@@ -15,21 +15,66 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 import xxhash
 
 from repology.package import Package
 from repology.transformer.actions import get_action_generators
 from repology.transformer.contexts import MatchContext, PackageContext
-from repology.transformer.matchers import get_matcher_generators
+from repology.transformer.matchers import MatcherIndexes, get_matcher_generators
 from repology.transformer.util import DOLLAR0, yaml_as_list, yaml_as_set
 
 
+class PreparedRuleData:
+    """Preprocessed data for a single Rule.
+
+    Holds rule data with multi-name rules already split and name
+    substitutions performed, along with textual representation and
+    hash of the original rule. It contains plain data only, so it
+    may be pickled and cached; constructing a Rule from it only
+    requires building matchers and actions.
+    """
+
+    __slots__ = ['ruledata', 'pretty', 'texthash']
+
+    ruledata: dict[str, Any]
+    pretty: str
+    texthash: int
+
+    def __init__(self, ruledata: dict[str, Any]) -> None:
+        self.pretty = str(ruledata)
+        self.texthash = xxhash.xxh64_intdigest(self.pretty)
+
+        # config items may be shared with a refreshed config, so
+        # these must not be modified
+        ruledata = ruledata.copy()
+
+        # handle substitution of final name in name matchers
+        if 'name' in ruledata:
+            names = yaml_as_list(ruledata['name'])
+
+            if 'setname' in ruledata:
+                names = [DOLLAR0.sub(ruledata['setname'], name) for name in names]
+
+            ruledata['name'] = names
+
+        if 'namepat' in ruledata:
+            namepat = ruledata['namepat'].replace('\n', '')
+
+            if 'setname' in ruledata:
+                namepat = DOLLAR0.sub(ruledata['setname'], namepat)
+
+            ruledata['namepat'] = namepat
+
+        self.ruledata = ruledata
+
+
 class Rule:
-    __slots__ = ['_matchers', '_actions', 'names', 'namepat', 'rulesets', 'norulesets', 'number', 'pretty', 'texthash']
+    __slots__ = ['_matchers', '_matcher_keywords', '_actions', 'names', 'namepat', 'rulesets', 'norulesets', 'number', 'pretty', 'texthash']
 
     _matchers: list[Callable[[Package, PackageContext, MatchContext], bool]]
+    _matcher_keywords: list[str]
     _actions: list[Callable[[Package, PackageContext, MatchContext], None]]
     names: list[str] | None
     namepat: str | None
@@ -39,36 +84,22 @@ class Rule:
     pretty: str
     texthash: int
 
-    def __init__(self, number: int, ruledata: dict[str, Any]) -> None:
-        self.names = None
-        self.namepat = None
+    def __init__(self, number: int, prepared: PreparedRuleData, indexes: MatcherIndexes) -> None:
+        ruledata = prepared.ruledata
+
+        self.names = ruledata.get('name')
+        self.namepat = ruledata.get('namepat')
         self.rulesets = None
         self.norulesets = None
         self.number = number
 
-        self.pretty = str(ruledata)
-        self.texthash = xxhash.xxh64_intdigest(self.pretty)
+        self.pretty = prepared.pretty
+        self.texthash = prepared.texthash
 
         self._matchers = []
+        self._matcher_keywords = []
         self._actions = []
 
-        # handle substitution of final name in name matchers
-        if 'name' in ruledata:
-            self.names = yaml_as_list(ruledata['name'])
-
-            if 'setname' in ruledata:
-                self.names = [DOLLAR0.sub(ruledata['setname'], name) for name in self.names]
-
-            ruledata['name'] = self.names
-
-        if 'namepat' in ruledata:
-            self.namepat = ruledata['namepat'].replace('\n', '')
-
-            if 'setname' in ruledata:
-                self.namepat = DOLLAR0.sub(ruledata['setname'], self.namepat)
-
-            ruledata['namepat'] = self.namepat
-
         if 'ruleset' in ruledata:
             self.rulesets = yaml_as_set(ruledata['ruleset'])
 
@@ -78,13 +109,24 @@ class Rule:
         # matchers
         for keyword, generate_matcher in get_matcher_generators():
             if keyword in ruledata:
-                self._matchers.append(generate_matcher(ruledata))
+                self._matchers.append(generate_matcher(ruledata, indexes))
+                self._matcher_keywords.append(keyword)
 
         # actions
         for keyword, generate_action in get_action_generators():
             if keyword in ruledata:
                 self._actions.append(generate_action(ruledata))
 
+    def is_applicable(self, rulesets: set[str]) -> bool:
+        if self.rulesets is not None and self.rulesets.isdisjoint(rulesets):
+            return False
+        if self.norulesets is not None and not self.norulesets.isdisjoint(rulesets):
+            return False
+        return True
+
+    def iter_matchers(self) -> Iterator[tuple[str, Callable[[Package, PackageContext, MatchContext], bool]]]:
+        return zip(self._matcher_keywords, self._matchers)
+
     def match(self, package: Package, package_context: PackageContext) -> MatchContext | None:
         match_context = MatchContext()
 
@@ -15,39 +15,77 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-from copy import deepcopy
-from typing import Any
+from difflib import SequenceMatcher
+from typing import Any, Iterator, cast
 
-from repology.transformer.rule import Rule
-from repology.yamlloader import YamlConfig
+from repology.transformer.matchers import MatcherIndexes
+from repology.transformer.rule import PreparedRuleData, Rule
+from repology.yamlloader import ParsedConfigCache, YamlConfig
 
 
 SPLIT_MULTI_NAME_RULES = True
 
+# pseudo-path under which prepared rules are stored in ParsedConfigCache
+_RULESET_CACHE_KEY = ':compiled-ruleset:'
+
+
+def _iter_prepared_rules(items: list[dict[str, Any]]) -> Iterator[PreparedRuleData]:
+    for ruledata in items:
+        if SPLIT_MULTI_NAME_RULES and 'name' in ruledata and isinstance(ruledata['name'], list):
+            for name in ruledata['name']:
+                # shallow copy is enough, as nested values are never modified
+                yield PreparedRuleData(ruledata | {'name': name})
+        else:
+            yield PreparedRuleData(ruledata)
+
 
 class Ruleset:
     _rules: list[Rule]
     _hash: str
+    _indexes: MatcherIndexes
 
-    def __init__(self, rules_config: YamlConfig) -> None:
-        self._rules = []
+    def __init__(self, rules_config: YamlConfig, cache: ParsedConfigCache | None = None) -> None:
+        self._hash = rules_config.get_hash()
 
-        for rule in rules_config.get_items():
-            self._add_rule(rule)
+        # preprocessing is costly, so it's cached by config hash;
+        # only matchers and actions are rebuilt from prepared data
+        prepared: list[PreparedRuleData] | None = None
 
-        self._hash = rules_config.get_hash()
+        if cache is not None:
+            prepared = cast(list[PreparedRuleData] | None, cache.get(_RULESET_CACHE_KEY, self._hash))
 
-    def _add_rule(self, ruledata: dict[str, Any]) -> None:
-        if SPLIT_MULTI_NAME_RULES and 'name' in ruledata and isinstance(ruledata['name'], list):
-            for name in ruledata['name']:
-                modified_ruledata = deepcopy(ruledata)
-                modified_ruledata['name'] = name
-                self._rules.append(Rule(len(self._rules), modified_ruledata))
-        else:
-            self._rules.append(Rule(len(self._rules), ruledata))
+        if prepared is None:
+            prepared = list(_iter_prepared_rules(rules_config.get_items()))
+            if cache is not None:
+                cache.store(_RULESET_CACHE_KEY, self._hash, prepared)
+
+        self._indexes = MatcherIndexes()
+        self._rules = [Rule(number, ruledata, self._indexes) for number, ruledata in enumerate(prepared)]
 
     def get_rules(self) -> list[Rule]:
         return self._rules
 
     def get_hash(self) -> str:
         return self._hash
+
+    def get_changed_rules(self, other: 'Ruleset') -> list[Rule]:
+        """Return rules which were added, removed or moved compared to other ruleset.
+
+        As rules are applied in order, moving a rule may change the result
+        too, so the rule sequences are compared, not just sets of rules.
+        """
+        matcher = SequenceMatcher(
+            None,
+            [rule.texthash for rule in self._rules],
+            [rule.texthash for rule in other._rules],
+            autojunk=False
+        )
+
+        changed: list[Rule] = []
+
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != 'equal':
+                changed.extend(self._rules[i1:i2])
+                changed.extend(other._rules[j1:j2])
+
+        return changed
@@ -62,6 +62,12 @@ class RuleMatchStatistics:
     def get_total_packages(self) -> int:
         return self._total_packages
 
+    def merge(self, other: 'RuleMatchStatistics') -> None:
+        """Add statistics gathered elsewhere, e.g. in another process."""
+        self._total_packages += other._total_packages
+        for rulehash, count in other._rule_match_counts.items():
+            self._rule_match_counts[rulehash] += count
+
     def load(self, path: str) -> None:
         try:
             with open(path, 'rb') as fd:
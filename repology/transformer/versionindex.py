@@ -0,0 +1,138 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+from functools import cmp_to_key
+from typing import Hashable
+
+from libversion import version_compare
+
+
+__all__ = ['VersionBoundIndex']
+
+
+class _BoundGroup:
+    __slots__ = ['bounds', 'positions', 'sorted_bounds']
+
+    bounds: list[tuple[str, int]]
+    positions: list[int]
+    sorted_bounds: list[tuple[str, int]] | None
+
+    def __init__(self) -> None:
+        self.bounds = []
+        self.positions = []
+        self.sorted_bounds = None
+
+    def add(self, bound: str, flags: int) -> int:
+        self.bounds.append((bound, flags))
+        self.sorted_bounds = None
+        return len(self.bounds) - 1
+
+    def build(self) -> list[tuple[str, int]]:
+        bounds = self.bounds
+
+        def compare_bounds(a: int, b: int) -> int:
+            return version_compare(bounds[a][0], bounds[b][0], bounds[a][1], bounds[b][1])
+
+        order = sorted(range(len(bounds)), key=cmp_to_key(compare_bounds))
+
+        self.positions = [0] * len(bounds)
+        for position, index in enumerate(order):
+            self.positions[index] = position
+
+        self.sorted_bounds = [bounds[index] for index in order]
+        return self.sorted_bounds
+
+
+class VersionBoundIndex:
+    """Ruleset-wide registry of version bounds used by ver* and rel* matchers.
+
+    Bounds are grouped (normally by name of the rule they come
+    from), and each group is sorted in version order. For a given
+    package version, a single binary search over the group then
+    gives comparison results against all bounds of the group, so
+    a package passing through many version-conditional rules for
+    the same project needs just a few version comparisons.
+
+    Results of a search are memoized per package in PackageContext.
+    """
+
+    _groups: list[_BoundGroup]
+    _group_ids: dict[Hashable, int]
+
+    def __init__(self) -> None:
+        self._groups = []
+        self._group_ids = {}
+
+    def get_group(self, key: Hashable | None) -> int:
+        """Return id of bound group for a given key.
+
+        Passing None as a key creates a new private group.
+        """
+        if key is not None and (group_id := self._group_ids.get(key)) is not None:
+            return group_id
+
+        group_id = len(self._groups)
+        self._groups.append(_BoundGroup())
+        if key is not None:
+            self._group_ids[key] = group_id
+        return group_id
+
+    def add_bound(self, group_id: int, bound: str, flags: int = 0) -> int:
+        return self._groups[group_id].add(bound, flags)
+
+    def search(self, version: str, group_id: int) -> tuple[int, int]:
+        """Locate version among sorted bounds of the group.
+
+        Returns a tuple of numbers of bounds which are less than,
+        and less than or equal to the given version.
+        """
+        group = self._groups[group_id]
+        bounds = group.sorted_bounds if group.sorted_bounds is not None else group.build()
+
+        comparisons: dict[int, int] = {}
+
+        def compare(position: int) -> int:
+            if (res := comparisons.get(position)) is None:
+                bound, flags = bounds[position]
+                res = comparisons[position] = version_compare(version, bound, 0, flags)
+            return res
+
+        lo, hi = 0, len(bounds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if compare(mid) > 0:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        less = lo
+
+        hi = len(bounds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if compare(mid) >= 0:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return less, lo
+
+    def get_position(self, group_id: int, bound_id: int) -> int:
+        group = self._groups[group_id]
+        if group.sorted_bounds is None:
+            group.build()
+        return group.positions[bound_id]
@@ -15,9 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import islice
 from typing import Iterable, Iterator, TypeVar
 
-__all__ = ['chain_optionals', 'unicalize']
+__all__ = ['chain_optionals', 'chunked', 'split_evenly', 'unicalize']
 
 
 _T = TypeVar('_T')
@@ -36,3 +37,22 @@ def unicalize(values: Iterable[_T]) -> Iterator[_T]:
         if value not in seen:
             seen.add(value)
             yield value
+
+
+def chunked(values: Iterable[_T], size: int) -> Iterator[list[_T]]:
+    iterator = iter(values)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def split_evenly(values: list[_T], count: int) -> Iterator[list[_T]]:
+    """Split list into at most count contiguous parts of nearly equal size."""
+    count = max(1, min(count, len(values)))
+    size, remainder = divmod(len(values), count)
+
+    start = 0
+    for part in range(count):
+        end = start + size + (part < remainder)
+        yield values[start:end]
+        start = end
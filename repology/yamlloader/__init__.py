@@ -18,6 +18,8 @@
 import hashlib
 import os
 import pickle
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, cast
 
 import jinja2
@@ -31,55 +33,166 @@ __all__ = ['ParsedConfigCache', 'YamlConfig']
 ConfigItems = list[Any]
 
 
+# libyaml based loader is several times faster
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _parse_text(text: str) -> ConfigItems:
+    return cast(ConfigItems, yaml.load(jinja2.Template(text).render(), Loader=_SafeLoader))
+
+
+def _parse_file_data(file_path: str, data: bytes) -> ConfigItems:
+    try:
+        return _parse_text(data.decode('utf-8'))
+    except (jinja2.exceptions.TemplateSyntaxError, SystemError) as e:
+        raise RuntimeError(f'cannot load config file {file_path}') from e
+
+
+def _parse_files_data(files_data: list[tuple[str, bytes]], jobs: int) -> list[ConfigItems]:
+    jobs = min(jobs, len(files_data))
+
+    if jobs <= 1:
+        return [_parse_file_data(file_path, data) for file_path, data in files_data]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # results are returned in the order of submission
+        return list(executor.map(
+            _parse_file_data,
+            [file_path for file_path, _ in files_data],
+            [data for _, data in files_data],
+            chunksize=max(1, len(files_data) // (jobs * 4))
+        ))
+
+
 class ParsedConfigCache:
+    """Persistent cache of parsed config files.
+
+    All entries live in a single SQLite database, keyed by path of
+    the source file and holding its sha256 and pickled items. The
+    whole database is read once on construction, so lookups do not
+    touch the disk; storing an entry replaces one for the same path
+    with stale hash. Entries for files which no longer exist are
+    removed by evict_stale().
+
+    Keys starting with a colon are not paths, but names of derived
+    data (such as preprocessed ruleset), and are never evicted.
+    """
+
     _path: str
+    _db: sqlite3.Connection
+    _entries: dict[str, tuple[str, bytes]]
+
+    hits: int
+    misses: int
 
     def __init__(self, path: str) -> None:
         self._path = path
         if not os.path.exists(self._path):
             os.makedirs(self._path)
 
-    def _get_cache_path(self, path: str) -> str:
-        return os.path.join(self._path, path.replace('/', '_').replace('.', '_'))
+        self._db = sqlite3.connect(os.path.join(self._path, 'cache.sqlite'), timeout=60)
+        self._db.execute('PRAGMA journal_mode = WAL')
+        self._db.execute('PRAGMA synchronous = NORMAL')
+
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS entries (path TEXT PRIMARY KEY, hash TEXT NOT NULL, items BLOB NOT NULL)')
+
+        self._entries = {
+            path: (hash_, items)
+            for path, hash_, items in self._db.execute('SELECT path, hash, items FROM entries')
+        }
+
+        self.hits = 0
+        self.misses = 0
 
     def get(self, path: str, hash_: str) -> ConfigItems | None:
-        cache_path = self._get_cache_path(path)
-        if os.path.exists(cache_path):
-            with open(cache_path, 'rb') as fd:
-                stored_hash, stored_items = pickle.load(fd)
-                if stored_hash == hash_:
-                    return cast(ConfigItems, stored_items)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == hash_:
+            self.hits += 1
+            return cast(ConfigItems, pickle.loads(entry[1]))
 
+        self.misses += 1
         return None
 
     def store(self, path: str, hash_: str, items: ConfigItems) -> None:
-        cache_path = self._get_cache_path(path)
-        with open(cache_path, 'wb') as fd:
-            pickle.dump((hash_, items), fd)
-            fd.flush()
-            os.fsync(fd.fileno())
+        entry = (hash_, pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL))
+
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO entries (path, hash, items) VALUES (?, ?, ?)', (path, *entry))
+
+        self._entries[path] = entry
+
+    def evict_stale(self) -> int:
+        stale = [path for path in self._entries if not path.startswith(':') and not os.path.exists(path)]
+
+        with self._db:
+            self._db.executemany('DELETE FROM entries WHERE path = ?', ((path,) for path in stale))
+
+        for path in stale:
+            del self._entries[path]
+
+        return len(stale)
+
+
+class _ConfigFile:
+    __slots__ = ['path', 'mtime', 'size', 'sha256', 'items']
+
+    path: str
+    mtime: int
+    size: int
+    sha256: str
+    items: ConfigItems
+
+    def __init__(self, path: str, mtime: int, size: int, sha256: str) -> None:
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.sha256 = sha256
+        self.items = []
 
 
 class YamlConfig:
     _items: ConfigItems
     _hash: str
+    _path: str | None
+    _files: list[_ConfigFile]
 
-    def __init__(self, items: ConfigItems, hash_: str) -> None:
+    def __init__(self, items: ConfigItems, hash_: str, path: str | None = None, files: list[_ConfigFile] | None = None) -> None:
         self._items = items
         self._hash = hash_
+        self._path = path
+        self._files = files or []
 
     @staticmethod
     def from_text(text: str) -> 'YamlConfig':
         texthash = hashlib.sha256(text.encode('utf-8')).hexdigest()
-        return YamlConfig(yaml.safe_load(jinja2.Template(text).render()), texthash)
+        return YamlConfig(_parse_text(text), texthash)
 
     @staticmethod
-    def from_path(path: str, cache: ParsedConfigCache | None = None) -> 'YamlConfig':
-        items: list[Any] = []
+    def from_path(path: str, cache: ParsedConfigCache | None = None, jobs: int = 1) -> 'YamlConfig':
+        """Load config from a file or a directory of .yaml files.
 
-        file_paths: list[str] = []
+        Files which are not found in the cache are parsed in a pool
+        of given number of worker processes. Items are returned in
+        the order of sorted file paths regardless of that.
+        """
+        return YamlConfig._load(path, cache, jobs, {})
 
-        overall_hash = hashlib.sha256()
+    def refresh(self, cache: ParsedConfigCache | None = None, jobs: int = 1) -> 'YamlConfig':
+        """Reload config from the same path, incrementally.
+
+        Only files whose mtime or size have changed since this config
+        was loaded are reread, and only those of them which have
+        changed contents are reparsed.
+        """
+        if self._path is None:
+            raise RuntimeError('cannot refresh config not loaded from path')
+
+        return YamlConfig._load(self._path, cache, jobs, {file.path: file for file in self._files})
+
+    @staticmethod
+    def _load(path: str, cache: ParsedConfigCache | None, jobs: int, known_files: dict[str, _ConfigFile]) -> 'YamlConfig':
+        file_paths: list[str] = []
 
         if os.path.isfile(path):
             file_paths = [path]
@@ -88,24 +201,48 @@ class YamlConfig:
                 file_paths += [os.path.join(root, f) for f in files if f.endswith('.yaml')]
                 dirs[:] = [d for d in dirs if not d.startswith('.')]
 
-        for file_path in sorted(file_paths):
-            try:
-                with open(file_path, 'rb') as fd:
-                    data = fd.read()
-                    file_hash = hashlib.sha256(data).hexdigest()
+        file_paths.sort()
+
+        config_files: list[_ConfigFile] = []
+        unparsed: list[tuple[str, bytes]] = []
+        unparsed_files: list[_ConfigFile] = []
+
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            known_file = known_files.get(file_path)
+
+            if known_file is not None and known_file.mtime == stat.st_mtime_ns and known_file.size == stat.st_size:
+                config_files.append(known_file)
+                continue
+
+            with open(file_path, 'rb') as fd:
+                data = fd.read()
 
-                    if cache is not None and (cached := cache.get(file_path, file_hash)) is not None:
-                        items.extend(cached)
-                    elif (parsed := yaml.safe_load(jinja2.Template(data.decode('utf-8')).render())):
-                        if cache is not None:
-                            cache.store(file_path, file_hash, parsed)
-                        items.extend(parsed)
+            config_file = _ConfigFile(file_path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest())
+            config_files.append(config_file)
+
+            if known_file is not None and known_file.sha256 == config_file.sha256:
+                config_file.items = known_file.items
+            elif cache is not None and (cached := cache.get(file_path, config_file.sha256)) is not None:
+                config_file.items = cached
+            else:
+                unparsed.append((file_path, data))
+                unparsed_files.append(config_file)
+
+        for config_file, parsed in zip(unparsed_files, _parse_files_data(unparsed, jobs)):
+            if parsed:
+                if cache is not None:
+                    cache.store(config_file.path, config_file.sha256, parsed)
+                config_file.items = parsed
+
+        items: list[Any] = []
+        overall_hash = hashlib.sha256()
 
-                    overall_hash.update(file_hash.encode('utf-8'))
-            except (jinja2.exceptions.TemplateSyntaxError, SystemError) as e:
-                raise RuntimeError(f'cannot load config file {file_path}') from e
+        for config_file in config_files:
+            items.extend(config_file.items)
+            overall_hash.update(config_file.sha256.encode('utf-8'))
 
-        return YamlConfig(items, overall_hash.hexdigest())
+        return YamlConfig(items, overall_hash.hexdigest(), path, config_files)
 
     def dump(self) -> str:
         return yaml.safe_dump(self._items, default_flow_style=False, sort_keys=False)
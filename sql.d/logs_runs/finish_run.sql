@@ -27,6 +27,7 @@
 -- @param stime=None
 -- @param maxrss=None
 -- @param maxrss_delta=None
+-- @param fetch_stats=None
 -- @param traceback=None
 --
 --------------------------------------------------------------------------------
@@ -45,5 +46,7 @@ SET
 	maxrss = %(maxrss)s,
 	maxrss_delta = %(maxrss_delta)s,
 
+	fetch_stats = %(fetch_stats)s,
+
 	traceback = %(traceback)s
 WHERE id = %(id)s;
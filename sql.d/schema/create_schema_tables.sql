@@ -184,6 +184,8 @@ CREATE TABLE runs (
 	maxrss integer NULL,
 	maxrss_delta integer NULL,
 
+	fetch_stats jsonb NULL,
+
 	traceback text NULL
 );
 
@@ -0,0 +1,22 @@
+-- Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+--
+-- This file is part of repology
+--
+-- repology is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU General Public License as published by
+-- the Free Software Foundation, either version 3 of the License, or
+-- (at your option) any later version.
+--
+-- repology is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU General Public License for more details.
+--
+-- You should have received a copy of the GNU General Public License
+-- along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+--------------------------------------------------------------------------------
+-- Non-destructive upgrades of an existing schema to match
+-- create_schema_tables.sql; each statement must be idempotent
+--------------------------------------------------------------------------------
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS fetch_stats jsonb NULL;
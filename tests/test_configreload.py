@@ -0,0 +1,88 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from pathlib import Path
+
+from repology.configreload import ConfigReloader
+from repology.yamlloader import YamlConfig
+
+
+def _write(path: Path, text: str, mtime: int) -> None:
+    with open(path, 'w') as fd:
+        fd.write(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_refresh(tmp_path):
+    _write(tmp_path / '1.yaml', '- { foo: 1 }\n', 1000)
+    _write(tmp_path / '2.yaml', '- { bar: 2 }\n', 1000)
+
+    config = YamlConfig.from_path(tmp_path)
+
+    # unchanged stat, contents are not reread
+    _write(tmp_path / '2.yaml', '- { bar: 3 }\n', 1000)
+    assert config.refresh().get_items() == [{'foo': 1}, {'bar': 2}]
+
+    _write(tmp_path / '2.yaml', '- { bar: 3 }\n', 2000)
+    _write(tmp_path / '3.yaml', '- { baz: 4 }\n', 2000)
+    refreshed = config.refresh()
+
+    assert refreshed.get_items() == [{'foo': 1}, {'bar': 3}, {'baz': 4}]
+    assert refreshed.get_hash() == YamlConfig.from_path(tmp_path).get_hash()
+
+
+def test_reloader(tmp_path):
+    os.mkdir(tmp_path / 'repos')
+    os.mkdir(tmp_path / 'rules')
+
+    _write(tmp_path / 'repos' / 'repos.yaml', """
+- { name: foo, desc: foo, family: foo, ruleset: [foo, common], sources: [] }
+- { name: bar, desc: bar, family: bar, ruleset: [bar, common], sources: [] }
+- { name: baz, desc: baz, family: baz, ruleset: baz, sources: [] }
+""", 1000)
+    _write(tmp_path / 'rules' / '1.yaml', '- { name: a, setname: b }\n', 1000)
+    _write(tmp_path / 'rules' / '2.yaml', '- { name: c, setname: d, ruleset: foo }\n', 1000)
+
+    reloader = ConfigReloader(tmp_path / 'repos', tmp_path / 'rules')
+
+    assert reloader.refresh() == []
+
+    _write(tmp_path / 'rules' / '2.yaml', '- { name: c, setname: e, ruleset: foo }\n', 2000)
+    assert reloader.refresh() == ['foo']
+
+    _write(tmp_path / 'rules' / '3.yaml', '- { name: c, setname: d, ruleset: common, noruleset: bar }\n', 2000)
+    assert reloader.refresh() == ['foo']
+
+    _write(tmp_path / 'rules' / '1.yaml', '- { name: a, setname: c }\n', 2000)
+    assert reloader.refresh() == ['bar', 'baz', 'foo']
+
+    _write(tmp_path / 'repos' / 'repos.yaml', """
+- { name: foo, desc: foo, family: foo, ruleset: [foo, common], sources: [] }
+- { name: bar, desc: bar, family: bar, ruleset: [bar, common], sources: [] }
+- { name: baz, desc: Baz, family: baz, ruleset: baz, sources: [] }
+- { name: quux, desc: quux, family: quux, ruleset: quux, sources: [] }
+""", 2000)
+    assert reloader.refresh() == ['baz', 'quux']
+    assert reloader.get_repo_manager().get_names(['quux']) == ['quux']
+
+    _write(tmp_path / 'repos' / 'repos.yaml', """
+- { name: foo, desc: foo, family: foo, ruleset: [foo, common], sources: [] }
+- { name: baz, desc: Baz, family: baz, ruleset: baz, sources: [] }
+""", 3000)
+    assert reloader.refresh() == ['bar', 'quux']
+    assert [repository.name for repository in reloader.get_repo_manager().get_all_repositories()] == ['baz', 'foo']
@@ -0,0 +1,91 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import lzma
+from pathlib import Path
+
+import pytest
+
+from repology.package import LinkType
+from repology.packagemaker import PackageFactory
+from repology.parsers.parsers.debian import DebianSourcesParser, _iter_packages
+
+
+_SOURCES = b"""
+Package: foo
+Binary: foo, libfoo-dev
+Version: 1:1.0-1
+Maintainer: Foo Team <foo@example.com>
+Uploaders: First Uploader <first@example.com>,
+ Second Uploader <second@example.com>
+Homepage: https://example.com/foo
+Vcs-Git: https://salsa.debian.org/foo.git
+Files:
+ 00000000000000000000000000000000 100 foo_1.0.orig.tar.gz
+Section: utils
+
+
+Package: bar
+Binary: bar
+Version: 2.0-1
+Vcs-Browser: https://salsa.debian.org/bar
+Vcs-Git: https://salsa.debian.org/bar.git
+Description: Package: not a field
+ Version: not a field either
+"""
+
+
+@pytest.fixture(params=['plain', 'xz'])
+def sources_path(request: pytest.FixtureRequest, tmp_path: Path) -> str:
+    path = tmp_path / 'Sources'
+    path.write_bytes(lzma.compress(_SOURCES) if request.param == 'xz' else _SOURCES)
+    return str(path)
+
+
+def test_stanzas(sources_path: str) -> None:
+    foo, bar = _iter_packages(sources_path)
+
+    assert foo['Package'] == 'foo'
+    assert foo['Uploaders'] == 'First Uploader <first@example.com>,Second Uploader <second@example.com>'
+    assert foo.get('Section') == 'utils'
+    assert 'Source' not in foo
+    assert foo.get_prefixed('Vcs-') == 'https://salsa.debian.org/foo.git'
+
+    # continuation lines are not confused with fields
+    assert bar['Package'] == 'bar'
+    assert bar['Version'] == '2.0-1'
+    assert bar.get('Maintainer') is None
+    with pytest.raises(KeyError):
+        bar['Section']
+
+
+def test_parser(sources_path: str) -> None:
+    packages = [
+        maker.spawn(repo='debian', family='debian').__dict__
+        for maker in DebianSourcesParser(allowed_vcs_urls='https://salsa').iter_parse(sources_path, PackageFactory())
+    ]
+
+    assert [(package['srcname'], package['version'], package['links']) for package in packages] == [
+        ('foo', '1.0', [(LinkType.UPSTREAM_HOMEPAGE, 'https://example.com/foo'), (LinkType.PACKAGE_SOURCES, 'https://salsa.debian.org/foo.git')]),
+        ('bar', '2.0', [(LinkType.PACKAGE_SOURCES, 'https://salsa.debian.org/bar')]),
+    ]
+    assert packages[0]['maintainers'] == ['foo@example.com', 'first@example.com', 'second@example.com']
+
+
+def test_empty(tmp_path: Path) -> None:
+    (tmp_path / 'Sources').write_bytes(b'')
+    assert list(_iter_packages(str(tmp_path / 'Sources'))) == []
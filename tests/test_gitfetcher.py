@@ -0,0 +1,92 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from repology.changedpaths import ChangedPaths
+from repology.fetchers.fetchers.git import GitFetcher
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not available')
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', '-C', str(path), '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], check=True, capture_output=True)
+
+
+def _commit(path: Path, files: dict[str, str | None]) -> None:
+    for name, content in files.items():
+        os.makedirs(os.path.dirname(path / name), exist_ok=True)
+        if content is None:
+            os.remove(path / name)
+        else:
+            (path / name).write_text(content)
+    _git(path, 'add', '-A')
+    _git(path, 'commit', '-m', 'update')
+
+
+@pytest.fixture
+def upstream(tmp_path: Path) -> Path:
+    path = tmp_path / 'upstream'
+    path.mkdir()
+    _git(path, 'init', '-b', 'master')
+    _git(path, 'config', 'uploadpack.allowFilter', 'true')
+    _commit(path, {'a/foo': 'foo', 'a/bar': 'bar', 'b/baz': 'baz'})
+    return path
+
+
+@pytest.mark.parametrize('blobless', [False, True])
+def test_changed_paths(upstream, tmp_path, blobless):
+    statepath = str(tmp_path / 'state')
+    fetcher = GitFetcher(f'file://{upstream}', blobless=blobless)
+
+    assert fetcher.fetch(statepath)
+    assert (tmp_path / 'state' / 'a' / 'foo').read_text() == 'foo'
+    assert ChangedPaths.load(statepath) is None
+
+    _commit(upstream, {'a/foo': 'FOO', 'b/baz': None})
+    assert fetcher.fetch(statepath)
+    assert (tmp_path / 'state' / 'a' / 'foo').read_text() == 'FOO'
+
+    changes = ChangedPaths.load(statepath)
+    assert changes is not None
+    first, second = changes.revisions
+
+    _commit(upstream, {'b/quux': 'quux'})
+    assert fetcher.fetch(statepath)
+    assert not fetcher.fetch(statepath)
+
+    changes = ChangedPaths.load(statepath)
+    assert changes is not None
+    assert changes.get_changes_since(first) == {'a/foo', 'b/baz', 'b/quux'}
+    assert changes.get_changes_since(second) == {'b/quux'}
+    assert changes.get_changes_since(changes.get_head()) == set()
+    assert changes.get_changes_since('unknown') is None
+
+
+def test_filter_change(upstream, tmp_path):
+    statepath = str(tmp_path / 'state')
+
+    assert GitFetcher(f'file://{upstream}').fetch(statepath)
+    assert GitFetcher(f'file://{upstream}', blobless=True).fetch(statepath)
+    assert not GitFetcher(f'file://{upstream}', blobless=True).fetch(statepath)
+    assert (tmp_path / 'state' / 'b' / 'baz').read_text() == 'baz'
@@ -0,0 +1,79 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from pathlib import Path
+
+import pytest
+
+from repology.fetchers.hosthealth import HostHealthTracker, HostUnavailableException
+
+
+def test_circuit_breaker() -> None:
+    tracker = HostHealthTracker(failure_threshold=2, cooldown=0.1)
+
+    tracker.record_failure('example.com')
+    tracker.check('example.com')
+
+    tracker.record_failure('example.com')
+    with pytest.raises(HostUnavailableException):
+        tracker.check('example.com')
+
+    # other hosts are not affected
+    tracker.check('example.org')
+
+    time.sleep(0.1)
+    tracker.check('example.com')
+
+    # failure after cooldown trips the breaker again, for longer time
+    tracker.record_failure('example.com')
+    [(host, health)] = tracker.iter_unavailable()
+    assert host == 'example.com'
+    assert health.open_until - time.time() > 0.1
+
+    tracker.record_success('example.com', 1.0)
+    tracker.check('example.com')
+    assert not list(tracker.iter_unavailable())
+
+
+def test_adaptive_timeout() -> None:
+    tracker = HostHealthTracker(min_timeout=10, timeout_factor=4)
+
+    assert tracker.get_timeout('example.com', 60) == 60
+
+    for _ in range(20):
+        tracker.record_success('example.com', 0.5)
+    assert tracker.get_timeout('example.com', 60) == 10
+
+    for _ in range(20):
+        tracker.record_success('example.com', 5)
+    assert tracker.get_timeout('example.com', 60) == 20
+
+    # never exceeds configured timeout
+    assert tracker.get_timeout('example.com', 15) == 15
+    assert tracker.get_timeout('example.com', None) is None
+
+
+def test_persistence(tmp_path: Path) -> None:
+    tracker = HostHealthTracker(failure_threshold=1)
+    tracker.record_failure('example.com')
+    tracker.save(str(tmp_path / 'hosthealth.json'))
+
+    tracker = HostHealthTracker(failure_threshold=1)
+    tracker.load(str(tmp_path / 'hosthealth.json'))
+    with pytest.raises(HostUnavailableException):
+        tracker.check('example.com')
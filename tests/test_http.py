@@ -0,0 +1,394 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import bz2
+import gzip
+import hashlib
+import io
+import itertools
+import lzma
+import pickle
+import random
+import stat
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+import brotli
+
+import pytest
+
+import requests
+
+import zstandard
+
+from repology.fetchers.fetchers.file import FileFetcher
+from repology.fetchers.fetchers.tar import TarFetcher
+from repology.fetchers.http import HTTPSessionPool, save_http_stream
+from repology.fetchers.httpcache import HTTPCache
+from repology.fetchers.telemetry import FetchTelemetry, activate_telemetry, deactivate_telemetry, telemetry_source
+
+
+_DATA = b''.join(b'%d %f\n' % (n, random.Random(n).random()) for n in range(50000))
+
+_COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    # concatenated streams, where supported
+    'gz': lambda data: gzip.compress(data[:1000]) + gzip.compress(data[1000:]),
+    'xz': lambda data: lzma.compress(data[:1000]) + lzma.compress(data[1000:]),
+    'bz2': lambda data: bz2.compress(data[:1000]) + bz2.compress(data[1000:]),
+    'zstd': lambda data: zstandard.compress(data[:1000]) + zstandard.compress(data[1000:]),
+    'br': lambda data: brotli.compress(data, quality=5),
+}
+
+_FILES = {f'/data.{compression}': compress(_DATA) for compression, compress in _COMPRESSORS.items()}
+
+
+def _make_tarball() -> bytes:
+    res = io.BytesIO()
+    with tarfile.open(fileobj=res, mode='w') as tar:
+        # non-readable modes are normalized on extraction
+        info = tarfile.TarInfo('pkg')
+        info.type = tarfile.DIRTYPE
+        info.mode = 0
+        tar.addfile(info)
+
+        for name, data in [('pkg/desc', _DATA), ('pkg/files', b'files')]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0
+            tar.addfile(info, io.BytesIO(data))
+
+        # unsafe members are skipped
+        info = tarfile.TarInfo('pkg/passwd')
+        info.type = tarfile.SYMTYPE
+        info.linkname = '/etc/passwd'
+        tar.addfile(info)
+
+    return res.getvalue()
+
+
+_TARBALL = _make_tarball()
+
+for _compression in ['gz', 'xz', 'zstd']:
+    _FILES[f'/data.tar.{_compression}'] = _COMPRESSORS[_compression](_TARBALL)
+
+_COUNTER = itertools.count()
+
+# flaky responses are cut after this many bytes
+_FLAKY_CHUNK = 200000
+
+_RANGES: list[str] = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        if self.path.startswith('/flaky.'):
+            body = _FILES[self.path.replace('/flaky.', '/data.').removesuffix('.noranges')]
+            start = 0
+            if (range_ := self.headers.get('Range')) and self.headers.get('If-Range') == '"bar"':
+                _RANGES.append(range_)
+                start = int(range_.removeprefix('bytes=').removesuffix('-'))
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(body) - start))
+            if not self.path.endswith('.noranges'):
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('ETag', '"bar"')
+            self.end_headers()
+            # drop connection in the middle
+            self.wfile.write(body[start:start + _FLAKY_CHUNK])
+            self.close_connection = True
+            return
+
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"foo"':
+                self.send_response(304)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            # body differs on each request, so only 304 may make
+            # fetcher report no changes
+            body = str(next(_COUNTER)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', '"foo"')
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith('/counter/'):
+            body = str(next(_COUNTER)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', self.path.removeprefix('/counter/'))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith('/data.'):
+            body = _FILES[self.path.split('?')[0].removesuffix('.truncated')]
+            if self.path.endswith('.truncated'):
+                body = body[:-100]
+        else:
+            body = self.path.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'foo=bar')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: str) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuse(http_server):
+    pool = HTTPSessionPool()
+
+    for n in range(3):
+        assert pool.get_session(http_server).get(f'{http_server}/{n}').text == f'/{n}'
+
+    stats = pool.get_stats()[http_server.removeprefix('http://')]
+    assert stats.requests == 3
+    assert stats.connections_opened == 1
+    assert stats.connections_reused == 2
+
+    pool.close()
+
+
+def test_no_keep_alive(http_server):
+    pool = HTTPSessionPool(keep_alive=False)
+
+    for n in range(3):
+        pool.get_session(http_server).get(f'{http_server}/{n}')
+
+    assert pool.get_stats()[http_server.removeprefix('http://')].connections_opened == 3
+
+    pool.close()
+
+
+@pytest.mark.parametrize('compression', _COMPRESSORS.keys())
+def test_save_http_stream(http_server, compression):
+    outfile = io.BytesIO()
+    save_http_stream(f'{http_server}/data.{compression}', outfile, compression)
+    assert outfile.getvalue() == _DATA
+
+    with pytest.raises(EOFError):
+        save_http_stream(f'{http_server}/data.{compression}.truncated', io.BytesIO(), compression)
+
+
+def test_content_hash(http_server, tmp_path):
+    statepath = str(tmp_path / 'state')
+
+    assert FileFetcher(f'{http_server}/data.gz', compression='gz').fetch(statepath)
+    inode = (tmp_path / 'state').stat().st_ino
+
+    # same content, state is kept as is
+    assert not FileFetcher(f'{http_server}/data.gz', compression='gz').fetch(statepath)
+    assert (tmp_path / 'state').stat().st_ino == inode
+
+    assert FileFetcher(f'{http_server}/other').fetch(statepath)
+    assert (tmp_path / 'state').read_bytes() == b'/other'
+
+
+def test_etag(http_server, tmp_path):
+    statepath = str(tmp_path / 'state')
+
+    assert FileFetcher(f'{http_server}/etag').fetch(statepath)
+    assert not FileFetcher(f'{http_server}/etag').fetch(statepath)
+
+    # validator is dropped when server stops sending it
+    assert FileFetcher(f'{http_server}/etag', nocache=True).fetch(statepath)
+    with open(statepath + '.persdata', 'rb') as persfile:
+        assert 'etag' not in pickle.load(persfile)
+
+
+def test_telemetry(http_server, tmp_path):
+    statepath = str(tmp_path / 'state')
+    telemetry = FetchTelemetry()
+
+    activate_telemetry(telemetry)
+    try:
+        with telemetry_source('data') as stats:
+            FileFetcher(f'{http_server}/data.gz', compression='gz').fetch(statepath)
+        with telemetry_source('etag'):
+            FileFetcher(f'{http_server}/etag').fetch(statepath)
+            FileFetcher(f'{http_server}/etag').fetch(statepath)
+    finally:
+        deactivate_telemetry()
+
+    assert stats is not None
+    assert stats.requests == 1
+    assert stats.bytes_downloaded == len(_FILES['/data.gz'])
+    assert stats.bytes_written == len(_DATA)
+
+    data = telemetry.serialize()
+    assert data['sources']['etag']['requests'] == 2
+    assert data['sources']['etag']['not_modified'] == 1
+
+    [host] = data['hosts'].values()
+    assert host['requests'] == 3
+
+
+@pytest.mark.parametrize('compression', ['gz', 'zstd'])
+def test_resume(http_server, tmp_path, compression):
+    partial_path = str(tmp_path / 'partial')
+    _RANGES.clear()
+
+    outfile = io.BytesIO()
+    save_http_stream(f'{http_server}/flaky.{compression}', outfile, compression, partial_path=partial_path)
+    assert outfile.getvalue() == _DATA
+    assert _RANGES
+    assert not (tmp_path / 'partial').exists()
+    assert not (tmp_path / 'partial.validator').exists()
+
+
+def test_resume_into_file(http_server, tmp_path):
+    partial_path = str(tmp_path / 'partial')
+    hasher = hashlib.sha256()
+
+    # without decompression, complete partial file is moved in place of outfile
+    with open(tmp_path / 'out', 'wb') as outfile:
+        save_http_stream(f'{http_server}/flaky.gz', outfile, hasher=hasher, partial_path=partial_path)
+        assert outfile.tell() == len(_FILES['/data.gz'])
+    assert (tmp_path / 'out').read_bytes() == _FILES['/data.gz']
+    assert hasher.digest() == hashlib.sha256(_FILES['/data.gz']).digest()
+    assert not (tmp_path / 'partial').exists()
+
+
+def test_resume_next_call(http_server, tmp_path):
+    partial_path = str(tmp_path / 'partial')
+    _RANGES.clear()
+
+    with pytest.raises(requests.RequestException):
+        save_http_stream(f'{http_server}/flaky.gz', io.BytesIO(), 'gz', partial_path=partial_path, max_resumes=0)
+    partial_size = (tmp_path / 'partial').stat().st_size
+    assert 0 < partial_size <= _FLAKY_CHUNK
+    assert not _RANGES
+
+    outfile = io.BytesIO()
+    save_http_stream(f'{http_server}/flaky.gz', outfile, 'gz', partial_path=partial_path)
+    assert outfile.getvalue() == _DATA
+    assert _RANGES[0] == f'bytes={partial_size}-'
+    assert not (tmp_path / 'partial').exists()
+
+
+def test_resume_unsupported(http_server, tmp_path):
+    _RANGES.clear()
+
+    # no ranges support, no resumption
+    with pytest.raises(requests.RequestException):
+        save_http_stream(f'{http_server}/flaky.gz.noranges', io.BytesIO(), 'gz', partial_path=str(tmp_path / 'partial'))
+    assert not _RANGES
+    assert not (tmp_path / 'partial.validator').exists()
+
+
+@pytest.mark.parametrize('compression', ['gz', 'xz', 'zstd'])
+def test_tar_fetcher(http_server, tmp_path, compression):
+    statepath = tmp_path / 'state'
+
+    assert TarFetcher(f'{http_server}/data.tar.{compression}', exclude=['*/files']).fetch(str(statepath))
+    assert (statepath / 'pkg' / 'desc').read_bytes() == _DATA
+    assert not (statepath / 'pkg' / 'files').exists()
+    assert not (statepath / 'pkg' / 'passwd').is_symlink()
+    assert stat.S_IMODE((statepath / 'pkg').stat().st_mode) == 0o755
+    assert stat.S_IMODE((statepath / 'pkg' / 'desc').stat().st_mode) == 0o644
+
+    # same content, state is kept as is
+    assert not TarFetcher(f'{http_server}/data.tar.{compression}').fetch(str(statepath))
+    assert (statepath / 'pkg' / 'desc').exists()
+    assert not (statepath / 'pkg' / 'files').exists()
+
+
+def _cached_get(cache: HTTPCache, url: str) -> bytes:
+    return cache.request(url, {}, lambda headers: requests.get(url, headers=headers, stream=True)).content
+
+
+def test_http_cache(http_server, tmp_path):
+    cache = HTTPCache(str(tmp_path))
+
+    # fresh response is served from the cache
+    assert _cached_get(cache, f'{http_server}/counter/max-age=60') == _cached_get(cache, f'{http_server}/counter/max-age=60')
+
+    # stale response is revalidated
+    assert _cached_get(cache, f'{http_server}/etag') == _cached_get(cache, f'{http_server}/etag')
+
+    # uncacheable response is not stored
+    assert _cached_get(cache, f'{http_server}/counter/no-store') != _cached_get(cache, f'{http_server}/counter/no-store')
+
+    offline_cache = HTTPCache(str(tmp_path), offline=True)
+    assert _cached_get(offline_cache, f'{http_server}/etag') == _cached_get(cache, f'{http_server}/etag')
+    with pytest.raises(requests.ConnectionError):
+        _cached_get(offline_cache, f'{http_server}/counter/no-store')
+
+
+def test_http_cache_eviction(http_server, tmp_path):
+    max_size = len(_FILES['/data.gz']) + len(_FILES['/data.bz2'])
+    cache = HTTPCache(str(tmp_path), max_size=max_size)
+
+    # identical bodies are only stored once
+    assert _cached_get(cache, f'{http_server}/data.gz') == _FILES['/data.gz']
+    assert _cached_get(cache, f'{http_server}/data.gz?copy') == _FILES['/data.gz']
+    assert cache.get_size() == len(_FILES['/data.gz'])
+
+    assert _cached_get(cache, f'{http_server}/data.xz') == _FILES['/data.xz']
+    assert _cached_get(cache, f'{http_server}/data.gz') == _FILES['/data.gz']
+    assert _cached_get(cache, f'{http_server}/data.bz2') == _FILES['/data.bz2']
+    assert cache.get_size() <= max_size
+
+    # least recently used one is evicted
+    offline_cache = HTTPCache(str(tmp_path), offline=True)
+    assert _cached_get(offline_cache, f'{http_server}/data.gz') == _FILES['/data.gz']
+    with pytest.raises(requests.ConnectionError):
+        _cached_get(offline_cache, f'{http_server}/data.xz')
+
+
+def test_http_cache_large_body(http_server, tmp_path):
+    cache = HTTPCache(str(tmp_path), max_body_size=len(_FILES['/data.gz']) - 1)
+
+    # too large to be cached, so passed through
+    assert _cached_get(cache, f'{http_server}/data.gz') == _FILES['/data.gz']
+    assert _cached_get(cache, f'{http_server}/data.xz') == _FILES['/data.xz']
+    assert cache.get_size() == len(_FILES['/data.xz'])
+
+
+def test_http_cache_file_fetcher(http_server, tmp_path, monkeypatch):
+    monkeypatch.setattr('repology.fetchers.http._http_cache', HTTPCache(str(tmp_path / 'cache')))
+    assert FileFetcher(f'{http_server}/data.gz', compression='gz').fetch(str(tmp_path / 'online'))
+
+    # streamed download is replayed from the cache
+    monkeypatch.setattr('repology.fetchers.http._http_cache', HTTPCache(str(tmp_path / 'cache'), offline=True))
+    assert FileFetcher(f'{http_server}/data.gz', compression='gz').fetch(str(tmp_path / 'offline'))
+    assert (tmp_path / 'offline').read_bytes() == _DATA
+
+    with pytest.raises(requests.ConnectionError):
+        FileFetcher(f'{http_server}/data.xz', compression='xz').fetch(str(tmp_path / 'missing'))
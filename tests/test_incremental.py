@@ -0,0 +1,127 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, Iterable
+
+import pytest
+
+from repology.changedpaths import ChangedPaths
+from repology.logger import AccumulatingLogger, Logger
+from repology.packagemaker import PackageFactory, PackageMaker
+from repology.parsers.incremental import ParseUnit, iter_parse_incremental
+from repology.parsers.parsers.gentoo import GentooGitParser
+
+
+class _CountingParser(GentooGitParser):
+    parsed: list[str]
+
+    def __init__(self) -> None:
+        super().__init__(require_md5cache_metadata=True, require_xml_metadata=False)
+        self.parsed = []
+
+    def iter_parse_unit(self, path: str, unit: ParseUnit, factory: PackageFactory) -> Iterable[PackageMaker]:
+        self.parsed.append(unit.key)
+        yield from super().iter_parse_unit(path, unit, factory)
+
+    def get_cache_key(self) -> str:
+        return 'test'
+
+
+def _spawn(makers: Iterable[PackageMaker]) -> list[dict[str, Any]]:
+    return [maker.spawn(repo='dummy', family='dummy').__dict__ for maker in makers]
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    shutil.copytree('testdata/gentoo.state/gentoo', tmp_path / 'gentoo')
+    return tmp_path / 'gentoo'
+
+
+def _parse(parser: _CountingParser, tree: Path, logger: Logger) -> list[dict[str, Any]]:
+    parser.parsed = []
+    return _spawn(iter_parse_incremental(parser, str(tree), str(tree) + '.parsecache', logger))
+
+
+def test_incremental(tree: Path) -> None:
+    parser = _CountingParser()
+    expected = _spawn(parser.iter_parse(str(tree), PackageFactory()))
+
+    first_logger = AccumulatingLogger()
+    assert _parse(parser, tree, first_logger) == expected
+    assert len(parser.parsed) == 4
+
+    second_logger = AccumulatingLogger()
+    assert _parse(parser, tree, second_logger) == expected
+    assert parser.parsed == []
+
+    # log messages produced by the parser are replayed
+    assert first_logger.get()[:-1] == second_logger.get()[:-1]
+
+    md5cache = tree / 'metadata' / 'md5-cache' / 'app-misc' / 'away-0.9.5-r1'
+    md5cache.write_text(md5cache.read_text().replace('DESCRIPTION=', 'DESCRIPTION=Modified '))
+
+    modified = _parse(parser, tree, AccumulatingLogger())
+    assert parser.parsed == ['app-misc/away']
+    assert modified != expected
+    assert modified == _spawn(parser.iter_parse(str(tree), PackageFactory()))
+
+
+def test_incremental_no_cache_on_failure(tree: Path) -> None:
+    parser = _CountingParser()
+
+    packages = iter_parse_incremental(parser, str(tree), str(tree) + '.parsecache', AccumulatingLogger())
+    next(packages)
+
+    assert not (tree.parent / 'gentoo.parsecache').exists()
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not available')
+def test_incremental_changed_paths(tree: Path) -> None:
+    def git(*args: str) -> str:
+        return subprocess.run(['git', '-C', str(tree), '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], check=True, capture_output=True, text=True).stdout.strip()
+
+    git('init', '-q')
+    git('add', '-A')
+    git('commit', '-q', '-m', 'initial')
+
+    changes = ChangedPaths(git('rev-parse', 'HEAD'))
+    changes.save(str(tree))
+
+    parser = _CountingParser()
+    _parse(parser, tree, AccumulatingLogger())
+    assert len(parser.parsed) == 4
+
+    ebuild = tree / 'app-misc' / 'asciinema' / 'asciinema-1.3.0.ebuild'
+    ebuild.write_text(ebuild.read_text() + '\n')
+    git('commit', '-q', '-a', '-m', 'update')
+
+    # only paths from the list are considered changed
+    changes.add(git('rev-parse', 'HEAD'), ['app-misc/asciinema/asciinema-1.3.0.ebuild'])
+    changes.save(str(tree))
+
+    _parse(parser, tree, AccumulatingLogger())
+    assert parser.parsed == ['app-misc/asciinema']
+
+    # list which does not end with the actual revision is not trusted
+    changes.add('0' * 40, [])
+    changes.save(str(tree))
+
+    _parse(parser, tree, AccumulatingLogger())
+    assert parser.parsed == []
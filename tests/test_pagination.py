@@ -0,0 +1,138 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import requests
+
+from repology.fetchers.fetchers.chocolatey import ChocolateyFetcher
+from repology.fetchers.fetchers.cratesio import CratesIOFetcher
+from repology.fetchers.http import PoliteHTTP
+from repology.fetchers.pagination import PageRequest, PaginatedFetch
+from repology.logger import NoopLogger
+
+
+_NUM_PAGES = 10
+
+_NUM_CHOCOLATEY_ENTRIES = 95
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    hits: Counter[str] = Counter()
+
+    def _reply(self, status: int, body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        _Handler.hits[self.path] += 1
+
+        if url.path == '/offset':
+            page = int(query['page'])
+            self._reply(200, json.dumps([page] if page < _NUM_PAGES else []))
+        elif url.path == '/flaky':
+            self._reply(503 if _Handler.hits[self.path] < 3 else 200, 'ok')
+        elif url.path == '/missing':
+            self._reply(404, 'not found')
+        elif url.path == '/crates':
+            page = int(query.get('page', '0'))
+            next_page = f'?page={page + 1}' if page + 1 < _NUM_PAGES else None
+            self._reply(200, json.dumps({'crates': [page], 'meta': {'next_page': next_page}}))
+        elif url.path == '/chocolatey/Packages()':
+            skip, top = int(query['$skip']), int(query['$top'])
+            entries = ''.join('<entry/>' for _ in range(max(0, min(top, _NUM_CHOCOLATEY_ENTRIES - skip))))
+            self._reply(200, f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+        else:
+            self._reply(404, '')
+
+    def log_message(self, *args: str) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[str]:
+    _Handler.hits.clear()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_by_offset(http_server):
+    engine = PaginatedFetch(PoliteHTTP(), NoopLogger(), concurrency=4)
+
+    pages = engine.iter_by_offset(
+        lambda page: PageRequest(f'{http_server}/offset?page={page}'),
+        lambda response: not response.json()
+    )
+
+    assert [response.json() for response in pages] == [[page] for page in range(_NUM_PAGES)] + [[]]
+
+
+def test_sequential(http_server):
+    engine = PaginatedFetch(PoliteHTTP(), NoopLogger())
+
+    def get_next(response: requests.Response) -> PageRequest | None:
+        query = response.json()['meta']['next_page']
+        return PageRequest(f'{http_server}/crates{query}') if query else None
+
+    pages = engine.iter_sequential(PageRequest(f'{http_server}/crates'), get_next)
+
+    assert [response.json()['crates'] for response in pages] == [[page] for page in range(_NUM_PAGES)]
+
+
+def test_retries(http_server):
+    engine = PaginatedFetch(PoliteHTTP(), NoopLogger(), retry_delay=0.01)
+
+    assert [response.text for response in engine.iter_sequential(PageRequest(f'{http_server}/flaky'), lambda response: None)] == ['ok']
+    assert _Handler.hits['/flaky'] == 3
+
+    with pytest.raises(requests.HTTPError):
+        list(engine.iter_sequential(PageRequest(f'{http_server}/missing'), lambda response: None))
+
+    assert _Handler.hits['/missing'] == 1
+
+
+def test_cratesio(http_server, tmp_path):
+    statepath = str(tmp_path / 'state')
+
+    assert CratesIOFetcher(f'{http_server}/crates').fetch(statepath)
+    assert sorted(os.listdir(statepath)) == sorted(f'{page}.json' for page in range(_NUM_PAGES))
+
+
+def test_chocolatey(http_server, tmp_path):
+    statepath = str(tmp_path / 'state')
+
+    assert ChocolateyFetcher(f'{http_server}/chocolatey/', page_size=40).fetch(statepath)
+    assert sorted(os.listdir(statepath)) == ['0.xml', '1.xml', '2.xml']
@@ -15,11 +15,20 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
+import bz2
+import gzip
+import lzma
+from typing import Callable
+
 import pytest
 
+import zstandard
+
+from repology.parsers.compression import detect_compression, open_decompressed
 from repology.parsers.cpe import split_cpe
 from repology.parsers.maintainers import extract_maintainers
 from repology.parsers.nevra import EpochMode, nevra_construct, nevra_parse
+from repology.parsers.xml import _iter_xml_elements_at_level_lxml, _iter_xml_elements_at_level_stdlib, iter_xml_elements_at_level
 
 
 class TestNevraConstruct:
@@ -183,3 +192,69 @@ class TestSplitCpe:
 
     def test_escaped_backslash(self):
         assert split_cpe('foo\\\\:bar:baz') == ['foo\\\\', 'bar', 'baz']
+
+
+_COMPRESSORS: dict[str | None, Callable[[bytes], bytes]] = {
+    None: lambda data: data,
+    'gz': gzip.compress,
+    'xz': lzma.compress,
+    'bz2': bz2.compress,
+    'zstd': lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+class TestOpenDecompressed:
+    @pytest.mark.parametrize('compression', _COMPRESSORS.keys())
+    def test_binary(self, tmp_path, compression):
+        path = tmp_path / 'state'
+        compress = _COMPRESSORS[compression]
+        path.write_bytes(compress(b'foo\n') + compress(b'bar\n'))
+
+        assert detect_compression(str(path)) == compression
+
+        with open_decompressed(str(path)) as fd:
+            assert fd.read() == b'foo\nbar\n'
+
+    @pytest.mark.parametrize('compression', _COMPRESSORS.keys())
+    def test_text(self, tmp_path, compression):
+        path = tmp_path / 'state'
+        path.write_bytes(_COMPRESSORS[compression]('Привет\nмир\n'.encode('utf-8')))
+
+        with open_decompressed(str(path), encoding='utf-8') as fd:
+            assert list(fd) == ['Привет\n', 'мир\n']
+
+    @pytest.mark.parametrize('compression', _COMPRESSORS.keys())
+    def test_xml(self, tmp_path, compression):
+        path = tmp_path / 'state'
+        path.write_bytes(_COMPRESSORS[compression](b'<root><a>1</a><b>2</b><a>3</a></root>'))
+
+        assert [elt.text for elt in iter_xml_elements_at_level(str(path), 1, ['a'])] == ['1', '3']
+
+
+_XML = b"""<?xml version="1.0"?>
+<root xmlns="urn:test">
+  <package name="foo"><package name="nested"/><version>1.0</version></package>
+  <other><package name="deep"/></other>
+  <package name="bar"><version>2.0</version></package>
+</root>
+"""
+
+
+class TestXmlBackends:
+    @pytest.mark.parametrize('iter_elements', [_iter_xml_elements_at_level_stdlib, _iter_xml_elements_at_level_lxml])
+    def test_level(self, tmp_path, iter_elements):
+        path = tmp_path / 'state'
+        path.write_bytes(_XML)
+
+        assert [
+            (elt.get('name'), elt.findtext('{urn:test}version'), len(elt))
+            for elt in iter_elements(str(path), 1, ['{urn:test}package'])
+        ] == [('foo', '1.0', 2), ('bar', '2.0', 1)]
+
+    def test_lxml_releases_elements(self, tmp_path):
+        path = tmp_path / 'state'
+        path.write_bytes(b'<root>' + b'<a>1</a><b/>' * 1000 + b'</root>')
+
+        for elt in _iter_xml_elements_at_level_lxml(str(path), 1, ['a']):
+            # processed elements are removed from the tree
+            assert elt.getprevious() is None  # type: ignore
@@ -0,0 +1,103 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import shutil
+from pathlib import Path
+import pytest
+
+from repology.logger import AccumulatingLogger
+from repology.repomgr import RepositoryManager
+from repology.repoproc import RepositoryProcessor, TooLittlePackages
+from repology.transformer import PackageTransformer
+from repology.transformer.ruleset import Ruleset
+from repology.yamlloader import YamlConfig
+
+
+_REPOSITORIES = """
+- name: test
+  desc: Test
+  family: test
+  ruleset: test
+  minpackages: {minpackages}
+  sources:
+{sources}
+"""
+
+_SOURCE = """
+    - name: {name}
+      subrepo: {name}
+      fetcher:
+        class: FileFetcher
+        url: https://example.com/
+      parser:
+        class: GentooGitParser
+        require_md5cache_metadata: true
+        require_xml_metadata: false
+"""
+
+_SOURCES = ['first', 'second', 'third']
+
+
+@pytest.fixture
+def statedir(tmp_path: Path) -> Path:
+    for source in _SOURCES:
+        shutil.copytree('testdata/gentoo.state/gentoo', tmp_path / 'state' / 'test.state' / source)
+    return tmp_path / 'state'
+
+
+def _parse(statedir: Path, parseddir: Path, parse_jobs: int, minpackages: int = 0) -> tuple[list[str], list[str]]:
+    repomgr = RepositoryManager(YamlConfig.from_text(_REPOSITORIES.format(minpackages=minpackages, sources=''.join(_SOURCE.format(name=name) for name in _SOURCES))))
+    repoproc = RepositoryProcessor(repomgr, str(statedir), str(parseddir), parse_jobs=parse_jobs)
+
+    logger = AccumulatingLogger()
+    repoproc.parse(['test'], logger=logger)
+
+    # order of same named packages from different sources is not defined
+    return sorted(json.dumps(package.__dict__) for packageset in repoproc.iter_parsed(['test']) for package in packageset), logger.get()
+
+
+def test_parallel_parsing(statedir: Path, tmp_path: Path) -> None:
+    sequential_packages, sequential_log = _parse(statedir, tmp_path / 'sequential', 1)
+    parallel_packages, parallel_log = _parse(statedir, tmp_path / 'parallel', 3)
+
+    assert len(sequential_packages) == 12
+    assert parallel_packages == sequential_packages
+    assert parallel_log == sequential_log
+
+
+def test_parallel_parsing_safety_check(statedir: Path, tmp_path: Path) -> None:
+    with pytest.raises(TooLittlePackages):
+        _parse(statedir, tmp_path / 'parsed', 3, minpackages=100)
+
+    assert not (tmp_path / 'parsed' / 'test.parsed').exists()
+
+
+def test_parallel_parsing_statistics(statedir: Path, tmp_path: Path) -> None:
+    repomgr = RepositoryManager(YamlConfig.from_text(_REPOSITORIES.format(minpackages=0, sources=''.join(_SOURCE.format(name=name) for name in _SOURCES))))
+    ruleset = Ruleset(YamlConfig.from_text('[ { addflag: seen } ]'))
+    rulehash = ruleset.get_rules()[0].texthash
+
+    # rule match statistics gathered in worker processes are merged back,
+    # and statistics gathered earlier are not counted again
+    for parse_jobs in [1, 3]:
+        transformer = PackageTransformer(ruleset, 'test', {'test'})
+        repoproc = RepositoryProcessor(repomgr, str(statedir), str(tmp_path / f'parsed{parse_jobs}'), parse_jobs=parse_jobs)
+        for numrun in [1, 2, 3]:
+            repoproc.parse(['test'], transformer=transformer)
+            assert transformer.get_statistics().get_total_packages() == 12 * numrun
+            assert transformer.get_statistics().get_rule_frequency(rulehash) == 1.0
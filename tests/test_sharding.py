@@ -0,0 +1,64 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+from pathlib import Path
+from typing import Any, Iterable
+
+import pytest
+
+from repology.packagemaker import PackageFactory, PackageMaker
+from repology.parsers.parsers.sagemath import SageMathParser
+from repology.parsers.sharding import ShardedParser
+from repology.utils.itertools import split_evenly
+
+
+def _spawn(makers: Iterable[PackageMaker]) -> list[dict[str, Any]]:
+    return [maker.spawn(repo='dummy', family='dummy').__dict__ for maker in makers]
+
+
+def _parse_shards(parser: ShardedParser, path: str, num_shards: int) -> list[dict[str, Any]]:
+    return _spawn(
+        maker
+        for shard in parser.iter_shards(path, num_shards)
+        for maker in parser.iter_parse_shard(path, pickle.loads(pickle.dumps(shard)), PackageFactory())
+    )
+
+
+def test_split_evenly() -> None:
+    assert list(split_evenly([1, 2, 3, 4, 5], 3)) == [[1, 2], [3, 4], [5]]
+    assert list(split_evenly([1, 2], 3)) == [[1], [2]]
+    assert list(split_evenly([], 3)) == [[]]
+
+
+@pytest.fixture
+def sagemath_tree(tmp_path: Path) -> str:
+    for name, version in [('foo', '1.0'), ('bar', '2.0.p1'), ('baz', '0.1'), ('quux', '3')]:
+        (tmp_path / 'build' / 'pkgs' / name).mkdir(parents=True)
+        (tmp_path / 'build' / 'pkgs' / name / 'package-version.txt').write_text(version + '\n')
+
+    return str(tmp_path)
+
+
+def test_tree_shards(sagemath_tree: str) -> None:
+    parser = SageMathParser()
+    expected = _spawn(parser.iter_parse(sagemath_tree, PackageFactory()))
+
+    assert sorted((package['trackname'], package['version']) for package in expected) == [('bar', '2.0'), ('baz', '0.1'), ('foo', '1.0'), ('quux', '3')]
+
+    for num_shards in [2, 3, 10]:
+        assert _parse_shards(parser, sagemath_tree, num_shards) == expected
@@ -15,7 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
-from repology.utils.itertools import chain_optionals, unicalize
+from repology.utils.itertools import chain_optionals, chunked, unicalize
 
 
 def test_chain_optionals():
@@ -34,3 +34,10 @@ def test_unicalize():
     assert list(unicalize([])) == []
     assert list(unicalize([0, 1, 2])) == [0, 1, 2]
     assert list(unicalize([0, 1, 2, 0, 1, 2])) == [0, 1, 2]
+
+
+def test_chunked():
+    assert list(chunked([], 2)) == []
+    assert list(chunked([0, 1, 2], 3)) == [[0, 1, 2]]
+    assert list(chunked([0, 1, 2, 3, 4], 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked(range(4), 2)) == [[0, 1], [2, 3]]
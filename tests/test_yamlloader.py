@@ -97,3 +97,38 @@ def test_cache_update(testdata_dir, datadir):
     ]
 
     assert config.get_hash() == '0c86170147f75217684bc52ed5f87085460a7fe4b2af901d7a9569772139594c'
+
+
+def test_parallel(testdata_dir, datadir):
+    cache = ParsedConfigCache(datadir / 'config-cache')
+
+    for _ in ('populate cache', 'use cache'):
+        config = YamlConfig.from_path(testdata_dir / 'yaml_configs', cache, jobs=2)
+
+        assert config.get_items() == [
+            {'foo': 1},
+            {'bar': 2},
+            {'baz': 3},
+        ]
+
+        assert config.get_hash() == 'd6080e544cb4490aa1381f4cd3892c2f858f01fd6f0897e1d2829b20187b70e9'
+
+
+def test_cache_stats_and_eviction(testdata_dir, datadir):
+    shutil.copytree(testdata_dir / 'yaml_configs', datadir / 'configs')
+
+    cache = ParsedConfigCache(datadir / 'config-cache')
+    YamlConfig.from_path(datadir / 'configs', cache)
+    cache.store(':derived:', 'hash', [])
+
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    (datadir / 'configs' / '1.yaml').unlink()
+
+    cache = ParsedConfigCache(datadir / 'config-cache')
+    YamlConfig.from_path(datadir / 'configs', cache)
+
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert cache.evict_stale() == 1
+    assert cache.evict_stale() == 0
+    assert cache.get(':derived:', 'hash') == []
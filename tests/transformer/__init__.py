@@ -16,6 +16,9 @@
 # along with repology.  If not, see <http://www.gnu.org/licenses/>.
 
 from collections import defaultdict
+from copy import deepcopy
+
+import pytest
 
 from repology.repomgr import RepositoryManager
 from repology.transformer import PackageTransformer
@@ -46,7 +49,15 @@ def check_transformer(rulestext: str, *samples: PackageSample) -> None:
         sample_by_repo[sample.package.repo].append(sample)
 
     for repo, repo_samples in sample_by_repo.items():
+        batch = [deepcopy(sample.package) for sample in repo_samples]
+
         transformer = PackageTransformer(ruleset, repo, {repo})
         for sample in repo_samples:
             transformer.process(sample.package)
             sample.check_pytest()
+
+        # rule-major engine must produce exactly the same result
+        PackageTransformer(ruleset, repo, {repo}, rule_major=True).process_batch(batch)
+        for sample, package in zip(repo_samples, batch):
+            if package != sample.package:
+                pytest.fail(f'rule-major transformer result {package.__dict__} differs from package-major {sample.package.__dict__}')
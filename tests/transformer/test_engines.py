@@ -0,0 +1,75 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+from copy import deepcopy
+
+from repology.package import LinkType
+from repology.transformer import PackageTransformer
+from repology.transformer.ruleset import Ruleset
+from repology.utils.itertools import chunked
+from repology.yamlloader import YamlConfig
+
+from ..package import spawn_package
+
+
+_RULES = """
+[
+    { name: [aa, ab, ac], setname: "x$0" },
+    { name: xaa, addflag: f1 },
+    { namepat: "b(.)", setname: "c$1" },
+    { name: [ca, cb], verpat: "1\\\\..*", devel: true },
+    { name: cc, last: true },
+    { namepat: "c.*", flag: f1, ignore: true },
+    { wwwpart: "example.com/b", addflag: f2 },
+    { flag: f2, setname: www },
+    { name: xab, ver: "2.0", setname: ba },
+    { namepat: "(d)(.)", setname: "$2$1", addflavor: true },
+    { name: [ad, da, ed], warning: "some warning" },
+    { name: [ea, eb], remove: true },
+    { namepat: "e.*", setver: "9.9" },
+    { name: [cc, xac], setname: unreachable },
+    { noflag: f1, verlonger: 2, incorrect: true }
+]
+"""
+
+
+def test_rule_major_equivalence():
+    rng = random.Random(1)
+
+    ruleset = Ruleset(YamlConfig.from_text(_RULES))
+
+    packages = [
+        spawn_package(
+            name=rng.choice('abcdef') + rng.choice('abcd'),
+            version=rng.choice(['1.0', '2.0', '1.0.1', '3']),
+            links=[(LinkType.UPSTREAM_HOMEPAGE, rng.choice(['https://example.com/a', 'https://EXAMPLE.com/b', 'https://example.org/b']))]
+        )
+        for _ in range(2000)
+    ]
+
+    expected = deepcopy(packages)
+
+    transformer = PackageTransformer(ruleset, 'dummyrepo', {'dummyrepo'})
+    for package in expected:
+        transformer.process(package)
+
+    transformer = PackageTransformer(ruleset, 'dummyrepo', {'dummyrepo'}, rule_major=True)
+    for batch in chunked(packages, 128):
+        transformer.process_batch(batch)
+
+    assert [package.__dict__ for package in packages] == [package.__dict__ for package in expected]
@@ -0,0 +1,59 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+
+from repology.transformer import PackageTransformer
+from repology.transformer.profile import RuleProfiler
+from repology.transformer.ruleset import Ruleset
+from repology.yamlloader import YamlConfig
+
+from ..package import PackageSample
+
+
+def test_profile(tmp_path):
+    ruleset = Ruleset(YamlConfig.from_text('[ { namepat: "p.*", verpat: "1\\\\..*", setname: bar }, { name: bar, last: true }, { setname: baz } ]'))
+    profiler = RuleProfiler()
+    transformer = PackageTransformer(ruleset, 'dummyrepo', {'dummyrepo'}, profiler)
+
+    for sample in [
+        PackageSample(name='p1', version='1.0').expect(effname='bar'),
+        PackageSample(name='p2', version='2.0').expect(effname='baz'),
+        PackageSample(name='q1', version='1.0').expect(effname='baz'),
+    ]:
+        transformer.process(sample.package)
+        sample.check_pytest()
+
+    assert len(list(profiler.iter_report_lines())) == 4
+
+    profiler.dump(tmp_path / 'profile.json')
+
+    with open(tmp_path / 'profile.json') as fd:
+        dump = json.load(fd)
+
+    assert dump['total_packages'] == 3
+
+    rules = {rule['number']: rule for rule in dump['rules']}
+
+    assert rules[0]['evaluations'] == 3
+    assert rules[0]['matches'] == 1
+    assert set(rules[0]['matcher_times'].keys()) == {'namepat', 'verpat'}
+    assert rules[1]['evaluations'] == 1
+    assert rules[1]['matches'] == 1
+    assert rules[2]['evaluations'] == 2
+    assert rules[2]['matches'] == 2
+    assert rules[2]['matcher_times'] == {}
@@ -0,0 +1,85 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+from repology.transformer import PackageTransformer
+from repology.transformer.ruleset import Ruleset
+from repology.yamlloader import ParsedConfigCache, YamlConfig
+
+from ..package import PackageSample
+
+
+_RULES = """
+[
+    { name: [aaa, bbb], setname: "$0-x" },
+    { namepat: "ccc(.*)", setname: "ddd$1" },
+    { name: eee, ruleset: dummyrepo, setver: "2.0" },
+    { ver: "1.0", addflavor: [foo, bar] }
+]
+"""
+
+
+def test_cached_ruleset(datadir):
+    cache = ParsedConfigCache(datadir / 'config-cache')
+
+    reference = Ruleset(YamlConfig.from_text(_RULES))
+
+    for _ in ('populate cache', 'use cache'):
+        ruleset = Ruleset(YamlConfig.from_text(_RULES), cache)
+
+        assert ruleset.get_hash() == reference.get_hash()
+        assert [
+            (rule.number, rule.pretty, rule.texthash, rule.names, rule.namepat, rule.rulesets)
+            for rule in ruleset.get_rules()
+        ] == [
+            (rule.number, rule.pretty, rule.texthash, rule.names, rule.namepat, rule.rulesets)
+            for rule in reference.get_rules()
+        ]
+
+        transformer = PackageTransformer(ruleset, 'dummyrepo', {'dummyrepo'})
+
+        for sample in [
+            PackageSample(name='aaa', version='1.0').expect(effname='aaa-x', flavors=['foo', 'bar']),
+            PackageSample(name='bbb', version='0.1').expect(effname='bbb-x'),
+            PackageSample(name='ccc1', version='0.1').expect(effname='ddd1'),
+            PackageSample(name='eee', version='0.1').expect(effname='eee', version='2.0'),
+        ]:
+            transformer.process(sample.package)
+            sample.check_pytest()
+
+
+def test_matcher_order():
+    ruleset = Ruleset(YamlConfig.from_text('[ { summpart: foo, wwwpart: foo, verge: "1.0", name: foo, wwwpat: ".*" } ]'))
+
+    # matchers are checked in the order of their definition regardless of indexing
+    assert [keyword for keyword, _ in ruleset.get_rules()[0].iter_matchers()] == ['name', 'verge', 'wwwpat', 'wwwpart', 'summpart']
+
+
+def test_changed_rules():
+    ruleset = Ruleset(YamlConfig.from_text('[ { name: foo, setname: bar }, { name: bar, setname: baz }, { name: baz, setname: quux } ]'))
+
+    assert ruleset.get_changed_rules(ruleset) == []
+
+    # rule order matters, so either of swapped rules is reported as moved
+    reordered = Ruleset(YamlConfig.from_text('[ { name: bar, setname: baz }, { name: foo, setname: bar }, { name: baz, setname: quux } ]'))
+    assert {rule.pretty for rule in ruleset.get_changed_rules(reordered)} in ({rule.pretty} for rule in ruleset.get_rules()[:2])
+
+    modified = Ruleset(YamlConfig.from_text('[ { name: foo, setname: bar }, { name: bar, setname: quux } ]'))
+    assert sorted(rule.pretty for rule in modified.get_changed_rules(ruleset)) == sorted([
+        ruleset.get_rules()[1].pretty,
+        ruleset.get_rules()[2].pretty,
+        modified.get_rules()[1].pretty,
+    ])
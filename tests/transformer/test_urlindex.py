@@ -0,0 +1,70 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+import pytest
+
+from repology.transformer.urlindex import UrlIndex
+
+
+def test_prefixes():
+    index = UrlIndex()
+    foo = index.add_prefixes(['https://foo.com/', 'https://www.foo.com/'])
+    foobar = index.add_prefixes(['https://foo.com/bar'])
+    empty = index.add_prefixes([''])
+
+    assert index.match([]) == set()
+    assert index.match(['https://foo.com/']) == {foo, empty}
+    assert index.match(['https://foo.com/barbaz']) == {foo, foobar, empty}
+    assert index.match(['https://bar.com/', 'https://www.foo.com/x']) == {foo, empty}
+    assert index.match(['https://foo.co']) == {empty}
+
+
+def test_parts():
+    index = UrlIndex()
+    he = index.add_parts(['he'])
+    she = index.add_parts(['she'])
+    hers = index.add_parts(['hers', 'his'])
+
+    assert index.match(['ushers']) == {he, she, hers}
+    assert index.match(['this']) == {hers}
+    assert index.match(['sh', 'e']) == set()
+
+
+# few strings are checked one by one, many go through the trie and automaton
+@pytest.mark.parametrize('num_keys', [3, 30])
+def test_random(num_keys):
+    rng = random.Random(42)
+
+    def random_string(maxlen: int) -> str:
+        return ''.join(rng.choice('ab/.') for _ in range(rng.randint(1, maxlen)))
+
+    index = UrlIndex()
+    prefixes = {index.add_prefixes(values): values for values in ([random_string(4) for _ in range(3)] for _ in range(num_keys))}
+    parts = {index.add_parts(values): values for values in ([random_string(4) for _ in range(3)] for _ in range(num_keys))}
+
+    for _ in range(200):
+        urls = [random_string(12) for _ in range(rng.randint(0, 3))]
+
+        expected = {
+            key for key, values in prefixes.items() if any(url.startswith(value) for url in urls for value in values)
+        } | {
+            key for key, values in parts.items() if any(value in url for url in urls for value in values)
+        }
+
+        assert index.match(urls) == expected
@@ -0,0 +1,55 @@
+# Copyright (C) 2026 Dmitry Marakasov <amdmi3@amdmi3.ru>
+#
+# This file is part of repology
+#
+# repology is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# repology is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with repology.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+from libversion import LOWER_BOUND, UPPER_BOUND, version_compare
+
+from repology.transformer.versionindex import VersionBoundIndex
+
+
+def test_groups():
+    index = VersionBoundIndex()
+
+    assert index.get_group('foo') == index.get_group('foo')
+    assert index.get_group('foo') != index.get_group('bar')
+    assert index.get_group(None) != index.get_group(None)
+
+
+def test_random():
+    rng = random.Random(42)
+
+    def random_version() -> str:
+        return '.'.join(str(rng.randint(0, 3)) for _ in range(rng.randint(1, 3)))
+
+    index = VersionBoundIndex()
+    group_id = index.get_group('foo')
+    bounds = {}
+    for _ in range(30):
+        bound = random_version()
+        flags = rng.choice([0, LOWER_BOUND, UPPER_BOUND])
+        bounds[index.add_bound(group_id, bound, flags)] = (bound, flags)
+
+    for _ in range(200):
+        version = random_version()
+        less, less_or_equal = index.search(version, group_id)
+
+        for bound_id, (bound, flags) in bounds.items():
+            position = index.get_position(group_id, bound_id)
+            expected = version_compare(version, bound, 0, flags)
+
+            assert (1 if position < less else 0 if position < less_or_equal else -1) == expected